@@ -10,4 +10,5 @@ admin.site.register(SoumissionExercice)
 admin.site.register(Note)
 admin.site.register(Exercice)
 admin.site.register(Question)
-
+admin.site.register(Releve)
+admin.site.register(SerieSeance)
@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+User = get_user_model()
+
+# Revendications ajoutées par MyTokenObtainPairSerializer.ajouter_revendications
+CHAMPS_DU_JETON = ('email', 'role', 'nom', 'prenom')
+REVENDICATION_VERSION = 'ver'
+# Rôles dont les droits sont toujours relus en base, jamais pris du jeton
+ROLES_PRIVILEGIES = ('secretaire',)
+# Le filigrane en cache est toujours exact (publié au commit) : la durée
+# ne sert qu'à libérer la place des comptes inactifs
+VERSION_TIMEOUT = 60 * 60
+
+
+def cle_version(user_id):
+    return f'gestion:jwt:version:{user_id}'
+
+
+def version_jetons(user_id):
+    """
+    Filigrane courant du compte (User.version_jetons), None s'il n'existe
+    plus. La base fait foi ; le cache n'est consulté que s'il est partagé
+    entre processus (JWT_VERSIONS_EN_CACHE), une entrée absente ou évincée
+    est relue en base.
+    """
+    en_cache = settings.JWT_VERSIONS_EN_CACHE
+    if en_cache:
+        version = cache.get(cle_version(user_id))
+        if version is not None:
+            return version
+    version = (User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+               .values_list('version_jetons', flat=True).first())
+    if en_cache and version is not None:
+        # add et non set : ne remplace pas une valeur publiée entre-temps
+        cache.add(cle_version(user_id), version, VERSION_TIMEOUT)
+    return version
+
+
+def publier_version(user_id):
+    """
+    L'ancienne version quitte le cache tout de suite ; après le commit, la
+    nouvelle la remplace (une lecture faite avant le commit a pu la remettre).
+    """
+    if not settings.JWT_VERSIONS_EN_CACHE:
+        return
+    cache.delete(cle_version(user_id))
+
+    def publier():
+        version = (User.objects.filter(pk=user_id)
+                   .values_list('version_jetons', flat=True).first())
+        if version is None:
+            cache.delete(cle_version(user_id))
+        else:
+            cache.set(cle_version(user_id), version, VERSION_TIMEOUT)
+
+    transaction.on_commit(publier)
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication sans lecture de la ligne utilisateur pour les
+    requêtes en lecture : l'utilisateur est reconstruit à partir des
+    revendications du jeton (id, email, rôle, nom, prénom), tant que le
+    filigrane `ver` du jeton est celui du compte.
+
+    L'utilisateur est lu en base comme avant pour les écritures, pour les
+    rôles privilégiés (secrétariat), pour les jetons sans ces revendications
+    et quand le compte a été modifié depuis l'émission du jeton. Le
+    rafraîchissement (MyTokenRefreshSerializer) réémet les revendications
+    depuis la base.
+
+    Sans cache partagé (JWT_VERSIONS_EN_CACHE faux, le défaut avec le cache
+    locmem), le filigrane est relu en base : une requête d'une colonne par
+    clé primaire au lieu du chargement de l'utilisateur. Aucune requête
+    seulement avec CACHE_URL.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        if (request.method in SAFE_METHODS
+                and all(champ in validated_token for champ in CHAMPS_DU_JETON)
+                and api_settings.USER_ID_CLAIM in validated_token
+                and validated_token['role'] not in ROLES_PRIVILEGIES
+                and validated_token.get(REVENDICATION_VERSION) == version_jetons(
+                    validated_token[api_settings.USER_ID_CLAIM])):
+            return self.get_token_user(validated_token), validated_token
+        return self.get_user(validated_token), validated_token
+
+    def get_token_user(self, validated_token):
+        """
+        Instance de User construite sans requête. Les autres colonnes sont
+        différées : y accéder (rare) les charge depuis la base.
+        """
+        connues = {champ: validated_token[champ] for champ in CHAMPS_DU_JETON}
+        connues[api_settings.USER_ID_FIELD] = validated_token[api_settings.USER_ID_CLAIM]
+        connues['version_jetons'] = validated_token[REVENDICATION_VERSION]
+        # Un compte désactivé a changé de version : il n'arrive pas ici
+        connues['is_active'] = True
+        # from_db attend les valeurs dans l'ordre des colonnes du modèle
+        champs = [f.attname for f in User._meta.concrete_fields if f.attname in connues]
+        return User.from_db(DEFAULT_DB_ALIAS, champs, [connues[c] for c in champs])
@@ -0,0 +1,162 @@
+import datetime
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Cours, Exercice, Seance
+
+CACHE_TIMEOUT = 24 * 60 * 60
+# Les calendriers sont relus au plus toutes les 5 minutes par les clients
+MAX_AGE = 5 * 60
+
+
+def cours_de(user):
+    """Cours qui apparaissent dans le calendrier de l'utilisateur."""
+    if user.is_etudiant():
+        return Cours.objects.filter(inscriptions__etudiant=user)
+    if user.is_enseignant():
+        return Cours.objects.filter(enseignant=user)
+    return Cours.objects.none()
+
+
+def version(user):
+    """
+    (ETag, Last-Modified) du calendrier, en une requête agrégée.
+    Les nombres de séances et d'exercices couvrent les suppressions,
+    que la date de dernière modification seule ne verrait pas. La date de
+    modification des cours couvre leur titre, repris dans chaque événement.
+    """
+    agregats = cours_de(user).aggregate(
+        cours_maj=Max('date_maj'),
+        seance_maj=Max('seance__date_maj'),
+        seances=Count('seance', distinct=True),
+        exercice_maj=Max('exercice__date_maj'),
+        exercices=Count('exercice', distinct=True),
+        cours=Count('id', distinct=True),
+    )
+    dates = [d for d in (agregats['cours_maj'], agregats['seance_maj'],
+                         agregats['exercice_maj']) if d]
+    derniere_maj = max(dates) if dates else None
+    empreinte = hashlib.sha1(
+        repr((user.pk, sorted(agregats.items()))).encode()).hexdigest()
+    return f'"{empreinte}"', derniere_maj
+
+
+def evenements(user):
+    """Séances puis échéances d'exercices de l'utilisateur, triées par date."""
+    cours = cours_de(user)
+    seances = (
+        Seance.objects.filter(cours__in=cours)
+        .values('id', 'date', 'heure_debut', 'duree', 'salle', 'date_maj',
+                'cours_id', titre=F('cours__titre'))
+        .order_by('date', 'heure_debut')
+    )
+    exercices = (
+        Exercice.objects.filter(cours__in=cours)
+        .values('id', 'date_limite', 'titre_exercice', 'date_maj', 'cours_id',
+                titre=F('cours__titre'))
+        .order_by('date_limite')
+    )
+    resultat = []
+    for s in seances:
+        debut = datetime.datetime.combine(s['date'], s['heure_debut'])
+        resultat.append({
+            'type': 'seance',
+            'id': s['id'],
+            'cours': s['cours_id'],
+            'titre': s['titre'],
+            'debut': debut,
+            'fin': debut + datetime.timedelta(hours=s['duree']),
+            'salle': s['salle'],
+            'date_maj': s['date_maj'],
+        })
+    for e in exercices:
+        resultat.append({
+            'type': 'exercice',
+            'id': e['id'],
+            'cours': e['cours_id'],
+            'titre': f"{e['titre']} : {e['titre_exercice']}",
+            'debut': e['date_limite'],
+            'fin': e['date_limite'],
+            'salle': '',
+            'date_maj': e['date_maj'],
+        })
+    return resultat
+
+
+def contenu_en_cache(user, format_, etag, construire):
+    """Contenu du calendrier, mis en cache par utilisateur et par version."""
+    cle = f'gestion:calendrier:{user.pk}:{format_}:{etag}'
+    contenu = cache.get(cle)
+    if contenu is None:
+        contenu = construire()
+        cache.set(cle, contenu, CACHE_TIMEOUT)
+    return contenu
+
+
+# Lien d'abonnement signé (les applications de calendrier n'envoient pas de JWT)
+
+def jeton(user):
+    # Clé propre à l'utilisateur, renouvelée au changement de mot de passe
+    # (User.save) : un réhachage du même mot de passe ne révoque pas les liens.
+    return salted_hmac('gestion.calendrier', f'{user.pk}:{user.cle_calendrier}').hexdigest()[:32]
+
+
+def verifier_jeton(user, valeur):
+    return bool(valeur) and constant_time_compare(jeton(user), valeur)
+
+
+# Format iCalendar (RFC 5545)
+
+def echapper(texte):
+    return (str(texte).replace('\\', '\\\\').replace(';', '\\;')
+            .replace(',', '\\,').replace('\n', '\\n'))
+
+
+def plier(ligne):
+    """Lignes de 75 octets au plus, suites préfixées d'une espace."""
+    morceaux = []
+    while len(ligne.encode('utf-8')) > 75:
+        coupe = 75
+        while len(ligne[:coupe].encode('utf-8')) > 75:
+            coupe -= 1
+        morceaux.append(ligne[:coupe])
+        ligne = ' ' + ligne[coupe:]
+    morceaux.append(ligne)
+    return '\r\n'.join(morceaux)
+
+
+def format_date(valeur):
+    if timezone.is_aware(valeur):
+        return valeur.astimezone(datetime.timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+    # Heure « flottante » : les séances sont saisies en heure locale
+    return valeur.strftime('%Y%m%dT%H%M%S')
+
+
+def rendre_ics(user, evenements, derniere_maj):
+    horodatage = format_date(derniere_maj or timezone.now())
+    lignes = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        'PRODID:-//Gestion Universite//Calendrier//FR',
+        'CALSCALE:GREGORIAN',
+        f'X-WR-CALNAME:{echapper(user)}',
+    ]
+    for e in evenements:
+        lignes += [
+            'BEGIN:VEVENT',
+            f"UID:{e['type']}-{e['id']}@gestion-universite",
+            f'DTSTAMP:{horodatage}',
+            f"LAST-MODIFIED:{format_date(e['date_maj'])}",
+            f"DTSTART:{format_date(e['debut'])}",
+            f"DTEND:{format_date(e['fin'])}",
+            f"SUMMARY:{echapper(e['titre'])}",
+        ]
+        if e['salle']:
+            lignes.append(f"LOCATION:{echapper(e['salle'])}")
+        lignes.append('END:VEVENT')
+    lignes.append('END:VCALENDAR')
+    return '\r\n'.join(plier(ligne) for ligne in lignes) + '\r\n'
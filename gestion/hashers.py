@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.contrib.auth.hashers import BCryptSHA256PasswordHasher, PBKDF2PasswordHasher
+
+
+class PBKDF2ReglableHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 dont le nombre d'itérations vient de PASSWORD_PBKDF2_ITERATIONS
+    (défaut de Django sinon). Même algorithme que le hacheur de Django :
+    les mots de passe existants restent valides et sont réhachés au coût
+    courant à la connexion suivante.
+    """
+
+    @property
+    def iterations(self):
+        return (getattr(settings, 'PASSWORD_PBKDF2_ITERATIONS', None)
+                or PBKDF2PasswordHasher.iterations)
+
+
+class BCryptReglableHasher(BCryptSHA256PasswordHasher):
+    """bcrypt (SHA-256 préalable) dont le coût vient de PASSWORD_BCRYPT_ROUNDS."""
+
+    @property
+    def rounds(self):
+        return (getattr(settings, 'PASSWORD_BCRYPT_ROUNDS', None)
+                or BCryptSHA256PasswordHasher.rounds)
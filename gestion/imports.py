@@ -0,0 +1,169 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils.dateparse import parse_date
+
+from . import mise_en_cache
+from .models import User
+
+COLONNES = ('email', 'password', 'nom', 'prenom', 'tel', 'filiere',
+            'anneeetude', 'anneeinscrit', 'datedenaissance')
+COLONNES_REQUISES = ('email', 'password')
+
+
+class RapportImport:
+    def __init__(self):
+        self.lignes = 0
+        self.crees = 0
+        self.erreurs = []
+        self.debut = time.monotonic()
+        self.duree = 0.0
+
+    def erreur(self, ligne, message):
+        self.erreurs.append({'ligne': ligne, 'message': message})
+
+    @property
+    def debit(self):
+        return self.lignes / self.duree if self.duree else 0.0
+
+    def as_dict(self):
+        return {
+            'lignes': self.lignes,
+            'crees': self.crees,
+            'erreurs': self.erreurs,
+            'duree': round(self.duree, 3),
+            'debit': round(self.debit, 1),
+        }
+
+
+def _initialiser_worker(settings_module):
+    # Nécessaire avec la méthode « spawn » (macOS, Windows)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    django.setup()
+
+
+class ImportTropVolumineux(Exception):
+    """Fichier dépassant `lignes_max` : rien n'a été importé."""
+
+
+def importer_etudiants(fichier, batch_size=1000, workers=None, lignes_max=None):
+    """
+    Importe des étudiants depuis un CSV (objet texte).
+
+    Le fichier est entièrement décodé et validé avant la première
+    insertion : un encodage invalide ou un fichier de plus de `lignes_max`
+    lignes n'importe rien. Les emails sont vérifiés contre un ensemble
+    chargé une seule fois, les mots de passe sont hachés dans ce processus
+    (`workers=1`) ou dans un pool de processus (défaut : nombre de CPU), et
+    les comptes sont insérés par lots avec bulk_create.
+    """
+    rapport = RapportImport()
+    lecteur = csv.DictReader(fichier)
+    manquantes = [c for c in COLONNES_REQUISES if c not in (lecteur.fieldnames or ())]
+    if manquantes:
+        rapport.erreur(1, f"Colonnes manquantes : {', '.join(manquantes)}")
+        return rapport
+
+    emails_connus = {
+        email.lower() for email in User.objects.values_list('email', flat=True)}
+    valides = []
+    # La ligne 1 est l'en-tête
+    for numero, ligne in enumerate(lecteur, start=2):
+        rapport.lignes += 1
+        if lignes_max is not None and rapport.lignes > lignes_max:
+            raise ImportTropVolumineux(
+                f"Plus de {lignes_max} lignes : utiliser manage.py import_students.")
+        try:
+            valides.append((numero, preparer_etudiant(ligne, emails_connus)))
+        except ValidationError as e:
+            rapport.erreur(numero, ' '.join(e.messages))
+
+    workers = workers or os.cpu_count() or 1
+    pool = None
+    if workers > 1 and valides:
+        pool = ProcessPoolExecutor(
+            max_workers=workers, initializer=_initialiser_worker,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'universite.settings'),))
+    try:
+        for debut in range(0, len(valides), batch_size):
+            lot = valides[debut:debut + batch_size]
+            mots_de_passe = [user.password for _, user in lot]
+            if pool is not None:
+                hashes = pool.map(make_password, mots_de_passe,
+                                  chunksize=max(1, len(mots_de_passe) // workers))
+            else:
+                hashes = map(make_password, mots_de_passe)
+            for (_, user), hash_ in zip(lot, hashes):
+                user.password = hash_
+
+            inserer(lot, rapport)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    rapport.duree = time.monotonic() - rapport.debut
+    return rapport
+
+
+def preparer_etudiant(ligne, emails_connus):
+    """Valide une ligne du CSV et construit l'étudiant (mot de passe en clair)."""
+    valeurs = {c: (ligne.get(c) or '').strip() for c in COLONNES}
+    email = BaseUserManager.normalize_email(valeurs['email'])
+    if not email:
+        raise ValidationError("L'adresse email est obligatoire.")
+    if email.lower() in emails_connus:
+        raise ValidationError(f"Un User avec cet email existe déjà : {email}")
+    if not valeurs['password']:
+        raise ValidationError("Le mot de passe est obligatoire.")
+
+    datedenaissance = None
+    if valeurs['datedenaissance']:
+        try:
+            datedenaissance = parse_date(valeurs['datedenaissance'])
+        except ValueError:
+            datedenaissance = None
+        if datedenaissance is None:
+            raise ValidationError(
+                f"Date de naissance invalide : {valeurs['datedenaissance']}")
+
+    user = User(
+        email=email,
+        password=valeurs['password'],
+        role='etudiant',
+        nom=valeurs['nom'] or None,
+        prenom=valeurs['prenom'] or None,
+        tel=valeurs['tel'] or None,
+        filiere=valeurs['filiere'] or None,
+        anneeetude=valeurs['anneeetude'] or None,
+        anneeinscrit=valeurs['anneeinscrit'] or None,
+        datedenaissance=datedenaissance,
+    )
+    # Format de l'email, longueurs maximales des champs...
+    user.clean_fields(exclude=['password'])
+    emails_connus.add(email.lower())
+    return user
+
+
+def inserer(valides, rapport):
+    users = [user for _, user in valides]
+    try:
+        with transaction.atomic():
+            User.objects.bulk_create(users)
+            mise_en_cache.invalider(User)
+        rapport.crees += len(users)
+    except IntegrityError:
+        # Conflit concurrent (email créé entre-temps) : ligne par ligne
+        for numero, user in valides:
+            try:
+                with transaction.atomic():
+                    user.save()
+                rapport.crees += 1
+            except IntegrityError as e:
+                rapport.erreur(numero, str(e))
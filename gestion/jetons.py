@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# Jetons révoqués gardés en mémoire par processus
+TAILLE_LRU = 10000
+
+
+class EnsembleLRU:
+    """Ensemble borné : les éléments les moins récemment vus sont oubliés."""
+
+    def __init__(self, taille):
+        self.taille = taille
+        self.elements = OrderedDict()
+        self.verrou = threading.Lock()
+
+    def __contains__(self, element):
+        with self.verrou:
+            if element not in self.elements:
+                return False
+            self.elements.move_to_end(element)
+            return True
+
+    def ajouter(self, element):
+        with self.verrou:
+            self.elements[element] = None
+            self.elements.move_to_end(element)
+            if len(self.elements) > self.taille:
+                self.elements.popitem(last=False)
+
+    def vider(self):
+        with self.verrou:
+            self.elements.clear()
+
+    def __len__(self):
+        return len(self.elements)
+
+
+# Une révocation est définitive : un jeton vu révoqué le reste. Seule la
+# réponse « révoqué » peut donc être gardée en mémoire ; un jeton inconnu
+# est toujours vérifié en base (un autre processus a pu le révoquer).
+revoques = EnsembleLRU(TAILLE_LRU)
+
+
+# Métriques (cache partagé : agrégées entre processus si CACHE_URL est défini)
+
+def cle_metrique(nom):
+    return f'gestion:jwt:liste-noire:{nom}'
+
+
+def compter(nom, valeur=1):
+    cle = cle_metrique(nom)
+    try:
+        cache.incr(cle, valeur)
+    except ValueError:
+        cache.add(cle, valeur, None)
+
+
+def est_revoque(jti):
+    compter('verifications')
+    if jti in revoques:
+        compter('lru')
+        return True
+    debut = time.perf_counter()
+    revoque = BlacklistedToken.objects.filter(token__jti=jti).exists()
+    compter('requetes')
+    compter('duree_us', int((time.perf_counter() - debut) * 1e6))
+    if revoque:
+        revoques.ajouter(jti)
+    return revoque
+
+
+def metriques():
+    noms = ('verifications', 'lru', 'requetes', 'duree_us')
+    valeurs = cache.get_many([cle_metrique(n) for n in noms])
+    v = {n: valeurs.get(cle_metrique(n), 0) for n in noms}
+    maintenant = timezone.now()
+    return {
+        'tables': {
+            'outstanding': OutstandingToken.objects.count(),
+            'outstanding_expires': OutstandingToken.objects.filter(
+                expires_at__lt=maintenant).count(),
+            'blacklisted': BlacklistedToken.objects.count(),
+        },
+        'verifications': {
+            'total': v['verifications'],
+            'lru': v['lru'],
+            'requetes': v['requetes'],
+            'duree_moyenne_ms': (round(v['duree_us'] / v['requetes'] / 1000, 3)
+                                 if v['requetes'] else None),
+            'taille_lru': len(revoques),
+        },
+    }
+
+
+class RefreshTokenSurveille(RefreshToken):
+    """
+    RefreshToken dont la vérification de liste noire passe par le LRU des
+    jetons révoqués et alimente les métriques. Un jeton expiré est refusé
+    par check_exp sans consulter la liste noire.
+    """
+
+    def verify(self, *args, **kwargs):
+        # Expiration d'abord : un jeton expiré ne coûte pas de requête
+        self.check_exp()
+        super().verify(*args, **kwargs)
+
+    def check_blacklist(self):
+        if est_revoque(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        jeton_revoque = super().blacklist()
+        revoques.ajouter(self.payload[api_settings.JTI_CLAIM])
+        return jeton_revoque
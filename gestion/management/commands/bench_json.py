@@ -0,0 +1,77 @@
+import datetime
+import io
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from gestion.models import Cours, Inscription, User
+from gestion.renderers import ORJSONParser, ORJSONRenderer, orjson
+from gestion.serializers import InscriptionSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare le débit du JSON de DRF et d'orjson (rendu et lecture) sur une "
+        "liste d'inscriptions sérialisées, et vérifie que les sorties sont identiques. "
+        "Les lignes sont construites en mémoire : aucune écriture en base."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000,
+                            help="Nombre d'inscriptions (défaut : 10000).")
+        parser.add_argument('--repeat', type=int, default=5,
+                            help="Nombre de mesures, la meilleure est retenue (défaut : 5).")
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            raise CommandError("orjson n'est pas installé (pip install orjson).")
+        lignes, repetitions = options['rows'], options['repeat']
+        data = InscriptionSerializer(self.inscriptions(lignes), many=True).data
+
+        rendus = {}
+        for nom, renderer in (('DRF', JSONRenderer()), ('orjson', ORJSONRenderer())):
+            duree, rendus[nom] = self.mesurer(repetitions, renderer.render, data)
+            self.afficher(f"Rendu  {nom:<6}", lignes, duree)
+        if rendus['DRF'] != rendus['orjson']:
+            raise CommandError("Les deux rendus diffèrent.")
+
+        contenu = rendus['DRF']
+        for nom, parser in (('DRF', JSONParser()), ('orjson', ORJSONParser())):
+            duree, _ = self.mesurer(
+                repetitions, lambda: parser.parse(io.BytesIO(contenu)))
+            self.afficher(f"Lecture {nom:<6}", lignes, duree)
+        self.stdout.write(self.style.SUCCESS(
+            f"Sorties identiques ({len(contenu) / 1e6:.1f} Mo)."))
+
+    def inscriptions(self, nombre):
+        enseignant = User(id=1, email='enseignant@univ.test', role='enseignant',
+                          nom='Martin', prenom='Élise', fonction='MdC')
+        cours = [
+            Cours(id=i, titre=f'Cours n°{i}', description='Description ' * 20,
+                  volumehoraire=Decimal('30.00'), type_cours='CM', semestre='S1',
+                  anneeetude='L1', enseignant=enseignant)
+            for i in range(1, 51)
+        ]
+        return [
+            Inscription(
+                id=i, cours=cours[i % len(cours)],
+                etudiant=User(id=i + 1, email=f'etudiant{i}@univ.test', role='etudiant',
+                              nom=f'Nom{i}', prenom='Zoé', filiere='INFO', anneeetude='1',
+                              datedenaissance=datetime.date(2004, 5, 17)))
+            for i in range(1, nombre + 1)
+        ]
+
+    def mesurer(self, repetitions, fonction, *args):
+        meilleure, resultat = None, None
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            resultat = fonction(*args)
+            duree = time.perf_counter() - debut
+            meilleure = duree if meilleure is None else min(meilleure, duree)
+        return meilleure, resultat
+
+    def afficher(self, libelle, lignes, duree):
+        self.stdout.write(f"{libelle} : {duree * 1000:8.1f} ms  ({lignes / duree:,.0f} lignes/s)")
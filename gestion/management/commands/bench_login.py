@@ -0,0 +1,81 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils.module_loading import import_string
+
+from gestion.models import User
+from gestion.serializers import MyTokenObtainPairSerializer
+
+EMAIL = 'bench-login@univ.test'
+MOT_DE_PASSE = 'motdepasse-bench'
+
+
+class Command(BaseCommand):
+    help = (
+        "Mesure le débit de connexion de /api/token/ (connexions par seconde) "
+        "pour chaque hacheur de mots de passe, dans ce processus : un worker "
+        "gunicorn synchrone par cœur, le résultat est un débit par cœur. "
+        "Le serializer de connexion est appelé directement, sans la vue ni "
+        "sa limitation de débit ; le compte de test est créé dans une "
+        "transaction annulée."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=20,
+                            help="Connexions mesurées par hacheur (défaut : 20).")
+        parser.add_argument('--hashers', default=settings.PASSWORD_HASHER,
+                            help="Hacheurs à comparer, séparés par des virgules "
+                                 f"({', '.join(settings.PASSWORD_HASHER_CHOICES)} ; "
+                                 "défaut : PASSWORD_HASHER).")
+
+    def handle(self, *args, **options):
+        noms = [nom.strip() for nom in options['hashers'].split(',') if nom.strip()]
+        inconnus = set(noms) - set(settings.PASSWORD_HASHER_CHOICES)
+        if inconnus:
+            raise CommandError(f"Hacheur(s) inconnu(s) : {', '.join(sorted(inconnus))}.")
+        if options['logins'] < 1:
+            raise CommandError("--logins doit être positif.")
+
+        for nom in noms:
+            # Tous les hacheurs de PASSWORD_HASHER_CHOICES sont installés :
+            # celui mesuré est choisi par son algorithme
+            algorithme = import_string(settings.PASSWORD_HASHER_CHOICES[nom]).algorithm
+            try:
+                encode = make_password(MOT_DE_PASSE, hasher=algorithme)
+            except ValueError as e:  # bibliothèque absente (argon2-cffi...)
+                self.stderr.write(f"{nom:<7}: ignoré ({e})")
+                continue
+            with transaction.atomic():
+                self.mesurer(nom, algorithme, encode, options['logins'])
+                transaction.set_rollback(True)
+
+    def mesurer(self, nom, algorithme, encode, logins):
+        User.objects.create(email=EMAIL, password=encode, role='etudiant')
+        donnees = {'email': EMAIL, 'password': MOT_DE_PASSE}
+
+        def connecter():
+            serializer = MyTokenObtainPairSerializer(data=donnees, hacheur=algorithme)
+            # Un refus (mot de passe, compte désactivé...) n'est pas une connexion
+            if not serializer.is_valid():
+                raise CommandError(f"{nom} : connexion refusée ({serializer.errors}).")
+
+        requetes = []
+
+        def compter(execute, sql, *args):
+            requetes.append(sql)
+            return execute(sql, *args)
+
+        with connection.execute_wrapper(compter):
+            connecter()
+
+        debut = time.perf_counter()
+        for _ in range(logins):
+            connecter()
+        duree = time.perf_counter() - debut
+        self.stdout.write(
+            f"{nom:<7}: {logins / duree:8.1f} connexions/s/cœur  "
+            f"({duree / logins * 1000:.1f} ms, {len(requetes)} requête(s) SQL "
+            f"par connexion)")
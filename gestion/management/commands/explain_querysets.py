@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connection
+from django.urls import URLPattern
+from rest_framework.mixins import ListModelMixin
+from rest_framework.test import APIRequestFactory
+
+from gestion import urls
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Affiche le plan d'exécution (EXPLAIN) du queryset de chaque "
+        "endpoint de liste, pour vérifier l'utilisation des index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', dest='email',
+            help="Email de l'utilisateur au nom duquel les requêtes sont construites "
+                 "(par défaut : la première secrétaire).")
+        parser.add_argument(
+            '--param', action='append', default=[], metavar='CLE=VALEUR',
+            help="Paramètre GET ajouté à chaque requête (ex. --param role=etudiant).")
+        parser.add_argument(
+            '--endpoint', action='append', default=[], metavar='NOM',
+            help="Limiter aux routes portant ce nom (ex. --endpoint notes-examens-list).")
+        parser.add_argument(
+            '--analyze', action='store_true',
+            help="Exécute réellement la requête (EXPLAIN ANALYZE, MySQL 8 / PostgreSQL).")
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['email'])
+        params = self.parse_params(options['param'])
+        explain_options = {'analyze': True} if options['analyze'] else {}
+
+        self.stdout.write(f"Base : {connection.vendor}")
+        for name, path, view_class, initkwargs in self.list_endpoints(options['endpoint']):
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n{name}  GET {path}"))
+            queryset = self.build_queryset(view_class, initkwargs, path, params, user)
+            self.stdout.write(str(queryset.query))
+            try:
+                self.stdout.write(queryset.explain(**explain_options))
+            except (DatabaseError, ValueError) as e:
+                self.stdout.write(self.style.ERROR(f"EXPLAIN impossible : {e}"))
+
+    def get_user(self, email):
+        if email:
+            try:
+                return User.objects.get(email=email)
+            except User.DoesNotExist:
+                raise CommandError(f"Aucun utilisateur avec l'email : {email}")
+        user = User.objects.filter(role='secretaire').first()
+        if user is None:
+            raise CommandError("Aucune secrétaire en base : utilisez --user.")
+        return user
+
+    def parse_params(self, raw_params):
+        params = {}
+        for raw in raw_params:
+            key, sep, value = raw.partition('=')
+            if not sep:
+                raise CommandError(f"Paramètre invalide (attendu CLE=VALEUR) : {raw}")
+            params[key] = value
+        return params
+
+    def list_endpoints(self, names):
+        """Routes de gestion.urls servies par une vue de liste DRF."""
+        for pattern in urls.urlpatterns:
+            if not isinstance(pattern, URLPattern):
+                continue
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if view_class is None or not issubclass(view_class, ListModelMixin):
+                continue
+            if names and pattern.name not in names:
+                continue
+            yield (pattern.name, f"/api/{pattern.pattern}", view_class,
+                   pattern.callback.view_initkwargs)
+
+    def build_queryset(self, view_class, initkwargs, path, params, user):
+        """
+        Reconstruit le queryset exactement comme la vue le ferait pour une
+        requête GET, pagination comprise si elle est active.
+        """
+        django_request = APIRequestFactory().get(path, params)
+        view = view_class(**initkwargs)
+        view.setup(django_request)
+        view.request = view.initialize_request(django_request)
+        view.request.user = user
+        view.format_kwarg = None
+
+        queryset = view.filter_queryset(view.get_queryset())
+        paginator = view.paginator
+        ordering = getattr(paginator, 'ordering', None)
+        if ordering:
+            queryset = queryset.order_by(*ordering)[:paginator.page_size + 1]
+        return queryset
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.imports import importer_etudiants
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des étudiants depuis un fichier CSV (colonnes : email, password, "
+        "nom, prenom, tel, filiere, anneeetude, anneeinscrit, datedenaissance)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv', help="Chemin du fichier CSV (UTF-8).")
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help="Nombre de lignes insérées par bulk_create (défaut : 1000).")
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Processus de hachage des mots de passe (défaut : nombre de CPU).")
+
+    def handle(self, *args, **options):
+        try:
+            fichier = open(options['csv'], encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(f"Impossible d'ouvrir le fichier : {e}")
+        with fichier:
+            rapport = importer_etudiants(
+                fichier, batch_size=options['batch_size'],
+                workers=options['workers'])
+
+        for erreur in rapport.erreurs:
+            self.stderr.write(f"Ligne {erreur['ligne']} : {erreur['message']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{rapport.crees}/{rapport.lignes} étudiants importés en "
+            f"{rapport.duree:.2f} s ({rapport.debit:.0f} lignes/s), "
+            f"{len(rapport.erreurs)} erreur(s)."))
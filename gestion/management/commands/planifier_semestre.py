@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from gestion.serializers import PlanificationSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Affecte créneaux et salles aux cours d'un semestre (glouton puis "
+        "recherche locale) et insère les séances générées."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--semestre', required=True)
+        parser.add_argument('--anneeetude')
+        parser.add_argument(
+            '--salles', required=True,
+            help="Salles disponibles, séparées par des virgules (ex. A1,A2,B1).")
+        parser.add_argument('--debut', required=True, help="Premier jour (AAAA-MM-JJ).")
+        parser.add_argument('--semaines', type=int, default=14)
+        parser.add_argument(
+            '--creneaux', help="Heures de début, ex. 08:00,10:00,14:00,16:00.")
+        parser.add_argument('--duree', type=int, default=2,
+                            help="Durée d'une séance en heures (défaut : 2).")
+        parser.add_argument('--temps-max', type=float, default=10,
+                            help="Temps maximal de recherche locale, en secondes.")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Calcule le planning sans insérer les séances.")
+
+    def handle(self, *args, **options):
+        data = {
+            'semestre': options['semestre'],
+            'salles': [s.strip() for s in options['salles'].split(',') if s.strip()],
+            'debut': options['debut'],
+            'semaines': options['semaines'],
+            'duree': options['duree'],
+            'temps_max': options['temps_max'],
+            'appliquer': not options['dry_run'],
+        }
+        if options['anneeetude']:
+            data['anneeetude'] = options['anneeetude']
+        if options['creneaux']:
+            data['creneaux'] = options['creneaux'].split(',')
+
+        serializer = PlanificationSerializer(data=data)
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+        rapport = serializer.save()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{rapport['placees']}/{rapport['demandes']} créneaux placés pour "
+            f"{rapport['cours']} cours, {rapport['seances']} séances "
+            f"{'générées' if options['dry_run'] else 'insérées'} "
+            f"en {rapport['duree']:.2f} s (coût {rapport['cout']}, "
+            f"{rapport['iterations']} itérations)."))
+        if rapport['non_planifies']:
+            self.stderr.write(
+                f"Cours non planifiés : {', '.join(map(str, rapport['non_planifies']))}")
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken)
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les jetons de rafraîchissement expirés (OutstandingToken et "
+        "leur entrée BlacklistedToken) par lots. À planifier chaque nuit "
+        "(cron, Heroku Scheduler) : un jeton expiré est refusé avant toute "
+        "consultation de la liste noire, sa ligne ne sert plus à rien."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help="Nombre de jetons supprimés par transaction (défaut : 5000).")
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Compte les jetons expirés sans les supprimer.")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        expires = OutstandingToken.objects.filter(expires_at__lt=timezone.now())
+        if options['dry_run']:
+            self.stdout.write(f"{expires.count()} jetons expirés sur "
+                              f"{OutstandingToken.objects.count()}.")
+            return
+
+        debut = time.monotonic()
+        supprimes = 0
+        while True:
+            # Lots courts : pas de verrou prolongé sur les tables en production
+            ids = list(expires.order_by().values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(id__in=ids).delete()
+            supprimes += len(ids)
+
+        duree = time.monotonic() - debut
+        self.stdout.write(self.style.SUCCESS(
+            f"{supprimes} jetons expirés supprimés en {duree:.2f} s ; "
+            f"{OutstandingToken.objects.count()} jetons restants, "
+            f"{BlacklistedToken.objects.count()} en liste noire."))
@@ -0,0 +1,35 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from gestion import televersements
+from gestion.models import TeleversementSoumission
+
+
+class Command(BaseCommand):
+    help = (
+        "Supprime les envois par morceaux abandonnés (aucun morceau reçu depuis "
+        "--hours heures) et leur fichier partiel. À planifier chaque nuit."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--hours', type=int, default=48,
+            help="Ancienneté du dernier morceau reçu, en heures (défaut : 48).")
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help="Compte les envois abandonnés sans les supprimer.")
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - datetime.timedelta(hours=options['hours'])
+        abandonnes = TeleversementSoumission.objects.filter(date_maj__lt=limite)
+        if options['dry_run']:
+            self.stdout.write(f"{abandonnes.count()} envois abandonnés.")
+            return
+
+        supprimes = 0
+        for televersement in abandonnes.iterator():
+            televersements.supprimer(televersement)
+            supprimes += 1
+        self.stdout.write(self.style.SUCCESS(f"{supprimes} envois abandonnés supprimés."))
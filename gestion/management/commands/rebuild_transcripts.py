@@ -0,0 +1,40 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from gestion.releves import reconstruire_releves
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Recalcule tous les relevés de notes (table Releve) par lots d'étudiants."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Nombre d'étudiants traités par lot (défaut : 500).")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        debut = time.monotonic()
+        etudiants = releves = 0
+
+        lot = []
+        ids = (User.objects.filter(role='etudiant').order_by('id')
+               .values_list('id', flat=True).iterator(chunk_size=batch_size))
+        for etudiant_id in ids:
+            lot.append(etudiant_id)
+            if len(lot) == batch_size:
+                releves += len(reconstruire_releves(lot))
+                etudiants += len(lot)
+                lot = []
+        if lot:
+            releves += len(reconstruire_releves(lot))
+            etudiants += len(lot)
+
+        duree = time.monotonic() - debut
+        self.stdout.write(self.style.SUCCESS(
+            f"{releves} relevés recalculés pour {etudiants} étudiants "
+            f"en {duree:.2f} s."))
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('gestion', '0005_alter_inscription_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cours',
+            index=models.Index(fields=['anneeetude', 'semestre'], name='cours_annee_semestre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='exercice',
+            index=models.Index(fields=['date_limite'], name='exercice_date_limite_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['etudiant', 'cours'], name='note_etudiant_cours_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seance',
+            index=models.Index(fields=['date', 'heure_debut'], name='seance_date_heure_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role'], name='user_role_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(condition=models.Q(('role', 'etudiant')), fields=['filiere', 'anneeetude'], name='user_etudiant_cohorte_idx'),
+        ),
+    ]
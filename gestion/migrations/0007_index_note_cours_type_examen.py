@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0006_index_colonnes_filtrees'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['cours', 'type_examen'], name='note_cours_type_examen_idx'),
+        ),
+    ]
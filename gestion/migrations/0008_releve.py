@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0007_index_note_cours_type_examen'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Releve',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semestre', models.CharField(max_length=10)),
+                ('anneeetude', models.CharField(max_length=20)),
+                ('moyenne', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('volumehoraire', models.DecimalField(decimal_places=2, max_digits=7)),
+                ('nombre_cours', models.PositiveIntegerField()),
+                ('date_maj', models.DateTimeField(auto_now=True)),
+                ('etudiant', models.ForeignKey(limit_choices_to={'role': 'etudiant'}, on_delete=django.db.models.deletion.CASCADE, related_name='releves', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('etudiant', 'semestre', 'anneeetude'), name='unique_releve')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0008_releve'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='seance',
+            index=models.Index(fields=['salle', 'date', 'heure_debut'], name='seance_salle_date_idx'),
+        ),
+    ]
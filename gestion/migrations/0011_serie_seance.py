@@ -0,0 +1,34 @@
+# Generated by Django 5.1.4 on 2026-10-18 11:45
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0010_index_seance_salle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerieSeance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequence', models.CharField(choices=[('hebdomadaire', 'Hebdomadaire'), ('bihebdomadaire', 'Toutes les deux semaines')], default='hebdomadaire', max_length=20)),
+                ('date_debut', models.DateField()),
+                ('date_fin', models.DateField()),
+                ('exclusions', models.JSONField(blank=True, default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('duree', models.IntegerField()),
+                ('heure_debut', models.TimeField()),
+                ('salle', models.CharField(max_length=10)),
+                ('cours', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='gestion.cours')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='seance',
+            name='serie',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='seances', to='gestion.serieseance'),
+        ),
+    ]
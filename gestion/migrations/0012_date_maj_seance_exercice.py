@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0011_serie_seance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exercice',
+            name='date_maj',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='seance',
+            name='date_maj',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
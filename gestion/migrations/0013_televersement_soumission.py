@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:03
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0012_date_maj_seance_exercice'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeleversementSoumission',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nom_fichier', models.CharField(max_length=255)),
+                ('taille', models.PositiveBigIntegerField()),
+                ('sha256', models.CharField(max_length=64)),
+                ('recu', models.PositiveBigIntegerField(default=0)),
+                ('date_creation', models.DateTimeField(auto_now_add=True)),
+                ('date_maj', models.DateTimeField(auto_now=True)),
+                ('createur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('etudiant', models.ForeignKey(limit_choices_to={'role': 'etudiant'}, on_delete=django.db.models.deletion.CASCADE, related_name='televersements', to=settings.AUTH_USER_MODEL)),
+                ('exercice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='gestion.exercice')),
+            ],
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:12
+
+import secrets
+
+from django.db import migrations, models
+
+
+def generer_cles(apps, schema_editor):
+    # Une clé distincte par compte : les liens d'abonnement existants
+    # (signés avec le hash du mot de passe) sont à récupérer à nouveau.
+    User = apps.get_model('gestion', 'User')
+    comptes = list(User.objects.only('id'))
+    for user in comptes:
+        user.cle_calendrier = secrets.token_hex(16)
+    User.objects.bulk_update(comptes, ['cle_calendrier'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0013_televersement_soumission'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='cle_calendrier',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(generer_cles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0014_cle_calendrier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='version_jetons',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:25
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0015_version_jetons'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cours',
+            name='date_maj',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 12:26
+
+import secrets
+
+import gestion.models
+from django.db import migrations, models
+
+
+def completer_cles(apps, schema_editor):
+    # Comptes importés par bulk_create depuis 0014, sans clé : elle était
+    # générée (et leurs liens révoqués) au premier save(). Générée ici.
+    User = apps.get_model('gestion', 'User')
+    comptes = list(User.objects.filter(cle_calendrier='').only('id'))
+    for user in comptes:
+        user.cle_calendrier = secrets.token_hex(16)
+    User.objects.bulk_update(comptes, ['cle_calendrier'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion', '0016_date_maj_cours'),
+    ]
+
+    operations = [
+        migrations.RunPython(completer_cles, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='cle_calendrier',
+            field=models.CharField(default=gestion.models.nouvelle_cle_calendrier, editable=False, max_length=32),
+        ),
+    ]
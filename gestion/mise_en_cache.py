@@ -0,0 +1,88 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+CACHE_TIMEOUT = 5 * 60
+# Vues dont les réponses sont mises en cache (noms des compteurs)
+ENDPOINTS = set()
+
+
+def cle_version(modele):
+    return f'gestion:version:{modele._meta.label_lower}'
+
+
+def versions(modeles):
+    """
+    Version courante de chaque modèle, en un seul aller-retour au cache.
+    Une version évincée repart d'une valeur nouvelle (horodatage) et non
+    de 1, pour ne pas ressusciter d'anciennes entrées.
+    """
+    cles = [cle_version(m) for m in modeles]
+    courantes = cache.get_many(cles)
+    for cle in cles:
+        if cle not in courantes:
+            cache.add(cle, time.time_ns(), None)
+            courantes[cle] = cache.get(cle)
+    return [courantes[cle] for cle in cles]
+
+
+def incrementer(cle, initiale):
+    try:
+        cache.incr(cle)
+    except ValueError:
+        cache.add(cle, initiale, None)
+
+
+def invalider(*modeles):
+    """
+    Invalide toutes les entrées construites à partir de ces modèles.
+    La version est aussi incrémentée au commit : une lecture concurrente
+    faite avant le commit ne reste pas en cache sous la nouvelle version.
+    """
+    def incrementer_versions():
+        for modele in modeles:
+            incrementer(cle_version(modele), time.time_ns())
+
+    incrementer_versions()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(incrementer_versions)
+
+
+# Compteurs de succès / échecs, par vue
+
+def compter(nom, resultat):
+    incrementer(f'gestion:cache-stats:{nom}:{resultat}', 1)
+
+
+def statistiques():
+    cles = {(nom, r): f'gestion:cache-stats:{nom}:{r}'
+            for nom in ENDPOINTS for r in ('hits', 'misses')}
+    valeurs = cache.get_many(cles.values())
+    stats = {}
+    for (nom, r), cle in sorted(cles.items()):
+        stats.setdefault(nom, {})[r] = valeurs.get(cle, 0)
+    for compteurs in stats.values():
+        total = compteurs['hits'] + compteurs['misses']
+        compteurs['taux'] = round(compteurs['hits'] / total, 3) if total else None
+    return stats
+
+
+def obtenir(nom, modeles, cle, construire, timeout=CACHE_TIMEOUT):
+    """
+    Valeur en cache pour (nom, cle) à la version courante des modèles lus,
+    sinon construite puis mise en cache. Sert aux réponses comme aux
+    résultats de querysets (à évaluer dans `construire`).
+    """
+    empreinte = hashlib.md5(
+        repr((cle, versions(modeles))).encode()).hexdigest()
+    cle_cache = f'gestion:cache:{nom}:{empreinte}'
+    valeur = cache.get(cle_cache)
+    if valeur is not None:
+        compter(nom, 'hits')
+        return valeur
+    compter(nom, 'misses')
+    valeur = construire()
+    cache.set(cle_cache, valeur, timeout)
+    return valeur
@@ -0,0 +1,346 @@
+import csv
+import hashlib
+import io
+
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from rest_framework import serializers, status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.response import Response
+
+from . import mise_en_cache
+
+
+class EagerLoadingMixin:
+    """
+    Mixin pour les vues génériques : charge d'avance les relations
+    parcourues par le serializer afin d'éviter les requêtes N+1.
+
+    Chaque vue déclare les relations dont elle a besoin :
+        select_related_fields = ('etudiant', 'cours')
+        prefetch_related_fields = ('inscriptions',)
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+
+class CacheMixin:
+    """
+    Met en cache la réponse GET d'une vue (URL complète, filtres compris).
+    Les entrées sont versionnées par modèle : toute écriture sur un des
+    modèles lus rend les anciennes réponses inaccessibles (gestion.signals).
+
+        cache_modeles = (Cours,)
+        cache_par_utilisateur = True  # si le contenu dépend de request.user
+    """
+    cache_modeles = ()
+    cache_par_utilisateur = False
+    cache_timeout = mise_en_cache.CACHE_TIMEOUT
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.cache_modeles:
+            mise_en_cache.ENDPOINTS.add(cls.__name__)
+
+    def get(self, request, *args, **kwargs):
+        cle = (request.build_absolute_uri(),
+               request.user.pk if self.cache_par_utilisateur else None)
+        data = mise_en_cache.obtenir(
+            type(self).__name__, self.cache_modeles, cle,
+            lambda: super(CacheMixin, self).get(request, *args, **kwargs).data,
+            self.cache_timeout)
+        return Response(data)
+
+
+def valeurs_ligne(objet):
+    if objet is None:
+        return None
+    return tuple(getattr(objet, champ.attname) for champ in objet._meta.concrete_fields)
+
+
+def etag_correspond(etag, entete, faible=False):
+    """Comparaison d'un ETag à un en-tête If-Match / If-None-Match."""
+    if not entete:
+        return False
+    etags = parse_etags(entete)
+    if faible:
+        etags = [e.removeprefix('W/') for e in etags]
+    return '*' in etags or etag in etags
+
+
+class PreconditionFailed(APIException):
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "La ressource a été modifiée depuis votre dernière lecture."
+    default_code = 'precondition_failed'
+
+
+class ETagMixin:
+    """
+    Requêtes conditionnelles pour les vues de détail. L'ETag est une
+    empreinte des colonnes de la ligne (et des relations chargées d'avance
+    par EagerLoadingMixin), calculée sans passer par le serializer :
+    - GET avec If-None-Match à jour : 304 sans sérialisation ;
+    - PUT / PATCH / DELETE avec If-Match périmé : 412 (mise à jour perdue).
+    """
+
+    def version(self, instance):
+        valeurs = [valeurs_ligne(instance)]
+        for relation in getattr(self, 'select_related_fields', ()):
+            valeurs.append(valeurs_ligne(getattr(instance, relation)))
+        for relation in getattr(self, 'prefetch_related_fields', ()):
+            valeurs.append([valeurs_ligne(o) for o in getattr(instance, relation).all()])
+        return valeurs
+
+    def etag(self, instance):
+        return '"%s"' % hashlib.sha1(repr(self.version(instance)).encode()).hexdigest()
+
+    def verifier_if_match(self, instance):
+        entete = self.request.headers.get('If-Match')
+        if entete and not etag_correspond(self.etag(instance), entete):
+            raise PreconditionFailed()
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self.etag(instance)
+        if etag_correspond(etag, request.headers.get('If-None-Match'), faible=True):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+        return Response(self.get_serializer(instance).data, headers={'ETag': etag})
+
+    def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
+        instance = self.get_object()
+        self.verifier_if_match(instance)
+        serializer = self.get_serializer(instance, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        if getattr(instance, '_prefetched_objects_cache', None):
+            instance._prefetched_objects_cache = {}
+        return Response(serializer.data, headers={'ETag': self.etag(serializer.instance)})
+
+    def destroy(self, request, *args, **kwargs):
+        instance = self.get_object()
+        self.verifier_if_match(instance)
+        self.perform_destroy(instance)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+def lire_liste(valeur):
+    return [v.strip() for v in valeur.split(',') if v.strip()]
+
+
+def champs_demandes(request):
+    """
+    ?fields=id,titre,cours.titre -> {'id': None, 'titre': None, 'cours': {'titre'}}
+    (None : tous les sous-champs). None sans paramètre `fields`.
+    """
+    if 'fields' not in request.query_params:
+        return None
+    champs = {}
+    for nom in lire_liste(request.query_params['fields']):
+        nom, _, sous_champ = nom.partition('.')
+        if not sous_champ:
+            champs[nom] = None
+        elif champs.get(nom, set()) is not None:
+            champs.setdefault(nom, set()).add(sous_champ)
+    return champs
+
+
+def refuser_champs_inconnus(inconnus):
+    if inconnus:
+        raise ValidationError(
+            {'fields': f"Champs inconnus : {', '.join(sorted(inconnus))}."})
+
+
+def colonnes_pagination(view):
+    return [champ.lstrip('-') for champ in getattr(view.paginator, 'ordering', ())]
+
+
+class ValuesListMixin:
+    """
+    GET de liste servi par un ValuesSerializer (QuerySet.values()) ; les
+    écritures passent toujours par `serializer_class`. ?fields= limite
+    les colonnes lues et la sortie.
+
+        values_serializer_class = CoursValuesSerializer
+    """
+    values_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        lecture = self.values_serializer_class
+        champs = champs_demandes(request)
+        if champs is not None:
+            # Sérialisation plate : pas de sous-champs
+            refuser_champs_inconnus(
+                [nom for nom in champs if nom not in lecture.noms()]
+                + [f'{nom}.{s}' for nom, sous in champs.items() if sous for s in sous])
+        colonnes = lecture.colonnes(champs)
+        colonnes += [c for c in colonnes_pagination(self) if c not in colonnes]
+        queryset = self.filter_queryset(self.get_queryset()).values(*colonnes)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(lecture.serialiser(page, champs))
+        return Response(lecture.serialiser(queryset, champs))
+
+
+class SparseFieldsMixin:
+    """
+    ?fields= et ?expand= sur un GET de liste servi par un serializer à
+    ChampsDynamiquesMixin :
+        ?fields=id,cours.titre   champs renvoyés (sous-champs des relations imbriquées)
+        ?expand=cours            relations imbriquées, les autres en PK ;
+                                 ?expand= seul : aucune
+    Les colonnes lues sont restreintes en conséquence (only()), et seules
+    les relations imbriquées sont jointes (select_related).
+    """
+
+    def parametres_sparse(self):
+        if not hasattr(self, '_parametres_sparse'):
+            request = self.request
+            champs = champs_demandes(request)
+            developper = (set(lire_liste(request.query_params['expand']))
+                          if 'expand' in request.query_params else None)
+            classe = self.get_serializer_class()
+            if developper is not None:
+                inconnues = developper - set(classe.relations_developpables)
+                if inconnues:
+                    raise ValidationError(
+                        {'expand': f"Relations inconnues : {', '.join(sorted(inconnues))}."})
+            if champs is not None:
+                lisibles = classe(context=self.get_serializer_context(),
+                                  developper=developper).fields
+                inconnus = []
+                for nom, sous in champs.items():
+                    champ = lisibles.get(nom)
+                    if champ is None or champ.write_only:
+                        inconnus.append(nom)
+                    elif sous:
+                        noms = champ.fields if isinstance(champ, serializers.BaseSerializer) else {}
+                        inconnus += [f'{nom}.{s}' for s in sous if s not in noms]
+                refuser_champs_inconnus(inconnus)
+            self._parametres_sparse = champs, developper
+        return self._parametres_sparse
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method == 'GET':
+            champs, developper = self.parametres_sparse()
+            kwargs.setdefault('champs', champs)
+            kwargs.setdefault('developper', developper)
+        return super().get_serializer(*args, **kwargs)
+
+    def restreindre(self, queryset):
+        champs, developper = self.parametres_sparse()
+        if champs is None and developper is None:
+            return queryset
+        colonnes = {queryset.model._meta.pk.name, *colonnes_pagination(self)}
+        relations = []
+        for champ in self.get_serializer().fields.values():
+            if champ.write_only:
+                continue
+            if champ.source == '*':
+                return queryset  # champ calculé sur l'instance entière
+            if isinstance(champ, serializers.BaseSerializer):
+                relations.append(champ.source)
+                liee = queryset.model._meta.get_field(champ.source).related_model
+                colonnes.add(f'{champ.source}__{liee._meta.pk.name}')
+                colonnes.update(f'{champ.source}__{sous.source}'
+                                for sous in champ.fields.values() if not sous.write_only)
+            else:
+                colonnes.add(champ.source.replace('.', '__'))
+        queryset = queryset.select_related(None)
+        if relations:  # select_related() sans argument suivrait toutes les clés
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*colonnes)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.restreindre(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+
+class Echo:
+    """Pseudo-fichier pour csv.writer : renvoie la ligne au lieu de l'écrire."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Rend les exports négociables (Accept: text/csv). Le contenu des exports
+    est diffusé par StreamingHttpResponse ; ce renderer ne sert qu'aux
+    réponses d'erreur, une ligne par message.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        tampon = io.StringIO()
+        writer = csv.writer(tampon)
+        for cle, valeur in data.items():
+            writer.writerow([cle, valeur])
+        return tampon.getvalue().encode(self.charset)
+
+
+class CSVExportMixin:
+    """
+    Export CSV en flux d'une vue de liste : mêmes filtres et même périmètre
+    que la liste (get_queryset / filter_queryset). Les lignes sont lues par
+    pages de export_chunk_size dans l'ordre des clés primaires (pk > dernière
+    clé lue, LIMIT) : la mémoire reste constante même sous MySQL, où
+    mysqlclient n'a pas de curseur côté serveur et QuerySet.iterator()
+    charge tout le résultat.
+
+    Chaque vue déclare les colonnes exportées :
+        export_fields = [('Email', 'etudiant__email'), ...]
+        export_filename = 'notes.csv'
+    """
+    export_fields = ()
+    export_filename = 'export.csv'
+    export_chunk_size = 2000
+    http_method_names = ['get', 'head', 'options']
+    renderer_classes = [JSONRenderer, CSVRenderer]
+    pagination_class = None
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        entetes = [entete for entete, _ in self.export_fields]
+        champs = [champ for _, champ in self.export_fields]
+        taille = self.export_chunk_size
+        pages = queryset.values_list('pk', *champs).order_by('pk')
+
+        def lignes():
+            page = list(pages[:taille])
+            while page:
+                for _, *ligne in page:
+                    yield ligne
+                if len(page) < taille:
+                    break
+                page = list(pages.filter(pk__gt=page[-1][0])[:taille])
+
+        writer = csv.writer(Echo())
+
+        def contenu():
+            # BOM : Excel détecte ainsi l'UTF-8 (accents des noms)
+            yield '\ufeff' + writer.writerow(entetes)
+            for ligne in lignes():
+                yield writer.writerow(ligne)
+
+        response = StreamingHttpResponse(contenu(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="{self.export_filename}"'
+        return response
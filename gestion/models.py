@@ -1,7 +1,12 @@
+import secrets
+import uuid
+
 from django.db import models
+from django.db.models import F
 from django.contrib.auth.models import AbstractUser, Group, Permission
 
 from django.contrib.auth.base_user import BaseUserManager
+from django.core.serializers.json import DjangoJSONEncoder
 
 
 # --------------------------- #
@@ -39,6 +44,10 @@ class UserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
     
 
+def nouvelle_cle_calendrier():
+    return secrets.token_hex(16)
+
+
 class User(AbstractUser):
     ROLE_CHOICES = [
         ('etudiant', 'Étudiant'),
@@ -68,6 +77,16 @@ class User(AbstractUser):
     datedenaissance = models.DateField(blank=True, null=True)  # Pour étudiant
     # Pour étudiant
 
+    # Secret des liens d'abonnement au calendrier (gestion.calendrier.jeton),
+    # renouvelé à chaque changement de mot de passe. Valeur par défaut : les
+    # comptes créés par bulk_create (imports) en ont une aussi.
+    cle_calendrier = models.CharField(
+        max_length=32, default=nouvelle_cle_calendrier, editable=False)
+    # Filigrane des jetons JWT (revendication `ver`) : incrémenté à chaque
+    # modification du compte, il invalide la lecture sans requête des jetons
+    # émis avant (voir gestion.authentication)
+    version_jetons = models.PositiveIntegerField(default=0, editable=False)
+
     # Modification des related_name pour éviter les conflits
     groups = models.ManyToManyField(
         Group, 
@@ -86,6 +105,15 @@ class User(AbstractUser):
     # Utilisez le gestionnaire personnalisé
     objects = UserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role'], name='user_role_idx'),
+            # Index partiel : uniquement les étudiants (ignoré par MySQL)
+            models.Index(
+                fields=['filiere', 'anneeetude'],
+                condition=models.Q(role='etudiant'),
+                name='user_etudiant_cohorte_idx'),
+        ]
 
     def __str__(self):
         if self.nom and self.prenom:
@@ -102,8 +130,25 @@ class User(AbstractUser):
             self.is_staff = True
             self.is_superuser = True
             self.is_active = True
-        
+
+        # Nouveau mot de passe (set_password) : les anciens liens de calendrier
+        # sont révoqués. Un simple réhachage du même mot de passe ne compte pas
+        # (_password remis à None, voir AbstractBaseUser.check_password).
+        if self._password is not None:
+            self.cle_calendrier = nouvelle_cle_calendrier()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'cle_calendrier'}
+
+        # Incrément en SQL : une instance périmée ne fait pas reculer le filigrane
+        modification = not self._state.adding
+        if modification:
+            self.version_jetons = F('version_jetons') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version_jetons'}
+
         super().save(*args, **kwargs)
+        if modification:
+            self.refresh_from_db(fields=['version_jetons'])
 
     def is_etudiant(self):
         return self.role == "etudiant"
@@ -129,10 +174,38 @@ class Cours(models.Model):
     anneeetude = models.CharField(max_length=20)
     enseignant = models.ForeignKey(
         User, on_delete=models.CASCADE, limit_choices_to={'role': 'enseignant'})
+    # Version du calendrier (gestion.calendrier) : le titre y apparaît
+    date_maj = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['anneeetude', 'semestre'],
+                         name='cours_annee_semestre_idx'),
+        ]
     
     def __str__(self):
         return self.titre
 
+# Série de séances récurrentes (cours hebdomadaire, TD une semaine sur deux...)
+class SerieSeance(models.Model):
+    FREQUENCE_CHOICES = [
+        ('hebdomadaire', 'Hebdomadaire'),
+        ('bihebdomadaire', 'Toutes les deux semaines'),
+    ]
+    cours = models.ForeignKey(Cours, on_delete=models.CASCADE)
+    frequence = models.CharField(
+        max_length=20, choices=FREQUENCE_CHOICES, default='hebdomadaire')
+    date_debut = models.DateField()
+    date_fin = models.DateField()
+    # Dates sans séance (jours fériés, vacances), au format AAAA-MM-JJ
+    exclusions = models.JSONField(default=list, blank=True, encoder=DjangoJSONEncoder)
+    duree = models.IntegerField()
+    heure_debut = models.TimeField()
+    salle = models.CharField(max_length=10)
+
+    def __str__(self):
+        return f"{self.cours.titre} - {self.salle} ({self.get_frequence_display()})"
+
 # Modèle des séances
 class Seance(models.Model):
     cours = models.ForeignKey(Cours, on_delete=models.CASCADE)
@@ -140,6 +213,20 @@ class Seance(models.Model):
     date = models.DateField()
     heure_debut = models.TimeField()
     salle = models.CharField(max_length=10)
+    serie = models.ForeignKey(
+        SerieSeance, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='seances')
+    date_maj = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Ordre chronologique utilisé par la pagination des séances
+            models.Index(fields=['date', 'heure_debut'],
+                         name='seance_date_heure_idx'),
+            # Détection des conflits de salle (gestion.planning)
+            models.Index(fields=['salle', 'date', 'heure_debut'],
+                         name='seance_salle_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.cours.titre} - {self.salle}"
@@ -176,6 +263,14 @@ class Note(models.Model):
     note = models.DecimalField(max_digits=4, decimal_places=2)
     explication = models.TextField()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['etudiant', 'cours'],
+                         name='note_etudiant_cours_idx'),
+            models.Index(fields=['cours', 'type_examen'],
+                         name='note_cours_type_examen_idx'),
+        ]
+
     def __str__(self):
         return f"{self.etudiant.nom} - {self.cours.titre} : {self.note}"
 
@@ -185,6 +280,13 @@ class Exercice(models.Model):
     titre_exercice = models.CharField(max_length=50)
     date_limite = models.DateTimeField()
     type_exercice = models.CharField(max_length=20)
+    date_maj = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['date_limite'],
+                         name='exercice_date_limite_idx'),
+        ]
 
     def __str__(self):
         return f"{self.cours.titre}"
@@ -209,3 +311,49 @@ class SoumissionExercice(models.Model):
 
     def __str__(self):
         return f"Soumission de {self.etudiant} pour {self.exercice}"
+
+
+# Envoi par morceaux d'un fichier de soumission, en cours (voir
+# gestion.televersements) : la SoumissionExercice est créée à la fin
+class TeleversementSoumission(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    createur = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    etudiant = models.ForeignKey(
+        User, on_delete=models.CASCADE, limit_choices_to={'role': 'etudiant'},
+        related_name='televersements')
+    exercice = models.ForeignKey(Exercice, on_delete=models.CASCADE)
+    nom_fichier = models.CharField(max_length=255)
+    taille = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    # Octets reçus et écrits sur disque : position du prochain morceau
+    recu = models.PositiveBigIntegerField(default=0)
+    date_creation = models.DateTimeField(auto_now_add=True)
+    date_maj = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Téléversement {self.nom_fichier} ({self.recu}/{self.taille})"
+
+
+# Relevé de notes : moyenne pondérée par semestre, dénormalisée
+# et maintenue à partir des notes (voir gestion.releves)
+class Releve(models.Model):
+    etudiant = models.ForeignKey(
+        User, on_delete=models.CASCADE, limit_choices_to={'role': 'etudiant'},
+        related_name='releves')
+    semestre = models.CharField(max_length=10)
+    anneeetude = models.CharField(max_length=20)
+    moyenne = models.DecimalField(max_digits=4, decimal_places=2)
+    # Somme des volumes horaires des cours notés (coefficients)
+    volumehoraire = models.DecimalField(max_digits=7, decimal_places=2)
+    nombre_cours = models.PositiveIntegerField()
+    date_maj = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['etudiant', 'semestre', 'anneeetude'],
+                name='unique_releve')
+        ]
+
+    def __str__(self):
+        return f"{self.etudiant} - {self.anneeetude} {self.semestre} : {self.moyenne}"
@@ -0,0 +1,178 @@
+import base64
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur sur des clés indexées (keyset).
+
+    Le curseur contient les valeurs des champs de `ordering` de la dernière
+    (ou première) ligne de la page : la page suivante est obtenue par un
+    WHERE sur ces valeurs, sans OFFSET, donc en temps constant quelle que
+    soit la profondeur. Le dernier champ de `ordering` doit être unique
+    (en général `id`) pour garantir un ordre total et stable.
+
+    La pagination est activée dès que le client envoie `cursor` ou
+    `page_size` ; sans ces paramètres la liste complète est renvoyée,
+    comme auparavant, pour les tableaux de bord existants.
+    """
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE or 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Curseur invalide.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (self.cursor_query_param not in params
+                and self.page_size_query_param not in params):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        ordering = self.get_ordering(reverse)
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except (ValueError, ValidationError):
+            # Valeurs du curseur incompatibles avec le type des champs
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self.previous_position = None
+        if results:
+            first, last = results[0], results[-1]
+            if has_more or position is not None:
+                if reverse:
+                    self.next_position = self.position_of(last)
+                    if has_more:
+                        self.previous_position = self.position_of(first)
+                else:
+                    self.previous_position = (
+                        self.position_of(first) if position is not None else None)
+                    if has_more:
+                        self.next_position = self.position_of(last)
+        elif position is not None:
+            # Page vide : on permet de revenir en arrière depuis la position
+            if reverse:
+                self.next_position = position
+            else:
+                self.previous_position = position
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in self.ordering)
+
+    def after(self, ordering, position):
+        """
+        Condition « strictement après `position` » dans l'ordre lexicographique
+        de `ordering` : (a > x) OR (a = x AND b > y) OR ...
+        """
+        conditions = []
+        for i, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            egalites = {
+                previous.lstrip('-'): position[j]
+                for j, previous in enumerate(ordering[:i])}
+            conditions.append(Q(**egalites, **{f'{name}__{lookup}': position[i]}))
+        return reduce(or_, conditions)
+
+    def position_of(self, instance):
+        position = []
+        for field in self.ordering:
+            name = field.lstrip('-')
+            # Lignes de QuerySet.values() (ValuesListMixin) ou instances
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            position.append(value if isinstance(value, int) else str(value))
+        return position
+
+    # Encodage du curseur
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position, reverse = payload['p'], bool(payload.get('r', False))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = True
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+
+class SeancePagination(KeysetPagination):
+    # Les séances sont parcourues dans l'ordre chronologique
+    ordering = ('date', 'heure_debut', 'id')
@@ -0,0 +1,51 @@
+from rest_framework import permissions
+
+from .models import Cours
+
+
+class IsSecretaire(permissions.BasePermission):
+    """Réservé au secrétariat (opérations en masse)."""
+    message = "Cette opération est réservée au secrétariat."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.is_secretaire())
+
+
+class IsEtudiant(permissions.BasePermission):
+    message = "Cette page est réservée aux étudiants."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.is_etudiant())
+
+
+class IsEnseignant(permissions.BasePermission):
+    message = "Cette page est réservée aux enseignants."
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and user.is_enseignant())
+
+
+class IsSecretaireOuEnseignantDuCours(permissions.BasePermission):
+    """
+    Secrétariat, ou enseignant du cours `cours_id` du corps de la requête.
+    Vérifié avant la validation : un autre utilisateur reçoit un 403 sans
+    détail sur les données envoyées.
+    """
+    message = "Seul l'enseignant du cours peut saisir ces notes."
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not (user and user.is_authenticated):
+            return False
+        if user.is_secretaire():
+            return True
+        if not user.is_enseignant():
+            return False
+        try:
+            cours_id = int(request.data.get('cours_id'))
+        except (AttributeError, TypeError, ValueError):
+            return False
+        return Cours.objects.filter(id=cours_id, enseignant_id=user.id).exists()
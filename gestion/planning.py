@@ -0,0 +1,181 @@
+import heapq
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date as Date, time, timedelta
+
+from django.db.models import F, Q
+
+from .models import Seance
+
+# Seance.duree est exprimée en heures (cf. formulaires des tableaux de bord)
+MINUTES_PAR_HEURE = 60
+
+
+def minutes(heure):
+    return heure.hour * 60 + heure.minute
+
+
+def intervalle(heure_debut, duree):
+    """Intervalle [début, fin) d'une séance, en minutes depuis minuit."""
+    debut = minutes(heure_debut)
+    return debut, debut + duree * MINUTES_PAR_HEURE
+
+
+class IndexIntervalles:
+    """
+    Index d'intervalles par clé (salle et date, enseignant et date).
+
+    Pour chaque clé, les intervalles sont gardés triés par début, avec la
+    plus grande fin de chaque préfixe. Les intervalles chargés peuvent déjà
+    se chevaucher entre eux (données existantes) : un nouvel intervalle
+    [debut, fin) est en conflit si, parmi ceux qui commencent avant `fin`,
+    la plus grande fin dépasse `debut`. Recherche en O(log n).
+    """
+
+    def __init__(self):
+        self.debuts = defaultdict(list)
+        self.intervalles = defaultdict(list)
+        # fins_max[cle][i] : (plus grande fin, identifiant) sur intervalles[:i + 1]
+        self.fins_max = defaultdict(list)
+
+    def conflit(self, cle, debut, fin):
+        """Identifiant d'un intervalle qui chevauche [debut, fin), ou None."""
+        i = bisect_left(self.debuts[cle], fin)
+        if i > 0 and self.fins_max[cle][i - 1][0] > debut:
+            return self.fins_max[cle][i - 1][1]
+        return None
+
+    def ajouter(self, cle, debut, fin, ident=None):
+        i = bisect_left(self.debuts[cle], debut)
+        self.debuts[cle].insert(i, debut)
+        self.intervalles[cle].insert(i, (debut, fin, ident))
+        self.recalculer(cle, i)
+
+    def recalculer(self, cle, depuis=0):
+        maxima = self.fins_max[cle]
+        del maxima[depuis:]
+        for _, fin, ident in self.intervalles[cle][depuis:]:
+            maxima.append(maxima[-1] if maxima and maxima[-1][0] >= fin else (fin, ident))
+
+    def charger(self, seances):
+        """Charge des séances existantes (dictionnaires de `valeurs_seances`)."""
+        cles = set()
+        for s in seances:
+            debut, fin = intervalle(s['heure_debut'], s['duree'])
+            for cle in cles_seance(s):
+                self.intervalles[cle].append((debut, fin, s['id']))
+                cles.add(cle)
+        # Tri et maxima une fois par clé, pas à chaque séance
+        for cle in cles:
+            self.intervalles[cle].sort(key=lambda i: i[0])
+            self.debuts[cle] = [i[0] for i in self.intervalles[cle]]
+            self.recalculer(cle)
+
+
+def cles_seance(seance):
+    """Ressources occupées par une séance : la salle et l'enseignant, ce jour-là."""
+    return (
+        ('salle', seance['salle'], seance['date']),
+        ('enseignant', seance['enseignant_id'], seance['date']),
+    )
+
+
+def valeurs_seances(queryset):
+    return queryset.values(
+        'id', 'cours_id', 'salle', 'date', 'heure_debut', 'duree',
+        enseignant_id=F('cours__enseignant_id'))
+
+
+def conflits_pour(cours, date, heure_debut, duree, salle, exclure=None,
+                  verrouiller=False):
+    """
+    Séances existantes qui chevauchent la séance proposée, dans la même salle
+    ou avec le même enseignant. Seules les séances du jour commençant avant la
+    fin proposée sont lues (index seance_salle_date_idx / seance_date_heure_idx).
+    Avec verrouiller=True (dans une transaction), les séances lues sont
+    verrouillées jusqu'au commit.
+    """
+    debut, fin = intervalle(heure_debut, duree)
+    candidates = Seance.objects.filter(date=date)
+    if fin < 24 * 60:
+        candidates = candidates.filter(heure_debut__lt=time(fin // 60, fin % 60))
+    candidates = candidates.filter(salle=salle) | candidates.filter(
+        cours__enseignant_id=cours.enseignant_id)
+    if exclure is not None:
+        candidates = candidates.exclude(pk=exclure)
+    if verrouiller:
+        candidates = candidates.select_for_update()
+
+    conflits = []
+    for s in valeurs_seances(candidates):
+        debut_s, fin_s = intervalle(s['heure_debut'], s['duree'])
+        if debut_s < fin and fin_s > debut:
+            motif = 'salle' if s['salle'] == salle else 'enseignant'
+            conflits.append({'type': motif, 'seance': s['id']})
+    return conflits
+
+
+def balayer_conflits(queryset):
+    """
+    Tous les chevauchements d'un ensemble de séances, en un seul balayage trié
+    par (date, heure de début) au lieu d'une comparaison deux à deux :
+    pour chaque ressource, un tas des séances en cours, ordonné par heure de fin.
+    """
+    actives = defaultdict(list)
+    conflits = []
+    for s in valeurs_seances(queryset).order_by('date', 'heure_debut', 'id'):
+        debut, fin = intervalle(s['heure_debut'], s['duree'])
+        for cle in cles_seance(s):
+            tas = actives[cle]
+            while tas and tas[0][0] <= debut:
+                heapq.heappop(tas)
+            for _, autre in tas:
+                conflits.append({
+                    'type': cle[0],
+                    'ressource': cle[1],
+                    'date': s['date'],
+                    'seances': [autre, s['id']],
+                })
+            heapq.heappush(tas, (fin, s['id']))
+    return conflits
+
+
+def dates_serie(date_debut, date_fin, frequence, exclusions=()):
+    """Dates des occurrences d'une série, jours exclus retirés."""
+    pas = timedelta(weeks=2 if frequence == 'bihebdomadaire' else 1)
+    exclues = {Date.fromisoformat(d) if isinstance(d, str) else d for d in exclusions}
+    dates = []
+    date = date_debut
+    while date <= date_fin:
+        if date not in exclues:
+            dates.append(date)
+        date += pas
+    return dates
+
+
+def conflits_serie(cours, dates, heure_debut, duree, salle, serie=None,
+                   verrouiller=False):
+    """
+    Conflits des occurrences d'une série avec les séances existantes.
+    Une requête charge les séances de la salle ou de l'enseignant aux dates
+    concernées dans un IndexIntervalles, puis chaque occurrence y est
+    vérifiée en O(log n). verrouiller=True : comme pour conflits_pour.
+    """
+    existantes = Seance.objects.filter(date__in=dates).filter(
+        Q(salle=salle) | Q(cours__enseignant_id=cours.enseignant_id))
+    if serie is not None:
+        existantes = existantes.exclude(serie=serie)
+    if verrouiller:
+        existantes = existantes.select_for_update()
+    index = IndexIntervalles()
+    index.charger(valeurs_seances(existantes))
+
+    debut, fin = intervalle(heure_debut, duree)
+    conflits = []
+    for date in dates:
+        occurrence = {'salle': salle, 'enseignant_id': cours.enseignant_id, 'date': date}
+        for cle in cles_seance(occurrence):
+            autre = index.conflit(cle, debut, fin)
+            if autre is not None:
+                conflits.append({'type': cle[0], 'date': date, 'seance': autre})
+    return conflits
@@ -0,0 +1,58 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg
+
+from .models import Note, Releve
+
+DEUX_DECIMALES = Decimal('0.01')
+
+
+def calculer_releves(etudiant_ids):
+    """
+    Calcule les relevés des étudiants donnés en une seule requête agrégée :
+    moyenne de chaque cours, puis moyenne pondérée par le volume horaire
+    pour chaque (étudiant, semestre, année d'étude).
+    """
+    moyennes = (
+        Note.objects.filter(etudiant_id__in=etudiant_ids)
+        .values('etudiant_id', 'cours_id', 'cours__semestre',
+                'cours__anneeetude', 'cours__volumehoraire')
+        .annotate(moyenne=Avg('note'))
+        .order_by()
+    )
+
+    groupes = defaultdict(list)
+    for ligne in moyennes:
+        cle = (ligne['etudiant_id'], ligne['cours__semestre'],
+               ligne['cours__anneeetude'])
+        groupes[cle].append(
+            (Decimal(ligne['moyenne']), ligne['cours__volumehoraire']))
+
+    releves = []
+    for (etudiant_id, semestre, anneeetude), cours in groupes.items():
+        volumehoraire = sum(vh for _, vh in cours)
+        if volumehoraire:
+            moyenne = sum(m * vh for m, vh in cours) / volumehoraire
+        else:
+            moyenne = sum(m for m, _ in cours) / len(cours)
+        releves.append(Releve(
+            etudiant_id=etudiant_id,
+            semestre=semestre,
+            anneeetude=anneeetude,
+            moyenne=moyenne.quantize(DEUX_DECIMALES),
+            volumehoraire=volumehoraire,
+            nombre_cours=len(cours),
+        ))
+    return releves
+
+
+def reconstruire_releves(etudiant_ids):
+    """Remplace les relevés des étudiants donnés par des relevés recalculés."""
+    etudiant_ids = list(etudiant_ids)
+    releves = calculer_releves(etudiant_ids)
+    with transaction.atomic():
+        Releve.objects.filter(etudiant_id__in=etudiant_ids).delete()
+        Releve.objects.bulk_create(releves)
+    return releves
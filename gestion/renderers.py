@@ -0,0 +1,143 @@
+import datetime
+import decimal
+import math
+import uuid
+
+from django.conf import settings
+from django.db.models.query import QuerySet
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle : repli sur le JSON de DRF
+    orjson = None
+
+
+def encoder_defaut(obj):
+    """
+    Types qu'orjson ne sérialise pas lui-même, convertis comme le fait
+    rest_framework.utils.encoders.JSONEncoder : la sortie reste identique.
+    """
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if isinstance(obj, datetime.datetime):
+        representation = obj.isoformat()
+        if representation.endswith('+00:00'):
+            representation = representation[:-6] + 'Z'
+        return representation
+    if isinstance(obj, datetime.date):
+        return obj.isoformat()
+    if isinstance(obj, datetime.time):
+        if obj.utcoffset() is not None:
+            raise ValueError("JSON can't represent timezone-aware times.")
+        return obj.isoformat()
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, decimal.Decimal):
+        # Les DecimalField sont déjà rendus en chaînes par les serializers
+        # (COERCE_DECIMAL_TO_STRING) ; un Decimal brut devient un nombre.
+        return float(obj)
+    if isinstance(obj, uuid.UUID):
+        return str(obj)
+    if isinstance(obj, QuerySet):
+        return tuple(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, 'tolist'):  # tableaux et scalaires NumPy
+        return obj.tolist()
+    if hasattr(obj, '__getitem__'):
+        try:
+            return list(obj) if isinstance(obj, (list, tuple)) else dict(obj)
+        except Exception:
+            pass
+    elif hasattr(obj, '__iter__'):
+        return tuple(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Valeurs qui ne peuvent pas être NaN ou infinies
+SCALAIRES_FINIS = frozenset({str, int, bool, type(None)})
+
+
+def contient_non_fini(data):
+    """
+    NaN ou infini dans les données : orjson les rend par null. Parcours
+    itératif ; les conteneurs dont toutes les valeurs sont des scalaires
+    finis (cas courant des lignes sérialisées) sont écartés par map(type, ...),
+    sans boucle Python sur leurs valeurs.
+    """
+    pile = [data]
+    while pile:
+        obj = pile.pop()
+        if isinstance(obj, dict):
+            valeurs = obj.values()
+        elif isinstance(obj, (list, tuple)):
+            valeurs = obj
+        elif isinstance(obj, float):
+            if not math.isfinite(obj):
+                return True
+            continue
+        elif isinstance(obj, decimal.Decimal):
+            if not obj.is_finite():
+                return True
+            continue
+        elif hasattr(obj, 'tolist'):  # tableaux et scalaires NumPy
+            pile.append(obj.tolist())
+            continue
+        else:
+            continue
+        if not SCALAIRES_FINIS.issuperset(map(type, valeurs)):
+            pile.extend(v for v in valeurs if type(v) not in SCALAIRES_FINIS)
+    return False
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer accéléré par orjson, même sortie que celui de DRF : compact,
+    UTF-8 non échappé, U+2028 / U+2029 échappés, Decimal des serializers en
+    chaînes. Sans orjson, ou pour un rendu indenté (API navigable), le rendu
+    de DRF est utilisé ; de même pour NaN et l'infini (ValueError, comme le
+    rendu strict de DRF, et non null), recherchés seulement si la sortie
+    contient null.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if (orjson is None or indent is not None or not self.compact
+                or self.ensure_ascii or not self.strict):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            contenu = orjson.dumps(
+                data, default=encoder_defaut,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            # Entier sur plus de 64 bits, clé non sérialisable... : rendu de DRF
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in contenu and contient_non_fini(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        return (contenu.replace('\u2028'.encode(), b'\\u2028')
+                .replace('\u2029'.encode(), b'\\u2029'))
+
+
+class ORJSONParser(JSONParser):
+    """JSONParser accéléré par orjson (NaN et Infinity refusés, comme STRICT_JSON)."""
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None or not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            contenu = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                contenu = contenu.decode(encoding)
+            return orjson.loads(contenu)
+        except ValueError as exc:  # orjson.JSONDecodeError, UnicodeDecodeError
+            raise ParseError('JSON parse error - %s' % str(exc))
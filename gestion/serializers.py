@@ -1,11 +1,25 @@
 # Serializers
 from rest_framework import serializers
 from .models import *
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
 import logging
-from django.contrib.auth.hashers import make_password
+from collections import defaultdict
+from django.contrib.auth.hashers import check_password, make_password
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+import numpy as np
+from . import mise_en_cache
+from .authentication import REVENDICATION_VERSION
+from .jetons import RefreshTokenSurveille
+from .planning import conflits_pour, conflits_serie, dates_serie
+from .releves import reconstruire_releves
+from .solveur import CRENEAUX_DEFAUT, planifier_semestre
+from .stats import invalider_stats
 from django.contrib.auth import get_user_model
 User = get_user_model()
 
@@ -124,10 +138,129 @@ class UserSerializer(serializers.ModelSerializer):
         return super().update(instance, validated_data)
 
 
+class ValuesSerializer:
+    """
+    Sérialisation en lecture seule, à partir de QuerySet.values(), d'un
+    ModelSerializer « plat » (colonnes et clés étrangères en PK) : pas
+    d'instanciation de modèles ni de parcours des champs DRF par ligne.
+    La sortie est identique à celle de `serializer_class`.
+
+        class CoursValuesSerializer(ValuesSerializer):
+            serializer_class = CoursSerializer
+    """
+    serializer_class = None
+    # to_representation est l'identité pour ces champs (valeurs déjà du bon type)
+    CHAMPS_NATIFS = (serializers.CharField, serializers.IntegerField,
+                     serializers.BooleanField)
+    _plans = {}
+
+    @classmethod
+    def plan(cls, champs=None):
+        """(nom, colonne, conversion) des champs lisibles (tous ou `champs`)."""
+        if champs is not None:
+            return [etape for etape in cls.plan() if etape[0] in champs]
+        if cls not in cls._plans:
+            plan = []
+            for nom, champ in cls.serializer_class().fields.items():
+                if champ.write_only:
+                    continue
+                colonne = champ.source.replace('.', '__')
+                if isinstance(champ, serializers.PrimaryKeyRelatedField) and champ.pk_field is None:
+                    conversion = None
+                elif isinstance(champ, cls.CHAMPS_NATIFS):
+                    conversion = None
+                elif isinstance(champ, (serializers.BaseSerializer, serializers.RelatedField,
+                                        serializers.SerializerMethodField)) or champ.source == '*':
+                    raise TypeError(
+                        f"{cls.__name__} : le champ `{nom}` ne peut pas être lu par values().")
+                else:
+                    conversion = champ.to_representation
+                plan.append((nom, colonne, conversion))
+            cls._plans[cls] = plan
+        return cls._plans[cls]
+
+    @classmethod
+    def noms(cls):
+        return [nom for nom, _, _ in cls.plan()]
+
+    @classmethod
+    def colonnes(cls, champs=None):
+        return [colonne for _, colonne, _ in cls.plan(champs)]
+
+    @classmethod
+    def serialiser(cls, lignes, champs=None):
+        plan = cls.plan(champs)
+        return [
+            {nom: ligne[colonne] if conversion is None or ligne[colonne] is None
+             else conversion(ligne[colonne])
+             for nom, colonne, conversion in plan}
+            for ligne in lignes
+        ]
+
+
+class ChampsDynamiquesMixin:
+    """
+    Champs et relations imbriquées choisis par la vue (SparseFieldsMixin) :
+        champs      {nom: None | {sous-champs}} ; None : tous les champs
+        developper  relations imbriquées ; None : `developpees_par_defaut`
+    Une relation non développée est rendue par sa clé primaire.
+    """
+    relations_developpables = {}
+    developpees_par_defaut = ()
+
+    def __init__(self, *args, champs=None, developper=None, **kwargs):
+        self.champs = champs
+        self.developper = developper
+        super().__init__(*args, **kwargs)
+
+    def get_fields(self):
+        fields = super().get_fields()
+        developper = (set(self.developpees_par_defaut) if self.developper is None
+                      else self.developper)
+        for nom, classe in self.relations_developpables.items():
+            if nom in developper:
+                if not isinstance(fields[nom], serializers.BaseSerializer):
+                    fields[nom] = classe(read_only=True)
+            elif isinstance(fields[nom], serializers.BaseSerializer):
+                fields[nom] = serializers.PrimaryKeyRelatedField(read_only=True)
+        if self.champs is not None:
+            fields = {nom: champ for nom, champ in fields.items()
+                      if nom in self.champs or champ.write_only}
+            for nom, sous_champs in self.champs.items():
+                imbrique = fields.get(nom)
+                if sous_champs and isinstance(imbrique, serializers.BaseSerializer):
+                    for sous_nom in list(imbrique.fields):
+                        if sous_nom not in sous_champs:
+                            del imbrique.fields[sous_nom]
+        return fields
+
+
+class UserValuesSerializer(ValuesSerializer):
+    serializer_class = UserSerializer
+
+
+class ReleveSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Releve
+        fields = ['semestre', 'anneeetude', 'moyenne', 'volumehoraire',
+                  'nombre_cours', 'date_maj']
+
+
+class EtudiantSerializer(UserSerializer):
+    # Moyennes précalculées (table Releve), sans jointure sur les notes
+    releves = ReleveSerializer(many=True, read_only=True)
+
+    class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ['releves']
+
+
 class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     username_field = 'email'
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, hacheur='default', **kwargs):
+        # Algorithme préféré ('bcrypt_sha256'...) : celui de PASSWORD_HASHER
+        # par défaut, les autres sont comparés par bench_login
+        self.hacheur = hacheur
         super().__init__(*args, **kwargs)
         self.fields[self.username_field] = serializers.EmailField()
         self.fields.pop('username', None)
@@ -135,13 +268,31 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        cls.ajouter_revendications(token, user)
+        return token
+
+    @staticmethod
+    def ajouter_revendications(token, user):
         # Ajout d'infos personnalisées au token JWT
         token['role'] = user.role
         token['email'] = user.email
         token['nom'] = user.nom
         token['prenom'] = user.prenom
         token['id'] = user.id
-        return token
+        # Filigrane : le jeton ne vaut plus sans requête si le compte change
+        token[REVENDICATION_VERSION] = user.version_jetons
+
+    @staticmethod
+    def rehacher(user, hacheur='default'):
+        """
+        Réhache le mot de passe au hacheur et au coût courants (PASSWORD_HASHER)
+        après une connexion réussie. UPDATE direct, sans save() : le mot de
+        passe ne change pas, les caches et les jetons émis restent valides.
+        """
+        def setter(mot_de_passe):
+            user.password = make_password(mot_de_passe, hasher=hacheur)
+            User.objects.filter(pk=user.pk).update(password=user.password)
+        return setter
 
     def validate(self, attrs):
         # Récupérer email et password
@@ -151,30 +302,35 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         # Log pour déboguer
         logger.debug(f"Tentative de connexion: email={email}")
 
-        if email and password:
-            from .models import User
-
-            try:
-                user = User.objects.get(email=email)
-                logger.debug(f"User trouvé: {user.email}")
+        if not (email and password):
+            raise serializers.ValidationError(
+                {"detail": "Email et mot de passe sont requis."}
+            )
 
-                if not user.check_password(password):
-                    raise serializers.ValidationError(
-                        {"detail": "Mot de passe incorrect."}
-                    )
+        # Une seule requête : l'utilisateur est lu une fois, ici
+        try:
+            user = User.objects.get(email=email)
+        except User.DoesNotExist:
+            raise serializers.ValidationError(
+                {"detail": f"Aucun compte trouvé avec l'email: {email}"}
+            )
+        logger.debug(f"User trouvé: {user.email}")
 
-            except User.DoesNotExist:
-                raise serializers.ValidationError(
-                    {"detail": f"Aucun compte trouvé avec l'email: {email}"}
-                )
-            except Exception as e:
-                logger.error(f"Erreur d'authentification: {str(e)}")
-                raise serializers.ValidationError(
-                    {"detail": f"Erreur de connexion: {str(e)}"}
-                )
-        else:
+        try:
+            valide = check_password(password, user.password,
+                                    self.rehacher(user, self.hacheur), self.hacheur)
+        except Exception as e:
+            logger.error(f"Erreur d'authentification: {str(e)}")
             raise serializers.ValidationError(
-                {"detail": "Email et mot de passe sont requis."}
+                {"detail": f"Erreur de connexion: {str(e)}"}
+            )
+        if not valide:
+            raise serializers.ValidationError(
+                {"detail": "Mot de passe incorrect."}
+            )
+        if not user.is_active:
+            raise serializers.ValidationError(
+                {"detail": "Ce compte est désactivé."}
             )
 
         # Obtenir le token JWT
@@ -196,6 +352,37 @@ class MyTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
+class MyTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Rafraîchissement qui relit le compte : un compte désactivé ou supprimé
+    est refusé, et les revendications (rôle, filigrane...) sont réémises
+    depuis la base au lieu d'être recopiées du jeton présenté.
+    """
+    # Liste noire consultée via le LRU des jetons révoqués (gestion.jetons)
+    token_class = RefreshTokenSurveille
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(**{
+            jwt_settings.USER_ID_FIELD: refresh.payload.get(jwt_settings.USER_ID_CLAIM),
+        }).first()
+        if user is None or not user.is_active:
+            raise AuthenticationFailed(
+                _("No active account found for the given credentials"),
+                code='no_active_account')
+        MyTokenObtainPairSerializer.ajouter_revendications(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+        if jwt_settings.ROTATE_REFRESH_TOKENS:
+            if jwt_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data['refresh'] = str(refresh)
+        return data
+
+
 class CoursSerializer(serializers.ModelSerializer):
     enseignant_id = serializers.IntegerField(write_only=True)
 
@@ -211,26 +398,203 @@ class CoursSerializer(serializers.ModelSerializer):
         cours = Cours.objects.create(enseignant=enseignant, **validated_data)
         return cours
 
+
+class CoursValuesSerializer(ValuesSerializer):
+    serializer_class = CoursSerializer
+
     
 
 
-class SeanceSerializer(serializers.ModelSerializer):
+class SeanceSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
+    relations_developpables = {'cours': CoursSerializer}
     cours_id = serializers.IntegerField(write_only=True)
 
     class Meta:
         model = Seance
         fields = ['id', 'cours', 'cours_id',
-                  'duree', 'date', 'heure_debut', 'salle']
-        read_only_fields = ['cours']
+                  'duree', 'date', 'heure_debut', 'salle', 'serie']
+        read_only_fields = ['cours', 'serie']
 
     def create(self, validated_data):
         cours_id = validated_data.pop('cours_id')
-        cours = Cours.objects.get(id=cours_id)
-        seance = Seance.objects.create(cours=cours, **validated_data)
+        with transaction.atomic():
+            cours = self.verrouiller(cours_id)
+            self.verifier_conflits(cours, validated_data)
+            seance = Seance.objects.create(cours=cours, **validated_data)
         return seance
 
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            cours = self.verrouiller(validated_data.get('cours_id', instance.cours_id))
+            self.verifier_conflits(cours, validated_data)
+            return super().update(instance, validated_data)
+
+    def validate(self, attrs):
+        instance = self.instance
+        cours_id = attrs.get('cours_id', getattr(instance, 'cours_id', None))
+        if not Cours.objects.filter(id=cours_id).exists():
+            raise serializers.ValidationError({"cours_id": "Cours inconnu."})
+        return attrs
+
+    @staticmethod
+    def verrouiller(cours_id):
+        """
+        Verrou sur la ligne de l'enseignant : deux écritures de séances du
+        même enseignant sont sérialisées entre la vérification et l'insertion.
+        """
+        cours = Cours.objects.only('enseignant_id').get(id=cours_id)
+        list(User.objects.select_for_update().filter(pk=cours.enseignant_id)
+             .values_list('pk', flat=True))
+        return cours
+
+    def verifier_conflits(self, cours, attrs):
+        # Refuser les chevauchements de salle ou d'enseignant. Vérifié dans la
+        # transaction de l'écriture, séances candidates verrouillées (sous
+        # InnoDB, le verrou de plage couvre aussi les insertions concurrentes
+        # dans la même salle)
+        instance = self.instance
+
+        def valeur(champ):
+            return attrs.get(champ, getattr(instance, champ, None))
+
+        conflits = conflits_pour(
+            cours, valeur('date'), valeur('heure_debut'), valeur('duree'),
+            valeur('salle'), exclure=getattr(instance, 'pk', None), verrouiller=True)
+        if conflits:
+            raise serializers.ValidationError({
+                "conflits": conflits,
+                "detail": "Ce créneau chevauche une autre séance "
+                          "(même salle ou même enseignant).",
+            })
+
+
+class SerieSeanceSerializer(serializers.ModelSerializer):
+    """
+    Série de séances : à la création, les occurrences sont générées en un
+    bulk_create ; une modification de la série met à jour toutes ses
+    séances en une requête (et ajoute/supprime les dates concernées).
+    """
+    cours_id = serializers.IntegerField(write_only=True)
+    exclusions = serializers.ListField(
+        child=serializers.DateField(), required=False)
+
+    class Meta:
+        model = SerieSeance
+        fields = ['id', 'cours', 'cours_id', 'frequence', 'date_debut',
+                  'date_fin', 'exclusions', 'duree', 'heure_debut', 'salle']
+        read_only_fields = ['cours']
+
+    def validate(self, attrs):
+        instance = self.instance
+
+        def valeur(champ):
+            return attrs.get(champ, getattr(instance, champ, None))
 
-class InscriptionSerializer(serializers.ModelSerializer):
+        if valeur('date_fin') < valeur('date_debut'):
+            raise serializers.ValidationError(
+                {"date_fin": "La date de fin doit suivre la date de début."})
+        if not Cours.objects.filter(id=valeur('cours_id')).exists():
+            raise serializers.ValidationError({"cours_id": "Cours inconnu."})
+
+        self.dates = dates_serie(valeur('date_debut'), valeur('date_fin'),
+                                 valeur('frequence') or 'hebdomadaire',
+                                 valeur('exclusions') or [])
+        if not self.dates:
+            raise serializers.ValidationError("La série ne contient aucune séance.")
+        return attrs
+
+    def verifier_conflits(self, attrs):
+        # Dans la transaction de l'écriture, avec les mêmes verrous que
+        # SeanceSerializer : enseignant puis séances candidates
+        instance = self.instance
+
+        def valeur(champ):
+            return attrs.get(champ, getattr(instance, champ, None))
+
+        cours = SeanceSerializer.verrouiller(valeur('cours_id'))
+        conflits = conflits_serie(cours, self.dates, valeur('heure_debut'),
+                                  valeur('duree'), valeur('salle'), serie=instance,
+                                  verrouiller=True)
+        if conflits:
+            raise serializers.ValidationError({
+                "conflits": conflits,
+                "detail": "Certaines occurrences chevauchent d'autres séances.",
+            })
+
+    def occurrences(self, serie, dates):
+        return [
+            Seance(cours_id=serie.cours_id, serie=serie, date=date,
+                   heure_debut=serie.heure_debut, duree=serie.duree,
+                   salle=serie.salle)
+            for date in dates
+        ]
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            self.verifier_conflits(validated_data)
+            serie = SerieSeance.objects.create(**validated_data)
+            Seance.objects.bulk_create(self.occurrences(serie, self.dates))
+            mise_en_cache.invalider(Seance)
+        return serie
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            self.verifier_conflits(validated_data)
+            serie = super().update(instance, validated_data)
+            seances = Seance.objects.filter(serie=serie)
+            seances.exclude(date__in=self.dates).delete()
+            seances.update(cours_id=serie.cours_id, heure_debut=serie.heure_debut,
+                           duree=serie.duree, salle=serie.salle,
+                           date_maj=timezone.now())
+            existantes = set(seances.values_list('date', flat=True))
+            Seance.objects.bulk_create(self.occurrences(
+                serie, [d for d in self.dates if d not in existantes]))
+            mise_en_cache.invalider(Seance)
+        return serie
+
+
+class IndisponibiliteSerializer(serializers.Serializer):
+    enseignant_id = serializers.IntegerField()
+    jour = serializers.IntegerField(min_value=0, max_value=4)  # 0 = lundi
+    heure = serializers.TimeField()
+
+
+class PlanificationSerializer(serializers.Serializer):
+    """Paramètres du solveur d'emploi du temps (gestion.solveur)."""
+    semestre = serializers.CharField(max_length=10)
+    anneeetude = serializers.CharField(max_length=20, required=False)
+    salles = serializers.ListField(
+        child=serializers.CharField(max_length=10), allow_empty=False)
+    debut = serializers.DateField()
+    semaines = serializers.IntegerField(min_value=1, max_value=52, default=14)
+    creneaux = serializers.ListField(
+        child=serializers.TimeField(), allow_empty=False,
+        default=lambda: list(CRENEAUX_DEFAUT))
+    # Durée d'une séance, en heures
+    duree = serializers.IntegerField(min_value=1, max_value=8, default=2)
+    indisponibilites = IndisponibiliteSerializer(many=True, default=list)
+    temps_max = serializers.FloatField(min_value=0, max_value=60, default=10)
+    appliquer = serializers.BooleanField(default=True)
+
+    def create(self, validated_data):
+        cours = Cours.objects.filter(semestre=validated_data['semestre'])
+        if 'anneeetude' in validated_data:
+            cours = cours.filter(anneeetude=validated_data['anneeetude'])
+        indisponibilites = defaultdict(list)
+        for indispo in validated_data['indisponibilites']:
+            indisponibilites[indispo['enseignant_id']].append(
+                (indispo['jour'], indispo['heure']))
+        return planifier_semestre(
+            cours, validated_data['salles'], validated_data['debut'],
+            validated_data['semaines'], validated_data['creneaux'],
+            validated_data['duree'], indisponibilites,
+            temps_max=validated_data['temps_max'],
+            appliquer=validated_data['appliquer'])
+
+
+class InscriptionSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
+    relations_developpables = {'etudiant': UserSerializer, 'cours': CoursSerializer}
+    developpees_par_defaut = ('etudiant', 'cours')
     etudiant = UserSerializer(read_only=True)
     cours = CoursSerializer(read_only=True)
     etudiant_id = serializers.PrimaryKeyRelatedField(
@@ -274,8 +638,76 @@ class InscriptionSerializer(serializers.ModelSerializer):
                     "Cet étudiant est déjà inscrit à ce cours."
                 )
         return data
+
+
+class InscriptionBulkSerializer(serializers.Serializer):
+    """
+    Inscription d'une cohorte : liste d'étudiants (ou filière + année)
+    × liste de cours (ou tous les cours de l'année, éventuellement
+    d'un semestre).
+    """
+    etudiant_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False)
+    filiere = serializers.CharField(required=False)
+    anneeetude = serializers.CharField(required=False)
+    cours_ids = serializers.ListField(
+        child=serializers.IntegerField(), required=False, allow_empty=False)
+    semestre = serializers.CharField(required=False)
+
+    def validate(self, attrs):
+        if 'etudiant_ids' in attrs:
+            ids = set(attrs['etudiant_ids'])
+            trouves = set(User.objects.filter(id__in=ids, role='etudiant')
+                          .values_list('id', flat=True))
+            if ids - trouves:
+                raise serializers.ValidationError({
+                    "etudiant_ids": f"Étudiants inconnus : {sorted(ids - trouves)}"})
+        elif 'filiere' in attrs and 'anneeetude' in attrs:
+            trouves = set(User.objects.filter(
+                role='etudiant', filiere=attrs['filiere'],
+                anneeetude=attrs['anneeetude']).values_list('id', flat=True))
+        else:
+            raise serializers.ValidationError(
+                "Indiquez `etudiant_ids` ou le couple `filiere` / `anneeetude`.")
+
+        if 'cours_ids' in attrs:
+            ids = set(attrs['cours_ids'])
+            cours = set(Cours.objects.filter(id__in=ids).values_list('id', flat=True))
+            if ids - cours:
+                raise serializers.ValidationError({
+                    "cours_ids": f"Cours inconnus : {sorted(ids - cours)}"})
+        elif 'anneeetude' in attrs:
+            queryset = Cours.objects.filter(anneeetude=attrs['anneeetude'])
+            if 'semestre' in attrs:
+                queryset = queryset.filter(semestre=attrs['semestre'])
+            cours = set(queryset.values_list('id', flat=True))
+        else:
+            raise serializers.ValidationError(
+                "Indiquez `cours_ids` ou `anneeetude` (et éventuellement `semestre`).")
+
+        attrs['etudiants'] = sorted(trouves)
+        attrs['cours'] = sorted(cours)
+        return attrs
+
+    def create(self, validated_data):
+        etudiants, cours = validated_data['etudiants'], validated_data['cours']
+        paires = Inscription.objects.filter(
+            etudiant_id__in=etudiants, cours_id__in=cours)
+        with transaction.atomic():
+            avant = paires.count()
+            # Les doublons sont écartés par la contrainte unique_inscription
+            Inscription.objects.bulk_create(
+                (Inscription(etudiant_id=e, cours_id=c)
+                 for e in etudiants for c in cours),
+                batch_size=1000, ignore_conflicts=True)
+            mise_en_cache.invalider(Inscription)
+            crees = paires.count() - avant
+        total = len(etudiants) * len(cours)
+        return {'crees': crees, 'ignores': total - crees}
+
  
-class NoteSerializer(serializers.ModelSerializer):
+class NoteSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
+    relations_developpables = {'etudiant': UserSerializer, 'cours': CoursSerializer}
     etudiant_id = serializers.IntegerField(write_only=True)
     cours_id = serializers.IntegerField(write_only=True)
 
@@ -306,7 +738,89 @@ class NoteSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class ExerciceSerializer(serializers.ModelSerializer):
+class NoteLigneSerializer(serializers.Serializer):
+    etudiant_id = serializers.IntegerField()
+    note = serializers.DecimalField(max_digits=4, decimal_places=2)
+    explication = serializers.CharField(allow_blank=True, default='')
+
+
+class NoteBulkSerializer(serializers.Serializer):
+    """
+    Saisie des notes d'une session d'examen : un cours, un type d'examen
+    et la liste des notes. Les notes existantes sont mises à jour.
+    """
+    cours_id = serializers.IntegerField()
+    type_examen = serializers.CharField(max_length=20)
+    notes = NoteLigneSerializer(many=True, allow_empty=False)
+
+    def validate_cours_id(self, value):
+        if not Cours.objects.filter(id=value).exists():
+            raise serializers.ValidationError("Cours inconnu.")
+        return value
+
+    def validate_notes(self, lignes):
+        ids = [ligne['etudiant_id'] for ligne in lignes]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError(
+                "Un étudiant apparaît plusieurs fois dans la liste.")
+
+        # Bornes 0-20 vérifiées en une passe sur l'ensemble des notes
+        valeurs = np.array([ligne['note'] for ligne in lignes], dtype=np.float64)
+        hors_bornes = np.flatnonzero((valeurs < 0) | (valeurs > 20))
+        if hors_bornes.size:
+            raise serializers.ValidationError({
+                int(i): {"note": "La note doit être comprise entre 0 et 20."}
+                for i in hors_bornes})
+
+        # Une seule requête IN pour tous les étudiants
+        trouves = set(User.objects.filter(id__in=ids, role='etudiant')
+                      .values_list('id', flat=True))
+        inconnus = [i for i in ids if i not in trouves]
+        if inconnus:
+            raise serializers.ValidationError(f"Étudiants inconnus : {inconnus}")
+        return lignes
+
+    def create(self, validated_data):
+        cours_id = validated_data['cours_id']
+        type_examen = validated_data['type_examen']
+        lignes = validated_data['notes']
+        with transaction.atomic():
+            # Verrou sur le cours : deux saisies simultanées de la même
+            # session ne créent pas chacune la note d'un étudiant
+            Cours.objects.select_for_update().filter(pk=cours_id).first()
+
+            # Note existante de chaque étudiant pour ce cours et ce type
+            # d'examen, en une requête. Plusieurs notes du même type (TP,
+            # TD...) sont permises : seule la plus récente est remplacée.
+            existantes = {}
+            for note in Note.objects.filter(
+                    cours_id=cours_id, type_examen=type_examen,
+                    etudiant_id__in=[ligne['etudiant_id'] for ligne in lignes],
+            ).order_by('id'):
+                existantes[note.etudiant_id] = note
+
+            a_modifier, a_creer = [], []
+            for ligne in lignes:
+                note = existantes.get(ligne['etudiant_id'])
+                if note is None:
+                    a_creer.append(Note(
+                        etudiant_id=ligne['etudiant_id'], cours_id=cours_id,
+                        type_examen=type_examen, note=ligne['note'],
+                        explication=ligne['explication']))
+                else:
+                    note.note = ligne['note']
+                    note.explication = ligne['explication']
+                    a_modifier.append(note)
+            Note.objects.bulk_update(a_modifier, ['note', 'explication'], batch_size=500)
+            Note.objects.bulk_create(a_creer, batch_size=500)
+            # bulk_create / bulk_update n'envoient pas de signaux : mise à jour explicite
+            reconstruire_releves(ligne['etudiant_id'] for ligne in lignes)
+        invalider_stats(cours_id)
+        return {'enregistrees': len(lignes)}
+
+
+class ExerciceSerializer(ChampsDynamiquesMixin, serializers.ModelSerializer):
+    relations_developpables = {'cours': CoursSerializer}
     cours_id = serializers.IntegerField(write_only=True)
 
     class Meta:
@@ -366,3 +880,91 @@ class SoumissionExerciceSerializer(serializers.ModelSerializer):
             **validated_data
         )
         return soumission
+
+
+class TeleversementSoumissionSerializer(serializers.ModelSerializer):
+    """Ouverture d'un envoi par morceaux (voir gestion.televersements)."""
+    etudiant_id = serializers.PrimaryKeyRelatedField(
+        source='etudiant', queryset=User.objects.filter(role='etudiant'))
+    exercice_id = serializers.PrimaryKeyRelatedField(
+        source='exercice', queryset=Exercice.objects.all())
+    taille = serializers.IntegerField(min_value=1)
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$')
+
+    class Meta:
+        model = TeleversementSoumission
+        fields = ['id', 'etudiant_id', 'exercice_id', 'nom_fichier', 'taille',
+                  'sha256', 'recu', 'date_creation']
+        read_only_fields = ['recu', 'date_creation']
+
+    def validate_taille(self, value):
+        if value > settings.SOUMISSION_TAILLE_MAX:
+            raise serializers.ValidationError(
+                f"Le fichier dépasse {settings.SOUMISSION_TAILLE_MAX} octets.")
+        return value
+
+    def validate_sha256(self, value):
+        return value.lower()
+
+
+# ========================
+# Tableaux de bord
+# ========================
+
+class CoursTableauSerializer(CoursSerializer):
+    nombre_inscrits = serializers.IntegerField(read_only=True)
+
+    class Meta(CoursSerializer.Meta):
+        fields = CoursSerializer.Meta.fields + ['nombre_inscrits']
+
+
+class CoursEtudiantSerializer(CoursTableauSerializer):
+    # Nom attendu par le client (types.ts), calculé par EXISTS en SQL
+    enrolled = serializers.BooleanField(read_only=True)
+
+    class Meta(CoursTableauSerializer.Meta):
+        fields = CoursTableauSerializer.Meta.fields + ['enrolled']
+
+
+class CoursEnseignantSerializer(CoursTableauSerializer):
+    nombre_seances = serializers.IntegerField(read_only=True)
+
+    class Meta(CoursTableauSerializer.Meta):
+        fields = CoursTableauSerializer.Meta.fields + ['nombre_seances']
+
+
+class ExerciceEtudiantSerializer(ExerciceSerializer):
+    soumis = serializers.BooleanField(read_only=True)
+
+    class Meta(ExerciceSerializer.Meta):
+        fields = ExerciceSerializer.Meta.fields + ['soumis']
+
+
+class ExerciceEnseignantSerializer(ExerciceSerializer):
+    nombre_soumissions = serializers.IntegerField(read_only=True)
+
+    class Meta(ExerciceSerializer.Meta):
+        fields = ExerciceSerializer.Meta.fields + ['nombre_soumissions']
+
+
+class TableauSecretaireSerializer(serializers.Serializer):
+    enseignants = UserSerializer(many=True, read_only=True)
+    etudiants = UserSerializer(many=True, read_only=True)
+    cours = CoursTableauSerializer(many=True, read_only=True)
+    compteurs = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+
+class TableauEtudiantSerializer(serializers.Serializer):
+    cours = CoursEtudiantSerializer(many=True, read_only=True)
+    notes = NoteSerializer(many=True, read_only=True)
+    releves = ReleveSerializer(many=True, read_only=True)
+    seances = SeanceSerializer(many=True, read_only=True)
+    exercices = ExerciceEtudiantSerializer(many=True, read_only=True)
+    compteurs = serializers.DictField(child=serializers.IntegerField(), read_only=True)
+
+
+class TableauEnseignantSerializer(serializers.Serializer):
+    cours = CoursEnseignantSerializer(many=True, read_only=True)
+    seances = SeanceSerializer(many=True, read_only=True)
+    exercices = ExerciceEnseignantSerializer(many=True, read_only=True)
+    compteurs = serializers.DictField(child=serializers.IntegerField(), read_only=True)
@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import mise_en_cache
+from .authentication import publier_version
+from .models import Cours, Inscription, Note, Seance, User
+from .releves import reconstruire_releves
+from .stats import invalider_stats
+
+# Modèles lus par les vues en cache (CacheMixin). Les écritures en masse
+# (bulk_create, QuerySet.update) n'envoient pas de signaux et appellent
+# mise_en_cache.invalider elles-mêmes.
+MODELES_VERSIONNES = (User, Cours, Seance, Inscription)
+
+
+def modele_modifie(sender, **kwargs):
+    mise_en_cache.invalider(sender)
+
+
+for modele in MODELES_VERSIONNES:
+    post_save.connect(modele_modifie, sender=modele,
+                      dispatch_uid=f'version-{modele._meta.label_lower}')
+    post_delete.connect(modele_modifie, sender=modele,
+                        dispatch_uid=f'version-{modele._meta.label_lower}')
+
+
+@receiver([post_save, post_delete], sender=Note)
+def note_modifiee(sender, instance, **kwargs):
+    invalider_stats(instance.cours_id)
+    reconstruire_releves([instance.etudiant_id])
+
+
+@receiver(post_save, sender=Cours)
+def cours_modifie(sender, instance, created, **kwargs):
+    # Le volume horaire ou le semestre a pu changer : relevés des étudiants notés
+    if not created:
+        etudiant_ids = (
+            Note.objects.filter(cours=instance)
+            .values_list('etudiant_id', flat=True).distinct()
+        )
+        reconstruire_releves(etudiant_ids)
+
+
+@receiver(post_delete, sender=Cours)
+def cours_supprime(sender, instance, **kwargs):
+    invalider_stats(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=User)
+def utilisateur_modifie(sender, instance, **kwargs):
+    # User.save a incrémenté version_jetons : les jetons émis avant repassent
+    # par la base (cache des filigranes mis à jour au commit)
+    publier_version(instance.pk)
@@ -0,0 +1,294 @@
+import math
+import random
+import time
+from collections import defaultdict
+from datetime import time as heure, timedelta
+
+from django.db import transaction
+
+from . import mise_en_cache
+from .models import Seance
+from .planning import intervalle, minutes, valeurs_seances
+
+JOURS = range(5)  # du lundi au vendredi
+CRENEAUX_DEFAUT = (heure(8), heure(10), heure(14), heure(16))
+# Pénalités des contraintes souples
+COUT_COHORTE = 10  # deux cours de la même promotion au même créneau
+COUT_MEME_JOUR = 1  # deux séances du même cours le même jour
+
+
+class Demande:
+    """Un créneau hebdomadaire à trouver pour un cours."""
+
+    def __init__(self, cours, occurrences):
+        self.cours_id = cours.id
+        self.enseignant_id = cours.enseignant_id
+        self.cohorte = (cours.anneeetude, cours.semestre)
+        self.occurrences = occurrences
+        self.cellule = None  # (jour, créneau, salle)
+
+
+class Solveur:
+    """
+    Affecte à chaque cours des créneaux hebdomadaires (jour, heure, salle)
+    sans conflit de salle ni d'enseignant, puis génère les séances du semestre.
+
+    1. Glouton : les demandes les plus contraintes d'abord (enseignants les
+       plus chargés), chacune dans la cellule libre de moindre coût.
+    2. Recherche locale, bornée par `temps_max` secondes : déplacement des
+       demandes coûteuses et placement des demandes restées sans cellule
+       en délogeant au besoin une autre demande.
+    """
+
+    def __init__(self, cours, salles, debut, semaines, creneaux, duree,
+                 indisponibilites=None, temps_max=10, graine=0):
+        self.cours = list(cours)
+        self.salles = list(salles)
+        self.debut = debut
+        self.semaines = semaines
+        self.creneaux = list(creneaux)
+        self.duree = duree
+        self.temps_max = temps_max
+        self.hasard = random.Random(graine)
+        self.creneaux_semaine = [(j, c) for j in JOURS for c in range(len(self.creneaux))]
+
+        # Ressources indisponibles : {('salle', s) | ('enseignant', id): {(jour, créneau)}}
+        self.bloques = defaultdict(set)
+        for enseignant_id, creneaux_indispo in (indisponibilites or {}).items():
+            for jour, heure in creneaux_indispo:
+                for c in self.creneaux_chevauches(minutes(heure), minutes(heure) + 60):
+                    self.bloques[('enseignant', int(enseignant_id))].add((jour, c))
+
+        # Créneaux chevauchés par une séance commençant à chaque créneau (lui
+        # compris) : avec une durée longue, 8h et 10h se recouvrent
+        self.chevauchements = [
+            list(self.creneaux_chevauches(*intervalle(h, duree))) for h in self.creneaux]
+
+        self.salle_occupee = {}
+        self.salles_libres = None
+        # Nombre de séances placées couvrant (jour, créneau, salle | enseignant)
+        self.salle_prise = defaultdict(int)
+        self.enseignant_occupe = defaultdict(int)
+        self.cohortes = defaultdict(int)
+        self.cours_jour = defaultdict(int)
+        self.demandes = []
+        self.iterations = 0
+
+    # Construction
+
+    def creneaux_chevauches(self, debut, fin):
+        for c, heure in enumerate(self.creneaux):
+            debut_c, fin_c = intervalle(heure, self.duree)
+            if debut_c < fin and fin_c > debut:
+                yield c
+
+    def bloquer_seances_existantes(self, seances):
+        """Les séances déjà planifiées sur la période bloquent leurs créneaux."""
+        for s in seances:
+            debut, fin = intervalle(s['heure_debut'], s['duree'])
+            jour = s['date'].weekday()
+            for c in self.creneaux_chevauches(debut, fin):
+                self.bloques[('salle', s['salle'])].add((jour, c))
+                self.bloques[('enseignant', s['enseignant_id'])].add((jour, c))
+
+    def initialiser_salles_libres(self):
+        # dict plutôt que set : ordre d'attribution des salles déterministe
+        self.salles_libres = {
+            (j, c): dict.fromkeys(
+                s for s in self.salles if (j, c) not in self.bloques[('salle', s)])
+            for j, c in self.creneaux_semaine
+        }
+
+    def creer_demandes(self):
+        for cours in self.cours:
+            seances = math.ceil(cours.volumehoraire / self.duree)
+            while seances > 0:
+                occurrences = min(seances, self.semaines)
+                self.demandes.append(Demande(cours, occurrences))
+                seances -= occurrences
+        charge = defaultdict(int)
+        for d in self.demandes:
+            charge[d.enseignant_id] += 1
+        self.demandes.sort(key=lambda d: (-charge[d.enseignant_id], -d.occurrences))
+
+    # Contraintes
+
+    def enseignant_libre(self, demande, jour, c):
+        return (not self.enseignant_occupe.get((jour, c, demande.enseignant_id))
+                and (jour, c) not in self.bloques[('enseignant', demande.enseignant_id)])
+
+    def libre(self, demande, cellule):
+        jour, c, salle = cellule
+        return (salle in self.salles_libres[(jour, c)]
+                and self.enseignant_libre(demande, jour, c))
+
+    def cout(self, demande, cellule):
+        """Coût souple de `demande` dans `cellule`, les autres demandes étant fixées."""
+        jour, c, _ = cellule
+        propre = 1 if (demande.cellule is not None and demande.cellule[0] == jour
+                       and c in self.chevauchements[demande.cellule[1]]) else 0
+        meme_jour = 1 if demande.cellule is not None and demande.cellule[0] == jour else 0
+        return (COUT_COHORTE * (self.cohortes[(jour, c, demande.cohorte)] - propre)
+                + COUT_MEME_JOUR * (self.cours_jour[(demande.cours_id, jour)] - meme_jour))
+
+    def placer(self, demande, cellule):
+        """La salle, l'enseignant et la promotion sont pris sur tous les créneaux chevauchés."""
+        jour, c, salle = cellule
+        demande.cellule = cellule
+        self.salle_occupee[cellule] = demande
+        for c2 in self.chevauchements[c]:
+            self.salle_prise[(jour, c2, salle)] += 1
+            self.salles_libres[(jour, c2)].pop(salle, None)
+            self.enseignant_occupe[(jour, c2, demande.enseignant_id)] += 1
+            self.cohortes[(jour, c2, demande.cohorte)] += 1
+        self.cours_jour[(demande.cours_id, jour)] += 1
+
+    def retirer(self, demande):
+        jour, c, salle = cellule = demande.cellule
+        del self.salle_occupee[cellule]
+        for c2 in self.chevauchements[c]:
+            self.salle_prise[(jour, c2, salle)] -= 1
+            if (not self.salle_prise[(jour, c2, salle)]
+                    and (jour, c2) not in self.bloques[('salle', salle)]):
+                self.salles_libres[(jour, c2)][salle] = None
+            self.enseignant_occupe[(jour, c2, demande.enseignant_id)] -= 1
+            self.cohortes[(jour, c2, demande.cohorte)] -= 1
+        self.cours_jour[(demande.cours_id, jour)] -= 1
+        demande.cellule = None
+
+    def meilleure_cellule(self, demande):
+        """Créneau libre de moindre coût, puis première salle libre à ce créneau."""
+        meilleure, meilleur_cout = None, None
+        for jour, c in self.creneaux_semaine:
+            libres = self.salles_libres[(jour, c)]
+            if not libres or not self.enseignant_libre(demande, jour, c):
+                continue
+            cout = self.cout(demande, (jour, c, None))
+            if meilleur_cout is None or cout < meilleur_cout:
+                meilleure, meilleur_cout = (jour, c, next(iter(libres))), cout
+                if cout == 0:
+                    break
+        return meilleure, meilleur_cout
+
+    def cout_total(self):
+        # Chaque conflit souple est compté une fois par demande concernée
+        return sum(self.cout(d, d.cellule) for d in self.demandes
+                   if d.cellule is not None) // 2
+
+    # Résolution
+
+    def resoudre(self):
+        debut = time.monotonic()
+        self.initialiser_salles_libres()
+        self.creer_demandes()
+        for demande in self.demandes:
+            cellule, _ = self.meilleure_cellule(demande)
+            if cellule is not None:
+                self.placer(demande, cellule)
+        self.recherche_locale(debut + self.temps_max)
+        return time.monotonic() - debut
+
+    def recherche_locale(self, echeance):
+        while time.monotonic() < echeance:
+            a_ameliorer = [d for d in self.demandes
+                           if d.cellule is None or self.cout(d, d.cellule) > 0]
+            if not a_ameliorer:
+                return
+            self.iterations += 1
+            progres = False
+            for demande in self.hasard.sample(a_ameliorer, len(a_ameliorer)):
+                if time.monotonic() >= echeance:
+                    return
+                if demande.cellule is None:
+                    progres |= self.inserer_par_ejection(demande)
+                else:
+                    progres |= self.deplacer(demande)
+            if not progres:
+                return
+
+    def deplacer(self, demande):
+        actuelle = demande.cellule
+        cout_actuel = self.cout(demande, actuelle)
+        self.retirer(demande)
+        cellule, cout = self.meilleure_cellule(demande)
+        if cellule is not None and cout < cout_actuel:
+            self.placer(demande, cellule)
+            return True
+        self.placer(demande, actuelle)
+        return False
+
+    def inserer_par_ejection(self, demande):
+        cellule, _ = self.meilleure_cellule(demande)
+        if cellule is not None:
+            self.placer(demande, cellule)
+            return True
+        # Déloger une demande qui bloque la salle et la replacer ailleurs
+        occupees = list(self.salle_occupee)
+        for cellule in self.hasard.sample(occupees, len(occupees)):
+            if not self.enseignant_libre(demande, *cellule[:2]):
+                continue
+            occupant = self.salle_occupee[cellule]
+            self.retirer(occupant)
+            if self.libre(demande, cellule):
+                self.placer(demande, cellule)
+                ailleurs, _ = self.meilleure_cellule(occupant)
+                if ailleurs is not None:
+                    self.placer(occupant, ailleurs)
+                    return True
+                self.retirer(demande)
+            self.placer(occupant, cellule)
+        return False
+
+    # Résultat
+
+    def seances(self):
+        lundi = self.debut - timedelta(days=self.debut.weekday())
+        for demande in self.demandes:
+            if demande.cellule is None:
+                continue
+            jour, c, salle = demande.cellule
+            dates = (lundi + timedelta(weeks=semaine, days=jour)
+                     for semaine in range(self.semaines + 1))
+            dates = [date for date in dates if date >= self.debut]
+            for date in dates[:demande.occurrences]:
+                yield Seance(cours_id=demande.cours_id, date=date, salle=salle,
+                             heure_debut=self.creneaux[c], duree=self.duree)
+
+    def rapport(self, duree, seances_creees):
+        non_planifies = sorted({d.cours_id for d in self.demandes if d.cellule is None})
+        return {
+            'cours': len(self.cours),
+            'demandes': len(self.demandes),
+            'placees': sum(1 for d in self.demandes if d.cellule is not None),
+            'non_planifies': non_planifies,
+            'cout': self.cout_total(),
+            'iterations': self.iterations,
+            'seances': seances_creees,
+            'duree': round(duree, 3),
+        }
+
+
+def planifier_semestre(cours, salles, debut, semaines, creneaux, duree,
+                       indisponibilites=None, temps_max=10, appliquer=True):
+    """
+    Planifie les cours donnés et insère les séances en un bulk_create.
+    Avec appliquer=False, seul le rapport est calculé.
+    """
+    fin = debut + timedelta(weeks=semaines)
+    # Les cours qui ont déjà des séances sur la période ne sont pas replanifiés
+    deja_planifies = Seance.objects.filter(
+        date__gte=debut, date__lt=fin).values('cours_id')
+    cours = cours.exclude(id__in=deja_planifies).only(
+        'id', 'enseignant_id', 'anneeetude', 'semestre', 'volumehoraire')
+    solveur = Solveur(cours, salles, debut, semaines, creneaux, duree,
+                      indisponibilites, temps_max)
+    solveur.bloquer_seances_existantes(
+        valeurs_seances(Seance.objects.filter(date__gte=debut, date__lt=fin)))
+    duree_calcul = solveur.resoudre()
+
+    seances = list(solveur.seances())
+    if appliquer:
+        with transaction.atomic():
+            Seance.objects.bulk_create(seances, batch_size=1000)
+            mise_en_cache.invalider(Seance)
+    return solveur.rapport(duree_calcul, len(seances))
@@ -0,0 +1,83 @@
+import numpy as np
+from django.core.cache import cache
+
+from .models import Note
+
+# Seuil de validation (note sur 20)
+NOTE_VALIDATION = 10
+PERCENTILES = (10, 25, 50, 75, 90)
+# Tranches de l'histogramme : [0, 2), [2, 4), ..., [18, 20]
+NOMBRE_TRANCHES = 10
+CACHE_TIMEOUT = 60 * 60
+
+
+def cle_cache_stats(cours_id):
+    return f'gestion:cours-stats:{cours_id}'
+
+
+def invalider_stats(cours_id):
+    cache.delete(cle_cache_stats(cours_id))
+
+
+def statistiques_cours(cours_id):
+    """
+    Statistiques des notes d'un cours, par type d'examen et pour l'ensemble.
+    Le résultat est mis en cache jusqu'à la prochaine modification d'une note
+    du cours (voir gestion.signals).
+    """
+    cle = cle_cache_stats(cours_id)
+    stats = cache.get(cle)
+    if stats is None:
+        stats = calculer_statistiques(cours_id)
+        cache.set(cle, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def calculer_statistiques(cours_id):
+    # Une seule requête : uniquement les deux colonnes utiles
+    lignes = list(
+        Note.objects.filter(cours_id=cours_id)
+        .values_list('type_examen', 'note')
+    )
+    if not lignes:
+        return {'cours': cours_id, 'ensemble': resumer(np.empty(0)), 'par_type': {}}
+
+    types, notes = zip(*lignes)
+    notes = np.asarray(notes, dtype=np.float64)
+    noms, groupes = np.unique(np.asarray(types), return_inverse=True)
+
+    return {
+        'cours': cours_id,
+        'ensemble': resumer(notes),
+        'par_type': {
+            str(nom): resumer(notes[groupes == i])
+            for i, nom in enumerate(noms)
+        },
+    }
+
+
+def resumer(notes):
+    if notes.size == 0:
+        return {'effectif': 0}
+    effectifs, bornes = np.histogram(notes, bins=NOMBRE_TRANCHES, range=(0, 20))
+    return {
+        'effectif': int(notes.size),
+        'moyenne': arrondir(notes.mean()),
+        'mediane': arrondir(np.median(notes)),
+        'ecart_type': arrondir(notes.std()),
+        'min': arrondir(notes.min()),
+        'max': arrondir(notes.max()),
+        'percentiles': {
+            str(p): arrondir(v)
+            for p, v in zip(PERCENTILES, np.percentile(notes, PERCENTILES))
+        },
+        'histogramme': [
+            {'de': arrondir(debut), 'a': arrondir(fin), 'effectif': int(n)}
+            for debut, fin, n in zip(bornes[:-1], bornes[1:], effectifs)
+        ],
+        'taux_reussite': arrondir((notes >= NOTE_VALIDATION).mean()),
+    }
+
+
+def arrondir(valeur):
+    return round(float(valeur), 2)
@@ -0,0 +1,96 @@
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from .models import Cours, Exercice, Note, Releve, Seance, SoumissionExercice, User
+
+# Nombre de séances à venir renvoyées par tableau de bord
+LIMITE_A_VENIR = 50
+
+
+def cours_avec_effectifs():
+    """Cours annotés du nombre d'inscrits (COUNT en SQL, une seule requête)."""
+    return (
+        Cours.objects.annotate(nombre_inscrits=Count('inscriptions', distinct=True))
+        .order_by('anneeetude', 'semestre', 'titre')
+    )
+
+
+def seances_a_venir(cours):
+    return (
+        Seance.objects.filter(cours__in=cours, date__gte=timezone.localdate())
+        .order_by('date', 'heure_debut', 'id')[:LIMITE_A_VENIR]
+    )
+
+
+def tableau_secretaire():
+    """
+    Enseignants, étudiants et cours en deux requêtes : les utilisateurs des
+    deux rôles sont lus ensemble puis répartis.
+    """
+    enseignants, etudiants = [], []
+    utilisateurs = User.objects.filter(
+        role__in=['enseignant', 'etudiant']).order_by('nom', 'prenom', 'id')
+    for user in utilisateurs:
+        (enseignants if user.role == 'enseignant' else etudiants).append(user)
+    cours = list(cours_avec_effectifs())
+    return {
+        'enseignants': enseignants,
+        'etudiants': etudiants,
+        'cours': cours,
+        'compteurs': {
+            'enseignants': len(enseignants),
+            'etudiants': len(etudiants),
+            'cours': len(cours),
+            'inscriptions': sum(c.nombre_inscrits for c in cours),
+        },
+    }
+
+
+def tableau_etudiant(etudiant):
+    """
+    Catalogue des cours avec le drapeau `enrolled` (EXISTS en SQL), notes,
+    relevés, séances et exercices à venir des cours suivis : cinq requêtes.
+    """
+    inscrits = Cours.objects.filter(inscriptions__etudiant=etudiant)
+    cours = list(cours_avec_effectifs().annotate(enrolled=Exists(
+        etudiant.inscriptions.filter(cours=OuterRef('pk')))))
+    exercices = list(
+        Exercice.objects.filter(cours__in=inscrits, date_limite__gte=timezone.now())
+        .annotate(soumis=Exists(SoumissionExercice.objects.filter(
+            exercice=OuterRef('pk'), etudiant=etudiant)))
+        .order_by('date_limite', 'id')
+    )
+    return {
+        'cours': cours,
+        'notes': Note.objects.filter(etudiant=etudiant).order_by('cours_id', 'type_examen'),
+        'releves': Releve.objects.filter(etudiant=etudiant).order_by('anneeetude', 'semestre'),
+        'seances': seances_a_venir(inscrits),
+        'exercices': exercices,
+        'compteurs': {
+            'cours_inscrits': sum(c.enrolled for c in cours),
+            'exercices_a_rendre': sum(not e.soumis for e in exercices),
+        },
+    }
+
+
+def tableau_enseignant(enseignant):
+    """Cours de l'enseignant avec effectifs, séances à venir et exercices : trois requêtes."""
+    cours = list(
+        cours_avec_effectifs().filter(enseignant=enseignant)
+        .annotate(nombre_seances=Count('seance', distinct=True))
+    )
+    exercices = list(
+        Exercice.objects.filter(cours__enseignant=enseignant)
+        .annotate(nombre_soumissions=Count('soumissionexercice'))
+        .order_by('date_limite', 'id')
+    )
+    return {
+        'cours': cours,
+        'seances': seances_a_venir(Cours.objects.filter(enseignant=enseignant)),
+        'exercices': exercices,
+        'compteurs': {
+            'cours': len(cours),
+            'inscriptions': sum(c.nombre_inscrits for c in cours),
+            'soumissions': sum(e.nombre_soumissions for e in exercices),
+        },
+    }
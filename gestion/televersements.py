@@ -0,0 +1,130 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.http import UnreadablePostError
+from rest_framework import status
+
+from .models import SoumissionExercice, TeleversementSoumission
+
+# Le corps des requêtes est lu et écrit par blocs : un morceau n'est
+# jamais entièrement en mémoire
+TAILLE_BLOC = 64 * 1024
+DOSSIER = 'televersements'
+
+
+class ErreurTeleversement(Exception):
+    """Envoi refusé ; `recu` indique au client où reprendre."""
+
+    def __init__(self, message, recu, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(message)
+        self.message = message
+        self.recu = recu
+        self.status_code = status_code
+
+    def as_dict(self):
+        return {'detail': self.message, 'recu': self.recu}
+
+
+class FichierPartiel(File):
+    """Fichier sur disque : FileSystemStorage le déplace au lieu de le recopier."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def chemin_partiel(televersement):
+    return os.path.join(settings.MEDIA_ROOT, DOSSIER, f'{televersement.pk}.part')
+
+
+def empreinte(chemin):
+    sha256 = hashlib.sha256()
+    with open(chemin, 'rb') as fichier:
+        for bloc in iter(lambda: fichier.read(TAILLE_BLOC), b''):
+            sha256.update(bloc)
+    return sha256.hexdigest()
+
+
+def ajouter(televersement, flux, decalage):
+    """
+    Écrit le morceau lu sur `flux` à la position `decalage`, qui doit être
+    le nombre d'octets déjà reçus. Une connexion coupée en cours de morceau
+    garde les octets arrivés : le client reprend à la position renvoyée.
+    """
+    with transaction.atomic():
+        # Verrou : deux morceaux du même envoi ne s'écrivent pas en même temps
+        televersement = TeleversementSoumission.objects.select_for_update().get(
+            pk=televersement.pk)
+        if decalage != televersement.recu:
+            raise ErreurTeleversement(
+                "Le morceau ne commence pas à la position attendue.",
+                televersement.recu, status.HTTP_409_CONFLICT)
+        restant = televersement.taille - televersement.recu
+
+        chemin = chemin_partiel(televersement)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+        ecrits = 0
+        with open(chemin, 'r+b' if os.path.exists(chemin) else 'w+b') as fichier:
+            # Octets d'un morceau refusé ou interrompu : écrasés
+            fichier.truncate(televersement.recu)
+            fichier.seek(televersement.recu)
+            try:
+                for bloc in iter(lambda: flux.read(TAILLE_BLOC) if flux else b'', b''):
+                    if ecrits + len(bloc) > restant:
+                        fichier.truncate(televersement.recu)
+                        raise ErreurTeleversement(
+                            "Le fichier dépasse la taille annoncée.", televersement.recu)
+                    fichier.write(bloc)
+                    ecrits += len(bloc)
+            except UnreadablePostError:
+                pass
+
+        televersement.recu += ecrits
+        televersement.save(update_fields=['recu', 'date_maj'])
+    return televersement
+
+
+def terminer(televersement):
+    """
+    Vérifie la taille et le SHA-256 du fichier reçu puis crée la
+    SoumissionExercice. Fichier corrompu : l'envoi reprend à zéro.
+    """
+    with transaction.atomic():
+        televersement = TeleversementSoumission.objects.select_for_update().get(
+            pk=televersement.pk)
+        if televersement.recu != televersement.taille:
+            raise ErreurTeleversement(
+                "Le fichier n'est pas entièrement reçu.", televersement.recu)
+
+        chemin = chemin_partiel(televersement)
+        corrompu = empreinte(chemin) != televersement.sha256
+        if corrompu:
+            os.remove(chemin)
+            televersement.recu = 0
+            televersement.save(update_fields=['recu', 'date_maj'])
+        else:
+            soumission = SoumissionExercice(
+                etudiant_id=televersement.etudiant_id,
+                exercice_id=televersement.exercice_id)
+            with open(chemin, 'rb') as fichier:
+                soumission.fichier.save(
+                    televersement.nom_fichier, FichierPartiel(fichier), save=False)
+            soumission.save()
+            televersement.delete()
+
+    if corrompu:
+        raise ErreurTeleversement(
+            "Somme de contrôle invalide : le fichier doit être renvoyé.", 0)
+    # Stockage autre que FileSystemStorage : le fichier a été recopié
+    if os.path.exists(chemin):
+        os.remove(chemin)
+    return soumission
+
+
+def supprimer(televersement):
+    chemin = chemin_partiel(televersement)
+    if os.path.exists(chemin):
+        os.remove(chemin)
+    televersement.delete()
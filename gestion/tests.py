@@ -1,3 +1,1397 @@
-from django.test import TestCase
+import csv
+import datetime
+import hashlib
+import io
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError, ValidationError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken, OutstandingToken)
+
+from . import jetons
+from .imports import importer_etudiants
+from .models import (
+    Cours, Exercice, Inscription, Note, Question, Releve, Seance, SerieSeance,
+    SoumissionExercice, TeleversementSoumission, User)
+from .planning import IndexIntervalles, balayer_conflits
+from .renderers import ORJSONParser, ORJSONRenderer
+from .serializers import (
+    CoursSerializer, CoursValuesSerializer, SeanceSerializer, SerieSeanceSerializer,
+    UserSerializer, UserValuesSerializer)
+
+
+def creer_cours(enseignant, **extra):
+    data = {
+        'titre': 'Algèbre',
+        'description': 'Cours d\'algèbre linéaire',
+        'volumehoraire': '30.00',
+        'type_cours': 'CM',
+        'semestre': 'S1',
+        'anneeetude': '1',
+    }
+    data.update(extra)
+    return Cours.objects.create(enseignant=enseignant, **data)
+
+
+def creer_etudiants(nombre, debut=0):
+    return [
+        User.objects.create_user(
+            email=f'etudiant{i}@univ.test', password='motdepasse',
+            role='etudiant', nom=f'Nom{i}', prenom=f'Prenom{i}')
+        for i in range(debut, debut + nombre)
+    ]
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ApiTestCase(TestCase):
+
+    def setUp(self):
+        self.secretaire = User.objects.create_user(
+            email='secretaire@univ.test', password='motdepasse',
+            role='secretaire')
+        self.enseignant = User.objects.create_user(
+            email='enseignant@univ.test', password='motdepasse',
+            role='enseignant', fonction='MCF')
+        self.cours = creer_cours(self.enseignant)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.secretaire)
+
+
+class InscriptionQueryCountTests(ApiTestCase):
+
+    def inscrire(self, etudiants):
+        Inscription.objects.bulk_create(
+            Inscription(etudiant=etudiant, cours=self.cours)
+            for etudiant in etudiants)
+
+    def test_nombre_de_requetes_constant(self):
+        url = reverse('inscriptions-list')
+
+        self.inscrire(creer_etudiants(3))
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'cours': self.cours.id})
+        self.assertEqual(len(response.data), 3)
+
+        self.inscrire(creer_etudiants(30, debut=3))
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'cours': self.cours.id})
+        self.assertEqual(len(response.data), 33)
+        self.assertEqual(response.data[0]['cours']['titre'], 'Algèbre')
+
+
+class KeysetPaginationTests(ApiTestCase):
+
+    def parcourir(self, url, params):
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            pages.append(response.data['results'])
+            if not response.data['next']:
+                return pages, response
+            response = self.client.get(response.data['next'])
+
+    def test_sans_parametre_la_liste_reste_complete(self):
+        creer_etudiants(3)
+        response = self.client.get(reverse('student-list-create'))
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
+
+    def test_parcours_des_etudiants_par_id(self):
+        ids = [e.id for e in creer_etudiants(7)]
+        pages, derniere = self.parcourir(
+            reverse('student-list-create'), {'page_size': 3})
+        self.assertEqual([len(page) for page in pages], [3, 3, 1])
+        self.assertEqual([e['id'] for page in pages for e in page], ids)
+
+        response = self.client.get(derniere.data['previous'])
+        self.assertEqual([e['id'] for e in response.data['results']], ids[3:6])
+
+    def test_seances_par_date_et_heure(self):
+        jour = datetime.date(2025, 1, 6)
+        for heure in (14, 8, 10):
+            for decalage in (1, 0):
+                Seance.objects.create(
+                    cours=self.cours, duree=2, salle='A1',
+                    date=jour + datetime.timedelta(days=decalage),
+                    heure_debut=datetime.time(heure))
+        pages, _ = self.parcourir(reverse('seances-list'), {'page_size': 4})
+        seances = [(s['date'], s['heure_debut']) for page in pages for s in page]
+        self.assertEqual(len(seances), 6)
+        self.assertEqual(seances, sorted(seances))
+
+    def test_curseur_invalide(self):
+        response = self.client.get(
+            reverse('student-list-create'), {'cursor': 'pas-un-curseur'})
+        self.assertEqual(response.status_code, 404)
+
+
+class ExplainQuerysetsCommandTests(ApiTestCase):
+
+    def test_plan_affiche_pour_chaque_liste(self):
+        out = StringIO()
+        call_command('explain_querysets', stdout=out)
+        sortie = out.getvalue()
+        self.assertIn('student-list-create', sortie)
+        self.assertIn('seances-list', sortie)
+        self.assertIn('seance_date_heure_idx', sortie)
+
+
+class NoteFilterTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.alice, self.bob = creer_etudiants(2)
+        autre_cours = creer_cours(self.enseignant, titre='Analyse')
+        for etudiant in (self.alice, self.bob):
+            for cours in (self.cours, autre_cours):
+                for type_examen in ('partiel', 'final'):
+                    Note.objects.create(
+                        etudiant=etudiant, cours=cours, type_examen=type_examen,
+                        note='12.50', explication='')
+
+    def test_filtres(self):
+        url = reverse('notes-examens-list')
+        response = self.client.get(url, {'etudiant_id': self.alice.id})
+        self.assertEqual(len(response.data), 4)
+        response = self.client.get(url, {
+            'etudiant_id': self.alice.id, 'cours': self.cours.id,
+            'type_examen': 'final'})
+        self.assertEqual(len(response.data), 1)
+
+    def test_un_etudiant_ne_voit_que_ses_notes(self):
+        self.client.force_authenticate(user=self.alice)
+        url = reverse('notes-examens-list')
+        response = self.client.get(url, {'etudiant_id': self.bob.id})
+        self.assertEqual(response.data, [])
+        response = self.client.get(url)
+        self.assertEqual({n['etudiant'] for n in response.data}, {self.alice.id})
+
+        note_de_bob = Note.objects.filter(etudiant=self.bob).first()
+        response = self.client.get(reverse('note-examen-detail', args=[note_de_bob.id]))
+        self.assertEqual(response.status_code, 404)
+
+
+class CoursStatsTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('cours-stats', args=[self.cours.id])
+        etudiants = creer_etudiants(4)
+        for etudiant, note in zip(etudiants, ('4.00', '10.00', '12.00', '18.00')):
+            Note.objects.create(etudiant=etudiant, cours=self.cours,
+                                type_examen='final', note=note, explication='')
+        Note.objects.create(etudiant=etudiants[0], cours=self.cours,
+                            type_examen='partiel', note='8.00', explication='')
+
+    def test_statistiques_par_type(self):
+        response = self.client.get(self.url)
+        final = response.data['par_type']['final']
+        self.assertEqual(final['effectif'], 4)
+        self.assertEqual(final['moyenne'], 11.0)
+        self.assertEqual(final['mediane'], 11.0)
+        self.assertEqual(final['taux_reussite'], 0.75)
+        self.assertEqual(sum(t['effectif'] for t in final['histogramme']), 4)
+        self.assertEqual(response.data['ensemble']['effectif'], 5)
+
+    def test_cache_invalide_par_les_notes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+        Note.objects.filter(type_examen='partiel').first().delete()
+        response = self.client.get(self.url)
+        self.assertNotIn('partiel', response.data['par_type'])
+
+    def test_cours_inconnu(self):
+        response = self.client.get(reverse('cours-stats', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+
+
+class ReleveTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.etudiant, = creer_etudiants(1)
+        self.cours_s2 = creer_cours(self.enseignant, titre='Analyse',
+                                    volumehoraire='10.00')
+        self.cours_s2_bis = creer_cours(self.enseignant, titre='Probabilités',
+                                        volumehoraire='30.00')
+
+    def noter(self, cours, note, type_examen='final'):
+        return Note.objects.create(etudiant=self.etudiant, cours=cours,
+                                   type_examen=type_examen, note=note,
+                                   explication='')
+
+    def test_moyenne_ponderee_maintenue_par_les_signaux(self):
+        self.noter(self.cours_s2, '8.00')
+        self.noter(self.cours_s2_bis, '12.00')
+        releve = Releve.objects.get(etudiant=self.etudiant)
+        # (8 * 10 + 12 * 30) / 40
+        self.assertEqual(releve.moyenne, Decimal('11.00'))
+        self.assertEqual(releve.nombre_cours, 2)
+
+        note = self.noter(self.cours_s2, '12.00', type_examen='partiel')
+        self.assertEqual(Releve.objects.get(etudiant=self.etudiant).moyenne,
+                         Decimal('11.50'))
+        note.delete()
+        self.assertEqual(Releve.objects.get(etudiant=self.etudiant).moyenne,
+                         Decimal('11.00'))
+
+        self.cours_s2.semestre = 'S2'
+        self.cours_s2.save()
+        self.assertEqual(
+            set(Releve.objects.values_list('semestre', 'moyenne')),
+            {('S1', Decimal('12.00')), ('S2', Decimal('8.00'))})
+
+    def test_detail_etudiant_et_reconstruction(self):
+        self.noter(self.cours_s2, '14.00')
+        Releve.objects.all().delete()
+        call_command('rebuild_transcripts', batch_size=1, stdout=StringIO())
+
+        response = self.client.get(
+            reverse('student-detail', args=[self.etudiant.id]))
+        self.assertEqual(len(response.data['releves']), 1)
+        self.assertEqual(response.data['releves'][0]['moyenne'], '14.00')
+
+
+class ImportEtudiantsTests(ApiTestCase):
+    CSV = (
+        "email,password,nom,prenom,filiere,anneeetude,datedenaissance\n"
+        "a@univ.test,secret1,Durand,Alice,INFO,1,2004-05-01\n"
+        "b@univ.test,secret2,Martin,Bob,INFO,1,\n"
+        "a@univ.test,secret3,Doublon,Alice,INFO,1,\n"
+        "pas-un-email,secret4,X,Y,INFO,1,\n"
+        "enseignant@univ.test,secret5,Deja,Inscrit,INFO,1,\n"
+        "c@univ.test,secret6,Petit,Chloé,INFO,1,31/12/2004\n"
+    )
+
+    def test_commande(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+            f.write(self.CSV)
+        self.addCleanup(os.remove, f.name)
+        out, err = StringIO(), StringIO()
+        call_command('import_students', f.name, batch_size=2, workers=1,
+                     stdout=out, stderr=err)
+        self.assertIn('2/6', out.getvalue())
+        self.assertEqual(
+            [ligne.split(' :')[0] for ligne in err.getvalue().splitlines()],
+            ['Ligne 4', 'Ligne 5', 'Ligne 6', 'Ligne 7'])
+        alice = User.objects.get(email='a@univ.test')
+        self.assertEqual(alice.role, 'etudiant')
+        self.assertTrue(alice.check_password('secret1'))
+
+    def importer(self, contenu):
+        fichier = SimpleUploadedFile('etudiants.csv', contenu)
+        return self.client.post(reverse('student-import'),
+                                {'fichier': fichier}, format='multipart')
+
+    def test_endpoint(self):
+        response = self.importer(self.CSV.encode('utf-8'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['crees'], 2)
+        self.assertEqual(len(response.data['erreurs']), 4)
+        self.assertTrue(
+            User.objects.get(email='b@univ.test').check_password('secret2'))
+
+    def test_cle_calendrier_des_comptes_importes(self):
+        self.importer(self.CSV.encode('utf-8'))
+        alice, bob = User.objects.filter(
+            email__in=['a@univ.test', 'b@univ.test']).order_by('email')
+        self.assertEqual(len(alice.cle_calendrier), 32)
+        self.assertNotEqual(alice.cle_calendrier, bob.cle_calendrier)
+        # Une modification du profil ne révoque pas le lien déjà distribué
+        cle = alice.cle_calendrier
+        alice.tel = '0600000000'
+        alice.save()
+        alice.refresh_from_db()
+        self.assertEqual(alice.cle_calendrier, cle)
+
+    def test_fichier_invalide_n_importe_rien(self):
+        # L'octet invalide est après le premier lot : rien n'est inséré
+        contenu = self.CSV.encode('utf-8') + b'd@univ.test,\xff\n'
+        texte = io.TextIOWrapper(io.BytesIO(contenu), encoding='utf-8', newline='')
+        with self.assertRaises(UnicodeDecodeError):
+            importer_etudiants(texte, batch_size=1, workers=1)
+        self.assertFalse(User.objects.filter(email='a@univ.test').exists())
+
+        self.assertEqual(self.importer(contenu).status_code, 400)
+        self.assertFalse(User.objects.filter(email='a@univ.test').exists())
+
+    @override_settings(IMPORT_ETUDIANTS_LIGNES_MAX=5)
+    def test_gros_fichier_renvoye_a_la_commande(self):
+        response = self.importer(self.CSV.encode('utf-8'))
+        self.assertEqual(response.status_code, 413)
+        self.assertIn('import_students', response.data['fichier'])
+        self.assertFalse(User.objects.filter(email='a@univ.test').exists())
+
+    def test_endpoint_reserve_au_secretariat(self):
+        self.client.force_authenticate(user=self.enseignant)
+        response = self.client.post(reverse('student-import'), {})
+        self.assertEqual(response.status_code, 403)
+
+
+class InscriptionBulkTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('inscriptions-bulk')
+        self.etudiants = creer_etudiants(3)
+        User.objects.filter(id__in=[e.id for e in self.etudiants[:2]]).update(
+            filiere='INFO', anneeetude='1')
+        self.autre_cours = creer_cours(self.enseignant, titre='Analyse',
+                                       semestre='S2')
+
+    def test_liste_d_ids(self):
+        Inscription.objects.create(etudiant=self.etudiants[0], cours=self.cours)
+        response = self.client.post(self.url, {
+            'etudiant_ids': [e.id for e in self.etudiants],
+            'cours_ids': [self.cours.id, self.autre_cours.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'crees': 5, 'ignores': 1})
+        self.assertEqual(Inscription.objects.count(), 6)
+
+    def test_cohorte_filiere_annee(self):
+        response = self.client.post(self.url, {
+            'filiere': 'INFO', 'anneeetude': '1', 'semestre': 'S1',
+        }, format='json')
+        self.assertEqual(response.data, {'crees': 2, 'ignores': 0})
+        self.assertEqual(
+            set(Inscription.objects.values_list('cours_id', flat=True)),
+            {self.cours.id})
+
+    def test_ids_inconnus(self):
+        response = self.client.post(self.url, {
+            'etudiant_ids': [self.enseignant.id], 'cours_ids': [self.cours.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('etudiant_ids', response.data)
+
+
+class NoteBulkTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('notes-bulk')
+        self.etudiants = creer_etudiants(3)
+
+    def saisir(self, notes, **extra):
+        data = {'cours_id': self.cours.id, 'type_examen': 'final', 'notes': [
+            {'etudiant_id': e.id, 'note': n} for e, n in zip(self.etudiants, notes)]}
+        data.update(extra)
+        return self.client.post(self.url, data, format='json')
+
+    def test_insertion_puis_mise_a_jour(self):
+        response = self.saisir(['10.00', '12.00', '14.00'])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data, {'enregistrees': 3})
+
+        self.client.force_authenticate(user=self.enseignant)
+        self.saisir(['11.00', '12.00'])
+        self.assertEqual(Note.objects.count(), 3)
+        self.assertEqual(Note.objects.get(etudiant=self.etudiants[0]).note,
+                         Decimal('11.00'))
+        self.assertEqual(Releve.objects.get(etudiant=self.etudiants[0]).moyenne,
+                         Decimal('11.00'))
+
+    def test_notes_hors_bornes_rejetees_en_bloc(self):
+        response = self.saisir(['10.00', '21.00', '-1.00'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['notes']), {1, 2})
+        self.assertFalse(Note.objects.exists())
+
+    def test_autre_enseignant_refuse(self):
+        autre = User.objects.create_user(
+            email='autre@univ.test', password='x', role='enseignant')
+        self.client.force_authenticate(user=autre)
+        self.assertEqual(self.saisir(['10.00']).status_code, 403)
+
+    def test_refus_avant_la_validation(self):
+        # Pas de 400 détaillé (étudiants inconnus...) pour un autre utilisateur
+        autre = User.objects.create_user(
+            email='autre@univ.test', password='x', role='enseignant')
+        for user in (autre, self.etudiants[0]):
+            self.client.force_authenticate(user=user)
+            response = self.client.post(self.url, {
+                'cours_id': self.cours.id, 'type_examen': 'final',
+                'notes': [{'etudiant_id': 999, 'note': '30.00'}]}, format='json')
+            self.assertEqual(response.status_code, 403)
+            self.assertNotIn('notes', response.data)
+
+    def test_plusieurs_notes_du_meme_type_permises(self):
+        # Plusieurs notes de TP pour un étudiant : la saisie unitaire les
+        # accepte, la saisie en bloc ne remplace que la plus récente
+        for valeur in ('8.00', '9.00'):
+            response = self.client.post(reverse('notes-examens-list'), {
+                'etudiant_id': self.etudiants[0].id, 'cours_id': self.cours.id,
+                'type_examen': 'final', 'note': valeur, 'explication': 'TP'})
+            self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(self.saisir(['15.00']).status_code, 201)
+        self.assertEqual(
+            list(Note.objects.filter(etudiant=self.etudiants[0])
+                 .order_by('id').values_list('note', flat=True)),
+            [Decimal('8.00'), Decimal('15.00')])
+
+
+class ExportCSVTests(ApiTestCase):
+
+    def lire(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        contenu = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(io.StringIO(contenu)))
+
+    def test_export_des_notes_avec_filtres(self):
+        etudiants = creer_etudiants(3)
+        for etudiant in etudiants:
+            Note.objects.create(etudiant=etudiant, cours=self.cours,
+                                type_examen='final', note='12.50',
+                                explication='Très bien')
+        lignes = self.lire(self.client.get(
+            reverse('notes-export'), {'etudiant_id': etudiants[1].id}))
+        self.assertEqual(lignes[0][0], 'id')
+        self.assertEqual(len(lignes), 2)
+        self.assertEqual(lignes[1][-2:], ['12.50', 'Très bien'])
+
+    def test_export_des_inscriptions_et_des_etudiants(self):
+        for etudiant in creer_etudiants(5):
+            Inscription.objects.create(etudiant=etudiant, cours=self.cours)
+        lignes = self.lire(self.client.get(
+            reverse('inscriptions-export'), {'cours': self.cours.id}))
+        self.assertEqual(len(lignes), 6)
+        self.assertEqual(lignes[1][6], 'Algèbre')
+        self.assertEqual(len(self.lire(self.client.get(reverse('student-export')))), 6)
+
+    def test_export_par_pages_de_cles(self):
+        for etudiant in creer_etudiants(5):
+            Inscription.objects.create(etudiant=etudiant, cours=self.cours)
+        with mock.patch('gestion.views.InscriptionExport.export_chunk_size', 2), \
+                CaptureQueriesContext(connection) as requetes:
+            lignes = self.lire(self.client.get(reverse('inscriptions-export')))
+        self.assertEqual([int(ligne[0]) for ligne in lignes[1:]],
+                         sorted(Inscription.objects.values_list('id', flat=True)))
+        pages = [r['sql'] for r in requetes.captured_queries
+                 if 'gestion_inscription' in r['sql']]
+        # 2 + 2 + 1 lignes : la dernière page, incomplète, termine la lecture
+        self.assertEqual(len(pages), 3)
+        self.assertTrue(all('LIMIT 2' in sql for sql in pages))
+        self.assertIn('"gestion_inscription"."id" >', pages[1])
+
+    def test_export_en_lecture_seule(self):
+        response = self.client.post(reverse('notes-export'), {})
+        self.assertEqual(response.status_code, 405)
+
+
+class ConflitsSeanceTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.jour = datetime.date(2025, 1, 6)
+        self.autre_enseignant = User.objects.create_user(
+            email='autre@univ.test', password='x', role='enseignant')
+        self.autre_cours = creer_cours(self.autre_enseignant, titre='Analyse')
+        Seance.objects.create(cours=self.cours, date=self.jour, salle='A1',
+                              heure_debut=datetime.time(8), duree=2)
+
+    def proposer(self, cours, heure, salle, duree=2):
+        return self.client.post(reverse('seances-list'), {
+            'cours_id': cours.id, 'date': self.jour, 'salle': salle,
+            'heure_debut': datetime.time(heure), 'duree': duree})
+
+    def test_creation_refusee_si_chevauchement(self):
+        # Même salle, autre enseignant
+        response = self.proposer(self.autre_cours, 9, 'A1')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['conflits'][0]['type'], 'salle')
+        # Même enseignant, autre salle
+        response = self.proposer(self.cours, 7, 'B2')
+        self.assertEqual(response.data['conflits'][0]['type'], 'enseignant')
+        # Créneaux contigus acceptés
+        self.assertEqual(self.proposer(self.autre_cours, 10, 'A1').status_code, 201)
+        self.assertEqual(self.proposer(self.cours, 6, 'A1').status_code, 201)
+
+    def test_conflit_verifie_au_moment_de_l_ecriture(self):
+        # Deux requêtes concurrentes : l'autre séance est insérée après la
+        # validation de la première, avant son écriture
+        serializer = SeanceSerializer(data={
+            'cours_id': self.autre_cours.id, 'date': self.jour, 'salle': 'B2',
+            'heure_debut': '14:00', 'duree': 2})
+        self.assertTrue(serializer.is_valid())
+        Seance.objects.create(cours=self.cours, date=self.jour, salle='B2',
+                              heure_debut=datetime.time(15), duree=2)
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.assertEqual(Seance.objects.filter(salle='B2').count(), 1)
+
+    def test_modification_sans_conflit_avec_elle_meme(self):
+        seance = Seance.objects.get()
+        response = self.client.patch(
+            reverse('seance-detail', args=[seance.id]),
+            {'cours_id': self.cours.id, 'heure_debut': '08:30'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_balayage_du_semestre(self):
+        for heure, salle, cours in ((9, 'B2', self.autre_cours),
+                                    (9, 'A1', self.autre_cours),
+                                    (14, 'A1', self.cours)):
+            Seance.objects.create(cours=cours, date=self.jour, salle=salle,
+                                  heure_debut=datetime.time(heure), duree=2)
+        response = self.client.get(reverse('seances-conflicts'),
+                                   {'semestre': 'S1'})
+        self.assertEqual(
+            sorted((c['type'], c['ressource']) for c in response.data),
+            [('enseignant', self.autre_enseignant.id), ('salle', 'A1')])
+
+    def test_index_avec_intervalles_existants_chevauchants(self):
+        index = IndexIntervalles()
+        index.charger([
+            {'id': 1, 'salle': 'A1', 'enseignant_id': 1, 'date': self.jour,
+             'heure_debut': datetime.time(8), 'duree': 4},
+            {'id': 2, 'salle': 'A1', 'enseignant_id': 2, 'date': self.jour,
+             'heure_debut': datetime.time(9), 'duree': 1},
+        ])
+        cle = ('salle', 'A1', self.jour)
+        # [11h, 12h) ne chevauche pas [9h, 10h) mais bien [8h, 12h)
+        self.assertEqual(index.conflit(cle, 11 * 60, 12 * 60), 1)
+        self.assertIsNone(index.conflit(cle, 12 * 60, 13 * 60))
+        index.ajouter(cle, 12 * 60, 16 * 60, 3)
+        self.assertEqual(index.conflit(cle, 15 * 60, 17 * 60), 3)
+        self.assertIsNone(index.conflit(cle, 7 * 60, 8 * 60))
+
+
+class PlanificationTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('seances-planifier')
+        self.autre_enseignant = User.objects.create_user(
+            email='autre@univ.test', password='x', role='enseignant')
+        # 30 h -> 15 séances de 2 h : deux créneaux hebdomadaires sur 14 semaines
+        self.cours.volumehoraire = Decimal('30.00')
+        self.cours.save()
+        self.cours_b = creer_cours(self.enseignant, titre='Analyse',
+                                   volumehoraire='20.00')
+        self.cours_c = creer_cours(self.autre_enseignant, titre='Physique',
+                                   volumehoraire='20.00')
+
+    def planifier(self, **extra):
+        data = {'semestre': 'S1', 'salles': ['A1', 'A2'],
+                'debut': '2025-09-03', 'semaines': 14, 'temps_max': 1}
+        data.update(extra)
+        return self.client.post(self.url, data, format='json')
+
+    def test_planning_sans_conflit(self):
+        response = self.planifier(indisponibilites=[
+            {'enseignant_id': self.autre_enseignant.id, 'jour': 0, 'heure': '08:00'}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['non_planifies'], [])
+        self.assertEqual(response.data['seances'], 15 + 10 + 10)
+        self.assertEqual(Seance.objects.count(), 35)
+        self.assertEqual(balayer_conflits(Seance.objects.all()), [])
+        self.assertFalse(Seance.objects.filter(
+            cours=self.cours_c, date__week_day=2, heure_debut=datetime.time(8)).exists())
+        self.assertFalse(Seance.objects.filter(date__lt='2025-09-03').exists())
+
+        # Relancer ne duplique pas les séances déjà planifiées
+        self.assertEqual(self.planifier().data['cours'], 0)
+
+    def test_capacite_insuffisante_et_simulation(self):
+        # 7 créneaux hebdomadaires demandés pour 5 cellules (1 salle x 5 jours)
+        response = self.planifier(salles=['A1'], creneaux=['08:00'],
+                                  semaines=5, appliquer=False)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['demandes'], 7)
+        self.assertEqual(response.data['placees'], 5)
+        self.assertTrue(response.data['non_planifies'])
+        self.assertFalse(Seance.objects.exists())
+
+    def test_creneaux_chevauches_par_une_longue_seance(self):
+        # 4 h : les créneaux 8h/10h et 14h/16h se recouvrent deux à deux
+        response = self.planifier(salles=['A1'], duree=4, semaines=2)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['non_planifies'], [])
+        self.assertEqual(response.data['placees'], response.data['demandes'])
+        self.assertEqual(balayer_conflits(Seance.objects.all()), [])
+
+    def test_commande(self):
+        out = StringIO()
+        call_command('planifier_semestre', semestre='S1', salles='A1,A2',
+                     debut='2025-09-01', dry_run=True, temps_max=1, stdout=out)
+        self.assertIn('4/4 créneaux placés pour 3 cours', out.getvalue())
+
+
+class SerieSeanceTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('series-seances-list')
+        self.data = {
+            'cours_id': self.cours.id, 'frequence': 'hebdomadaire',
+            'date_debut': '2025-09-01', 'date_fin': '2025-12-01',
+            'exclusions': ['2025-11-10'], 'duree': 2,
+            'heure_debut': '08:00', 'salle': 'A1',
+        }
+
+    def test_generation_et_modification_de_la_serie(self):
+        # cours, puis dans la transaction : cours et verrou de l'enseignant,
+        # séances existantes, série, occurrences (+ savepoint)
+        with self.assertNumQueries(8):
+            response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, 201)
+        serie = SerieSeance.objects.get()
+        # 14 lundis du 1er septembre au 1er décembre, moins le 10 novembre
+        self.assertEqual(serie.seances.count(), 13)
+        self.assertFalse(serie.seances.filter(date='2025-11-10').exists())
+        question = Question.objects.create(
+            etudiant=creer_etudiants(1)[0], contenu='?',
+            seance=serie.seances.get(date='2025-09-15'))
+
+        response = self.client.patch(
+            reverse('serie-seance-detail', args=[serie.id]),
+            {'salle': 'B2', 'frequence': 'bihebdomadaire', 'exclusions': []},
+            format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(serie.seances.count(), 7)
+        self.assertEqual(set(serie.seances.values_list('salle', flat=True)), {'B2'})
+        self.assertFalse(serie.seances.filter(date='2025-09-08').exists())
+        # Les séances conservées gardent leurs questions
+        self.assertTrue(Question.objects.filter(id=question.id).exists())
+
+    def test_serie_en_conflit_refusee(self):
+        Seance.objects.create(cours=creer_cours(self.enseignant, titre='TD'),
+                              date=datetime.date(2025, 10, 6), salle='C3',
+                              heure_debut=datetime.time(9), duree=1)
+        response = self.client.post(self.url, self.data, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['conflits'][0]['type'], 'enseignant')
+        self.assertFalse(SerieSeance.objects.exists())
+
+    def test_conflit_verifie_au_moment_de_l_ecriture(self):
+        # Séance insérée par une requête concurrente entre la validation et
+        # l'écriture de la série
+        serializer = SerieSeanceSerializer(data=self.data)
+        self.assertTrue(serializer.is_valid())
+        Seance.objects.create(cours=creer_cours(self.enseignant, titre='TD'),
+                              date=datetime.date(2025, 10, 6), salle='C3',
+                              heure_debut=datetime.time(9), duree=1)
+        with self.assertRaises(ValidationError):
+            serializer.save()
+        self.assertFalse(SerieSeance.objects.exists())
+        self.assertEqual(Seance.objects.count(), 1)
+
+
+class CalendrierTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.etudiant, = creer_etudiants(1)
+        Inscription.objects.create(etudiant=self.etudiant, cours=self.cours)
+        self.seance = Seance.objects.create(
+            cours=self.cours, date=datetime.date(2025, 9, 1), salle='A1',
+            heure_debut=datetime.time(8), duree=2)
+        Exercice.objects.create(
+            cours=self.cours, description='', titre_exercice='TP 1, partie A',
+            type_exercice='TP',
+            date_limite=datetime.datetime(2025, 9, 5, 18, tzinfo=datetime.timezone.utc))
+        self.url_ics = reverse('calendrier-ics', args=[self.etudiant.id])
+        self.client.force_authenticate(user=self.etudiant)
+
+    def lien_ics(self):
+        return self.client.get(
+            reverse('calendrier-json', args=[self.etudiant.id])).data['lien_ics']
+
+    def test_flux_ics(self):
+        response = self.client.get(self.lien_ics())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/calendar; charset=utf-8')
+        contenu = response.content.decode()
+        self.assertIn('DTSTART:20250901T080000\r\nDTEND:20250901T100000', contenu)
+        self.assertIn('SUMMARY:Algèbre : TP 1\\, partie A', contenu)
+        self.assertIn('DTSTART:20250905T180000Z', contenu)
+
+    def test_jeton_obligatoire(self):
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get(self.url_ics).status_code, 403)
+        response = self.client.get(self.url_ics, {'token': 'faux'})
+        self.assertEqual(response.status_code, 403)
+
+    def test_requete_conditionnelle(self):
+        lien = self.lien_ics()
+        etag = self.client.get(lien)['ETag']
+        with self.assertNumQueries(2):  # utilisateur + version agrégée
+            response = self.client.get(lien, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.seance.salle = 'B2'
+        self.seance.save()
+        response = self.client.get(lien, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('LOCATION:B2', response.content.decode())
+
+        etag = response['ETag']
+        self.seance.delete()
+        self.assertEqual(
+            self.client.get(lien, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_cours_renomme(self):
+        lien = self.lien_ics()
+        etag = self.client.get(lien)['ETag']
+        self.cours.titre = 'Algèbre linéaire'
+        self.cours.save()
+        response = self.client.get(lien, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('SUMMARY:Algèbre linéaire', response.content.decode())
+
+    def test_lien_stable_au_rehachage(self):
+        lien = self.lien_ics()
+        # Même mot de passe réhaché (connexion, changement de coût) : lien conservé
+        self.etudiant.check_password('motdepasse')
+        User.objects.filter(pk=self.etudiant.pk).update(password='md5$autre$hachage')
+        self.assertEqual(self.client.get(lien).status_code, 200)
+        self.assertEqual(self.lien_ics(), lien)
+
+        # Nouveau mot de passe : l'ancien lien est révoqué
+        self.etudiant.set_password('nouveau-mdp')
+        self.etudiant.save()
+        self.assertEqual(self.client.get(lien).status_code, 403)
+        self.assertEqual(self.client.get(self.lien_ics()).status_code, 200)
+
+    def test_json_reserve_au_titulaire(self):
+        autre, = creer_etudiants(1, debut=1)
+        self.client.force_authenticate(user=autre)
+        response = self.client.get(
+            reverse('calendrier-json', args=[self.etudiant.id]))
+        self.assertEqual(response.status_code, 403)
+
+
+class DashboardTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.autre_cours = creer_cours(self.enseignant, titre='Analyse')
+        self.etudiants = creer_etudiants(3)
+        Inscription.objects.bulk_create(
+            Inscription(etudiant=etudiant, cours=self.cours)
+            for etudiant in self.etudiants)
+        demain = datetime.date.today() + datetime.timedelta(days=1)
+        Seance.objects.create(cours=self.cours, date=demain, salle='A1',
+                              heure_debut=datetime.time(8), duree=2)
+        Exercice.objects.create(
+            cours=self.cours, description='', titre_exercice='TP 1',
+            type_exercice='TP',
+            date_limite=datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(days=7))
+
+    def test_secretaire(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('dashboard-secretaire'))
+        self.assertEqual(len(response.data['enseignants']), 1)
+        self.assertEqual(len(response.data['etudiants']), 3)
+        effectifs = {c['titre']: c['nombre_inscrits'] for c in response.data['cours']}
+        self.assertEqual(effectifs, {'Algèbre': 3, 'Analyse': 0})
+        self.assertEqual(response.data['compteurs']['inscriptions'], 3)
+
+    def test_etudiant(self):
+        self.client.force_authenticate(user=self.etudiants[0])
+        with self.assertNumQueries(5):
+            response = self.client.get(reverse('dashboard-etudiant'))
+        inscrit = {c['titre']: c['enrolled'] for c in response.data['cours']}
+        self.assertEqual(inscrit, {'Algèbre': True, 'Analyse': False})
+        self.assertEqual(len(response.data['seances']), 1)
+        self.assertFalse(response.data['exercices'][0]['soumis'])
+        self.assertEqual(response.data['compteurs'],
+                         {'cours_inscrits': 1, 'exercices_a_rendre': 1})
+
+    def test_enseignant(self):
+        self.client.force_authenticate(user=self.enseignant)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('dashboard-enseignant'))
+        cours = {c['titre']: (c['nombre_inscrits'], c['nombre_seances'])
+                 for c in response.data['cours']}
+        self.assertEqual(cours, {'Algèbre': (3, 1), 'Analyse': (0, 0)})
+        self.assertEqual(response.data['exercices'][0]['nombre_soumissions'], 0)
+
+    def test_page_reservee_au_role(self):
+        self.client.force_authenticate(user=self.enseignant)
+        self.assertEqual(
+            self.client.get(reverse('dashboard-etudiant')).status_code, 403)
+        self.assertEqual(
+            self.client.get(reverse('dashboard-secretaire')).status_code, 403)
+
+
+class CacheReponsesTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_liste_servie_depuis_le_cache(self):
+        url = reverse('cours-list-create')
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual([c['titre'] for c in response.data], ['Algèbre'])
+
+        creer_cours(self.enseignant, titre='Analyse')  # post_save : nouvelle version
+        response = self.client.get(url)
+        self.assertEqual(len(response.data), 2)
+
+        stats = self.client.get(reverse('cache-stats')).data['CoursListCreate']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 2))
+
+    def test_filtres_dans_la_cle(self):
+        autre = User.objects.create_user(
+            email='autre@univ.test', password='motdepasse', role='enseignant')
+        creer_cours(autre, titre='Analyse')
+        url = reverse('cours-list-create')
+        self.assertEqual(len(self.client.get(url).data), 2)
+        response = self.client.get(url, {'enseignant': autre.id})
+        self.assertEqual([c['titre'] for c in response.data], ['Analyse'])
+
+    def test_ecriture_en_masse_invalide(self):
+        url = reverse('dashboard-secretaire')
+        etudiants = creer_etudiants(2)
+        self.client.get(url)
+        # bulk_create n'envoie pas de post_save
+        response = self.client.post(reverse('inscriptions-bulk'), {
+            'etudiant_ids': [e.id for e in etudiants], 'cours_ids': [self.cours.id],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        response = self.client.get(url)
+        self.assertEqual(response.data['compteurs']['inscriptions'], 2)
+
+
+class ETagTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('cours-detail', args=[self.cours.id])
+
+    def test_get_conditionnel(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        Cours.objects.filter(pk=self.cours.pk).update(titre='Algèbre II')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_match_empeche_la_mise_a_jour_perdue(self):
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.patch(self.url, {'titre': 'Analyse'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # Deuxième écriture avec l'ancien ETag : refusée
+        response = self.client.patch(self.url, {'titre': 'Géométrie'}, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+        self.cours.refresh_from_db()
+        self.assertEqual(self.cours.titre, 'Analyse')
+        response = self.client.delete(self.url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, 412)
+
+    def test_relations_dans_l_etag(self):
+        etudiant, = creer_etudiants(1)
+        url = reverse('student-detail', args=[etudiant.id])
+        etag = self.client.get(url)['ETag']
+        Note.objects.create(etudiant=etudiant, cours=self.cours,
+                            type_examen='partiel', note='12', explication='')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['releves']), 1)
+
+
+class ORJSONTests(ApiTestCase):
+
+    def test_rendu_identique_a_drf(self):
+        data = {
+            'texte': 'Élève\u2028suite',
+            1: Decimal('12.50'),
+            'moment': datetime.datetime(2025, 9, 5, 18, 30, 0, 123456,
+                                        tzinfo=datetime.timezone.utc),
+            'jour': datetime.date(2025, 9, 5),
+            'heure': datetime.time(8, 15),
+            'duree': datetime.timedelta(hours=2),
+            'paresseux': _('Hebdomadaire'),
+            'liste': ({'a': None, 'b': True}, 1.5, 10 ** 3),
+        }
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_nan_et_infini_refuses_comme_drf(self):
+        for valeur in (float('nan'), float('inf'), np.float64('-inf'), Decimal('NaN')):
+            with self.subTest(valeur=valeur):
+                data = {'moyenne': None, 'notes': [12.5, {'ecart': valeur}]}
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    ORJSONRenderer().render(data)
+        self.assertEqual(ORJSONRenderer().render({'moyenne': None}), b'{"moyenne":null}')
+
+    def test_reponse_api(self):
+        Note.objects.create(etudiant=creer_etudiants(1)[0], cours=self.cours,
+                            type_examen='partiel', note='12.50', explication='')
+        response = self.client.get(reverse('notes-examens-list'))
+        self.assertEqual(response.content,
+                         JSONRenderer().render(response.data))
+        self.assertEqual(response.data[0]['note'], '12.50')
+
+    def test_lecture(self):
+        self.assertEqual(ORJSONParser().parse(io.BytesIO('{"nom": "Zoé"}'.encode())),
+                         {'nom': 'Zoé'})
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"note": NaN}'))
+
+
+class ValuesSerializerTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        etudiant, = creer_etudiants(1)
+        etudiant.filiere, etudiant.anneeetude = 'INFO', '2'
+        etudiant.datedenaissance = datetime.date(2004, 5, 17)
+        etudiant.anneeinscrit = datetime.date(2022, 9, 1)
+        etudiant.save()
+        creer_cours(self.enseignant, titre='Analyse', volumehoraire='7.5')
+
+    def test_sortie_identique(self):
+        for lecture, serializer, queryset in (
+                (UserValuesSerializer, UserSerializer, User.objects.order_by('id')),
+                (CoursValuesSerializer, CoursSerializer, Cours.objects.order_by('id'))):
+            with self.subTest(serializer=serializer.__name__):
+                self.assertEqual(
+                    lecture.serialiser(queryset.values(*lecture.colonnes())),
+                    serializer(queryset, many=True).data)
+
+    def test_listes_et_pagination(self):
+        url = reverse('student-list-create')
+        response = self.client.get(url)
+        self.assertEqual(response.data, UserSerializer(
+            User.objects.filter(role='etudiant'), many=True).data)
+        self.assertEqual(response.data[0]['datedenaissance'], '2004-05-17')
+
+        response = self.client.get(reverse('cours-list-create'), {'page_size': 1})
+        self.assertEqual(response.data['results'][0]['volumehoraire'], '30.00')
+        response = self.client.get(response.data['next'])
+        self.assertEqual(response.data['results'][0]['volumehoraire'], '7.50')
+
+
+class SparseFieldsTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.etudiant, = creer_etudiants(1)
+        Inscription.objects.create(etudiant=self.etudiant, cours=self.cours)
+
+    def test_champs_des_cours(self):
+        response = self.client.get(reverse('cours-list-create'),
+                                   {'fields': 'id,titre,semestre'})
+        self.assertEqual(response.data, [
+            {'id': self.cours.id, 'titre': 'Algèbre', 'semestre': 'S1'}])
+
+    def test_inscriptions_sans_imbrication(self):
+        url = reverse('inscriptions-list')
+        with self.assertNumQueries(1) as requetes:
+            response = self.client.get(url, {'expand': ''})
+        self.assertEqual(response.data, [
+            {'id': Inscription.objects.get().id, 'etudiant': self.etudiant.id,
+             'cours': self.cours.id}])
+        self.assertNotIn('JOIN', requetes.captured_queries[0]['sql'])
+
+    def test_sous_champs_et_colonnes_lues(self):
+        url = reverse('inscriptions-list')
+        with self.assertNumQueries(1) as requetes:
+            response = self.client.get(url, {'fields': 'id,cours.titre', 'expand': 'cours'})
+        self.assertEqual(response.data[0], {
+            'id': Inscription.objects.get().id, 'cours': {'titre': 'Algèbre'}})
+        sql = requetes.captured_queries[0]['sql']
+        self.assertNotIn('description', sql)
+        self.assertNotIn('gestion_user', sql)
+
+        # Sans paramètre : sortie inchangée pour le client existant
+        response = self.client.get(url)
+        self.assertEqual(response.data[0]['etudiant']['email'], self.etudiant.email)
+
+    def test_expansion_optionnelle_et_champs_inconnus(self):
+        Seance.objects.create(cours=self.cours, date=datetime.date(2025, 9, 1),
+                              salle='A1', heure_debut=datetime.time(8), duree=2)
+        response = self.client.get(reverse('seances-list'),
+                                   {'expand': 'cours', 'fields': 'date,cours.titre'})
+        self.assertEqual(response.data, [{'cours': {'titre': 'Algèbre'}, 'date': '2025-09-01'}])
+        # Liste en cache : le cours imbriqué suit ses modifications
+        self.cours.titre = 'Analyse'
+        self.cours.save()
+        response = self.client.get(reverse('seances-list'),
+                                   {'expand': 'cours', 'fields': 'date,cours.titre'})
+        self.assertEqual(response.data[0]['cours'], {'titre': 'Analyse'})
+
+        response = self.client.get(reverse('cours-list-create'), {'fields': 'id,salaire'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(reverse('inscriptions-list'), {'expand': 'seance'})
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(JWT_VERSIONS_EN_CACHE=True)  # un seul processus : cache partagé
+class StatelessJWTTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('cours-detail', args=[self.cours.id])
+
+    def connecter(self, user):
+        jetons_emis = self.client.post(reverse('token_obtain_pair'), {
+            'email': user.email, 'password': 'motdepasse'}).data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {jetons_emis['access']}")
+        return jetons_emis['refresh']
+
+    def rafraichir(self, refresh):
+        response = APIClient().post(reverse('token_refresh'), {'refresh': refresh})
+        if response.status_code == 200:
+            self.client.credentials(
+                HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response
+
+    def test_lecture_sans_requete_utilisateur(self):
+        self.connecter(self.enseignant)
+        self.client.get(self.url)  # filigrane mis en cache
+        with self.assertNumQueries(1):  # le cours seulement
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.user.role, 'enseignant')
+
+    @override_settings(JWT_VERSIONS_EN_CACHE=False)
+    def test_filigrane_en_base_sans_cache_partage(self):
+        self.connecter(self.enseignant)
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(len(requetes), 2)
+        self.assertIn('SELECT "gestion_user"."version_jetons"',
+                      requetes.captured_queries[0]['sql'])
+
+    def test_ecriture_avec_utilisateur_en_base(self):
+        self.connecter(self.secretaire)
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.client.patch(self.url, {'titre': 'Analyse'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('FROM "gestion_user"', requetes.captured_queries[0]['sql'])
+
+    def test_role_privilegie_relu_en_base(self):
+        refresh = self.connecter(self.secretaire)
+        url = reverse('dashboard-secretaire')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.secretaire.role = 'etudiant'
+        self.secretaire.save()
+        self.assertEqual(self.client.get(url).status_code, 403)
+        # Les revendications sont réémises depuis la base au rafraîchissement
+        refresh = self.rafraichir(refresh).data['refresh']
+        self.rafraichir(refresh)
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(self.url).wsgi_request.user.role, 'etudiant')
+
+    def test_retrogradation(self):
+        refresh = self.connecter(self.enseignant)
+        url = reverse('dashboard-enseignant')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.enseignant.role = 'etudiant'
+        self.enseignant.save()
+        cache.clear()  # filigrane évincé : relu en base
+        self.assertEqual(self.client.get(url).status_code, 403)
+        refresh = self.rafraichir(refresh).data['refresh']
+        self.rafraichir(refresh)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_compte_desactive(self):
+        refresh = self.connecter(self.enseignant)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.enseignant.is_active = False
+        self.enseignant.save()  # version_jetons incrémentée
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.rafraichir(refresh).status_code, 401)
+
+    def test_filigrane_monotone(self):
+        perime = User.objects.get(pk=self.enseignant.pk)
+        self.enseignant.save()
+        perime.save()  # instance périmée : le filigrane ne recule pas
+        self.assertEqual(perime.version_jetons, 2)
+
+
+class ListeNoireTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        jetons.revoques.vider()
+        self.url = reverse('token_refresh')
+        self.refresh = APIClient().post(reverse('token_obtain_pair'), {
+            'email': self.secretaire.email, 'password': 'motdepasse'}).data['refresh']
+
+    def test_rotation_et_rejeu(self):
+        response = self.client.post(self.url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('refresh', response.data)
+
+        # Le jeton remplacé est révoqué ; le rejeu est refusé sans requête
+        with self.assertNumQueries(0):
+            response = self.client.post(self.url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, 401)
+
+        jetons.revoques.vider()  # autre processus : vérification en base
+        response = self.client.post(self.url, {'refresh': self.refresh})
+        self.assertEqual(response.status_code, 401)
+
+        stats = self.client.get(reverse('token-blacklist-stats')).data
+        self.assertEqual(stats['tables']['blacklisted'], 1)
+        self.assertEqual(stats['verifications']['total'], 3)
+        self.assertEqual(stats['verifications']['lru'], 1)
+
+    def test_purge_des_jetons_expires(self):
+        self.client.post(self.url, {'refresh': self.refresh})  # révoqué
+        OutstandingToken.objects.update(
+            expires_at=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        sortie = StringIO()
+        call_command('prune_tokens', '--batch-size', '1', stdout=sortie)
+        self.assertIn('1 jetons expirés supprimés', sortie.getvalue())
+        self.assertFalse(OutstandingToken.objects.exists())
+        self.assertFalse(BlacklistedToken.objects.exists())
+
+
+HACHEURS_RAPIDES = ['gestion.hashers.BCryptReglableHasher',
+                    'gestion.hashers.PBKDF2ReglableHasher',
+                    'django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class ConnexionTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('token_obtain_pair')
+
+    def connecter(self, password='motdepasse'):
+        return self.client.post(self.url, {
+            'email': self.enseignant.email, 'password': password})
+
+    def test_une_seule_lecture_utilisateur(self):
+        with CaptureQueriesContext(connection) as requetes:
+            response = self.connecter()
+        self.assertEqual(response.status_code, 200)
+        lectures = [q['sql'] for q in requetes.captured_queries
+                    if q['sql'].startswith('SELECT') and 'FROM "gestion_user"' in q['sql']]
+        self.assertEqual(len(lectures), 1)
+
+    @override_settings(PASSWORD_HASHERS=HACHEURS_RAPIDES, PASSWORD_BCRYPT_ROUNDS=4)
+    def test_rehachage_a_la_connexion(self):
+        self.assertTrue(self.enseignant.password.startswith('md5$'))
+        self.assertEqual(self.connecter().status_code, 200)
+        self.enseignant.refresh_from_db()
+        self.assertTrue(self.enseignant.password.startswith('bcrypt_sha256$$2b$04$'))
+        # Même mot de passe : pas de save(), les jetons émis restent valides
+        self.assertEqual(self.enseignant.version_jetons, 0)
+        self.assertEqual(self.connecter().status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=HACHEURS_RAPIDES[1:], PASSWORD_PBKDF2_ITERATIONS=1000)
+    def test_changement_de_cout(self):
+        self.connecter()
+        self.enseignant.refresh_from_db()
+        self.assertTrue(self.enseignant.password.startswith('pbkdf2_sha256$1000$'))
+        with self.settings(PASSWORD_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.connecter().status_code, 200)
+        self.enseignant.refresh_from_db()
+        self.assertTrue(self.enseignant.password.startswith('pbkdf2_sha256$2000$'))
+
+    def test_refus(self):
+        response = self.connecter('faux')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['detail'], ['Mot de passe incorrect.'])
+        User.objects.filter(pk=self.enseignant.pk).update(is_active=False)
+        self.assertEqual(self.connecter().status_code, 400)
+
+    # MD5 reste le hacheur par défaut : la commande choisit bcrypt elle-même
+    @override_settings(PASSWORD_HASHERS=HACHEURS_RAPIDES[::-1], PASSWORD_BCRYPT_ROUNDS=4)
+    def test_commande_bench_login(self):
+        sortie = StringIO()
+        call_command('bench_login', '--hashers', 'bcrypt', '--logins', '1', stdout=sortie)
+        self.assertIn('connexions/s/cœur', sortie.getvalue())
+        self.assertIn('2 requête(s) SQL', sortie.getvalue())
+        self.assertFalse(User.objects.filter(email='bench-login@univ.test').exists())
+
+    @override_settings(PASSWORD_HASHERS=HACHEURS_RAPIDES[::-1], PASSWORD_BCRYPT_ROUNDS=4)
+    def test_bench_login_refuse_les_echecs(self):
+        with mock.patch('gestion.serializers.check_password', side_effect=[True, False]):
+            with self.assertRaisesMessage(CommandError, 'Mot de passe incorrect'):
+                call_command('bench_login', '--hashers', 'bcrypt', '--logins', '1',
+                             stdout=StringIO())
+
+
+def budgets(**taux):
+    rest_framework = dict(settings.REST_FRAMEWORK)
+    rest_framework['DEFAULT_THROTTLE_RATES'] = {
+        **rest_framework['DEFAULT_THROTTLE_RATES'], **taux}
+    return override_settings(REST_FRAMEWORK=rest_framework)
+
+
+class LimitationTests(ApiTestCase):
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('token_obtain_pair')
+
+    def connecter(self, email, ip='10.0.0.1'):
+        return self.client.post(self.url, {'email': email, 'password': 'faux'},
+                                REMOTE_ADDR=ip)
+
+    @budgets(**{'connexion-email': '2/min'})
+    def test_seau_par_email(self):
+        for _ in range(2):
+            self.assertEqual(self.connecter('Enseignant@univ.test').status_code, 400)
+        # Seau vide : refus avant toute lecture de compte ou hachage
+        with self.assertNumQueries(0):
+            response = self.connecter('enseignant@univ.test', ip='10.0.0.2')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        # Un autre compte a son propre seau
+        self.assertEqual(self.connecter('secretaire@univ.test').status_code, 400)
+
+    @budgets(**{'connexion-ip': '3/min'})
+    def test_seau_par_ip(self):
+        for i in range(3):
+            self.assertEqual(self.connecter(f'inconnu{i}@univ.test').status_code, 400)
+        self.assertEqual(self.connecter('autre@univ.test').status_code, 429)
+        self.assertEqual(self.connecter('autre@univ.test', ip='10.0.0.9').status_code, 400)
+
+    @budgets(**{'connexion-email': '60/min'})
+    def test_recharge(self):
+        with mock.patch('gestion.throttling.time.time', return_value=1000.0):
+            for _ in range(60):
+                self.connecter('enseignant@univ.test')
+            self.assertEqual(self.connecter('enseignant@univ.test').status_code, 429)
+        with mock.patch('gestion.throttling.time.time', return_value=1001.0):
+            self.assertEqual(self.connecter('enseignant@univ.test').status_code, 400)
+            self.assertEqual(self.connecter('enseignant@univ.test').status_code, 429)
+
+    @budgets(**{'connexion-email': '1/min', 'connexion-ip': '1/min'})
+    @override_settings(PASSWORD_HASHERS=HACHEURS_RAPIDES[::-1], PASSWORD_BCRYPT_ROUNDS=4)
+    def test_bench_login_non_limite(self):
+        sortie = StringIO()
+        call_command('bench_login', '--hashers', 'bcrypt', '--logins', '3', stdout=sortie)
+        self.assertIn('connexions/s/cœur', sortie.getvalue())
+        # La limitation reste active hors de la mesure
+        self.connecter('enseignant@univ.test')
+        self.assertEqual(self.connecter('enseignant@univ.test').status_code, 429)
+
+    @budgets(**{'enregistrement-ip': '1/hour'})
+    def test_enregistrement(self):
+        url = reverse('register')
+        self.client.post(url, {}, REMOTE_ADDR='10.0.0.1')
+        response = self.client.post(url, {}, REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '3600')
+
+
+class TeleversementTests(ApiTestCase):
+    CONTENU = b'%PDF-1.4 ' + bytes(range(256)) * 1000
+
+    def setUp(self):
+        super().setUp()
+        dossier = tempfile.TemporaryDirectory()
+        self.addCleanup(dossier.cleanup)
+        reglages = override_settings(MEDIA_ROOT=dossier.name)
+        reglages.enable()
+        self.addCleanup(reglages.disable)
+        self.etudiant = creer_etudiants(1)[0]
+        self.exercice = Exercice.objects.create(
+            cours=self.cours, description='TP', titre_exercice='TP 1',
+            date_limite=datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc),
+            type_exercice='TP')
+
+    def ouvrir(self, contenu=CONTENU, **extra):
+        data = {'etudiant_id': self.etudiant.id, 'exercice_id': self.exercice.id,
+                'nom_fichier': 'rapport.pdf', 'taille': len(contenu),
+                'sha256': hashlib.sha256(contenu).hexdigest(), **extra}
+        response = self.client.post(reverse('televersements-create'), data)
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.data['id']
+
+    def envoyer(self, id, morceau, decalage):
+        return self.client.patch(
+            reverse('televersement-detail', args=[id]), morceau,
+            content_type='application/octet-stream', HTTP_UPLOAD_OFFSET=str(decalage))
+
+    def test_envoi_par_morceaux(self):
+        id = self.ouvrir()
+        milieu = len(self.CONTENU) // 2
+        response = self.envoyer(id, self.CONTENU[:milieu], 0)
+        self.assertEqual(response.data['recu'], milieu)
+        self.assertEqual(response['Upload-Offset'], str(milieu))
+        self.assertFalse(SoumissionExercice.objects.exists())
+
+        # Reprise : la position est relue, un mauvais décalage est refusé
+        detail = self.client.get(reverse('televersement-detail', args=[id]))
+        self.assertEqual(detail.data['recu'], milieu)
+        self.assertEqual(self.envoyer(id, self.CONTENU[milieu:], 0).status_code, 409)
+        self.assertEqual(self.envoyer(id, self.CONTENU[milieu:], milieu).status_code, 200)
+
+        response = self.client.post(reverse('televersement-terminer', args=[id]))
+        self.assertEqual(response.status_code, 201)
+        soumission = SoumissionExercice.objects.get()
+        self.assertEqual(soumission.etudiant, self.etudiant)
+        with soumission.fichier.open('rb') as fichier:
+            self.assertEqual(fichier.read(), self.CONTENU)
+        self.assertFalse(TeleversementSoumission.objects.exists())
+
+    def test_fichier_incomplet_ou_corrompu(self):
+        id = self.ouvrir(sha256='0' * 64)
+        self.envoyer(id, self.CONTENU[:10], 0)
+        url = reverse('televersement-terminer', args=[id])
+        self.assertEqual(self.client.post(url).status_code, 400)
+        self.assertEqual(self.envoyer(id, self.CONTENU + b'x', 10).status_code, 400)
+        self.envoyer(id, self.CONTENU[10:], 10)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['recu'], 0)  # l'envoi reprend à zéro
+        self.assertFalse(SoumissionExercice.objects.exists())
+
+    def test_envoi_reserve_a_son_createur(self):
+        id = self.ouvrir()
+        self.client.force_authenticate(user=self.enseignant)
+        self.assertEqual(self.envoyer(id, self.CONTENU, 0).status_code, 404)
+
+    def test_purge_des_envois_abandonnes(self):
+        id = self.ouvrir()
+        self.envoyer(id, self.CONTENU[:10], 0)
+        TeleversementSoumission.objects.update(
+            date_maj=datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc))
+        sortie = StringIO()
+        call_command('prune_uploads', stdout=sortie)
+        self.assertIn('1 envois abandonnés supprimés', sortie.getvalue())
+        self.assertEqual(os.listdir(os.path.join(settings.MEDIA_ROOT, 'televersements')), [])
@@ -0,0 +1,93 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Lecture puis écriture du seau : sérialisées entre les threads d'un
+# processus. Entre processus (cache partagé), deux requêtes simultanées
+# peuvent lire le même état : au pire un jeton de trop par requête concurrente.
+verrou = threading.Lock()
+
+
+class SeauThrottle(BaseThrottle):
+    """
+    Seau à jetons (token bucket) par clé, dans le cache Django : locmem par
+    processus, ou partagé (Redis...) si CACHE_URL est défini. Un seul
+    get / set par requête.
+
+    Le budget vient de DEFAULT_THROTTLE_RATES[scope], au format de DRF
+    ("10/min") : le seau contient 10 jetons, rechargés au rythme de 10 par
+    minute. Une requête consomme un jeton ; seau vide : 429 et Retry-After.
+    Les throttles passent avant la validation : une requête refusée ne
+    coûte ni requête SQL ni hachage de mot de passe.
+    """
+    scope = None
+
+    def get_cache_key(self, request, view):
+        """Identifiant du seau, ou None pour ne pas limiter la requête."""
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def budget(self):
+        taux = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if taux is None:
+            return None
+        nombre, periode = taux.split('/')
+        capacite = int(nombre)
+        duree = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[periode[0]]
+        return capacite, capacite / duree
+
+    def allow_request(self, request, view):
+        self.attente = None
+        budget = self.budget()
+        identifiant = self.get_cache_key(request, view)
+        if budget is None or identifiant is None:
+            return True
+        capacite, debit = budget
+        cle = f'gestion:seau:{self.scope}:{identifiant}'
+
+        with verrou:
+            maintenant = time.time()
+            jetons, horodatage = cache.get(cle, (capacite, maintenant))
+            jetons = min(capacite, jetons + (maintenant - horodatage) * debit)
+            if jetons < 1:
+                self.attente = (1 - jetons) / debit
+                return False
+            # Le seau se remplit en capacite / debit secondes : inutile au-delà
+            cache.set(cle, (jetons - 1, maintenant), math.ceil(capacite / debit))
+        return True
+
+    def wait(self):
+        return self.attente
+
+
+class IPThrottle(SeauThrottle):
+    """Seau par adresse IP (X-Forwarded-For selon NUM_PROXIES)."""
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+
+class EmailThrottle(SeauThrottle):
+    """Seau par email soumis : limite les essais sur un même compte, quelle que soit l'IP."""
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email') if hasattr(request.data, 'get') else None
+        if not isinstance(email, str) or not email:
+            return None
+        return hashlib.md5(email.strip().lower().encode()).hexdigest()
+
+
+class ConnexionIPThrottle(IPThrottle):
+    scope = 'connexion-ip'
+
+
+class ConnexionEmailThrottle(EmailThrottle):
+    scope = 'connexion-email'
+
+
+class EnregistrementIPThrottle(IPThrottle):
+    scope = 'enregistrement-ip'
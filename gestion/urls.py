@@ -8,7 +8,11 @@ urlpatterns = [
     
 
     path('seances/', SeanceListCreate.as_view(), name='seances-list'),
+    path('seances/conflicts/', SeanceConflits.as_view(), name='seances-conflicts'),
+    path('seances/planifier/', SeancePlanification.as_view(), name='seances-planifier'),
     path('seances/<int:pk>/', SeanceDetail.as_view(), name='seance-detail'),
+    path('series-seances/', SerieSeanceListCreate.as_view(), name='series-seances-list'),
+    path('series-seances/<int:pk>/', SerieSeanceDetail.as_view(), name='serie-seance-detail'),
 
     # Enseignants
     path('teachers/', TeacherListCreate.as_view(), name='teacher-list-create'),
@@ -16,15 +20,22 @@ urlpatterns = [
 
     # Étudiants
     path('students/', StudentListCreate.as_view(), name='student-list-create'),
+    path('students/export/', StudentExport.as_view(), name='student-export'),
+    path('students/import/', StudentImport.as_view(), name='student-import'),
     path('students/<int:pk>/', StudentDetail.as_view(), name='student-detail'),
 
     # Cours (déjà couverts par vos vues existantes)
     path('courses/', CoursListCreate.as_view(), name='cours-list-create'),
     path('courses/<int:pk>/', CoursDetail.as_view(), name='cours-detail'),
+    path('courses/<int:pk>/stats/', CoursStats.as_view(), name='cours-stats'),
     path('inscriptions/', InscriptionListCreate.as_view(), name='inscriptions-list'),
+    path('inscriptions/export/', InscriptionExport.as_view(), name='inscriptions-export'),
+    path('inscriptions/bulk/', InscriptionBulkCreate.as_view(), name='inscriptions-bulk'),
     path('inscriptions/<int:pk>/', InscriptionDetail.as_view(), name='inscription-detail'),
 
     path('notes/', NoteListCreate.as_view(), name='notes-examens-list'), 
+    path('notes/export/', NoteExport.as_view(), name='notes-export'),
+    path('notes/bulk/', NoteBulkCreate.as_view(), name='notes-bulk'),
     path('notes/<int:pk>/', NoteDetail.as_view(), name='note-examen-detail'),
  
     path('notes-tdtp/', NoteListCreate.as_view(), name='notes-tdtp-list'),
@@ -38,9 +49,22 @@ urlpatterns = [
     
     path('soumissions-exercices/', SoumissionExerciceListCreate.as_view(), name='soumissions-exercices-list'),
     path('soumissions-exercices/<int:pk>/', SoumissionExerciceDetail.as_view(), name='soumission-exercice-detail'),
+    path('soumissions-exercices/televersements/', TeleversementSoumissionCreate.as_view(), name='televersements-create'),
+    path('soumissions-exercices/televersements/<uuid:pk>/', TeleversementSoumissionDetail.as_view(), name='televersement-detail'),
+    path('soumissions-exercices/televersements/<uuid:pk>/terminer/', TeleversementSoumissionTerminer.as_view(), name='televersement-terminer'),
     
+    path('dashboard/secretaire/', DashboardSecretaire.as_view(), name='dashboard-secretaire'),
+    path('dashboard/etudiant/', DashboardEtudiant.as_view(), name='dashboard-etudiant'),
+    path('dashboard/enseignant/', DashboardEnseignant.as_view(), name='dashboard-enseignant'),
+
+    path('cache/stats/', CacheStats.as_view(), name='cache-stats'),
+
+    path('calendar/<int:user_id>.ics', CalendrierICS.as_view(), name='calendrier-ics'),
+    path('calendar/<int:user_id>/', CalendrierJSON.as_view(), name='calendrier-json'),
+
     path('register/', RegisterView.as_view(), name='register'),
     path('token/', MyTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/blacklist/stats/', ListeNoireStats.as_view(), name='token-blacklist-stats'),
     
 ]
@@ -1,13 +1,36 @@
+import datetime
+import io
+
 from rest_framework import generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import status
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView
+from django.conf import settings
 from django.contrib.auth.hashers import make_password
 from .models import *
 from .serializers import *
+from . import calendrier, jetons
+from .imports import ImportTropVolumineux, importer_etudiants
+from . import mise_en_cache
+from .mixins import (
+    CacheMixin, CSVExportMixin, EagerLoadingMixin, ETagMixin, SparseFieldsMixin,
+    ValuesListMixin)
+from .pagination import SeancePagination
+from .planning import balayer_conflits
+from .permissions import (
+    IsEnseignant, IsEtudiant, IsSecretaire, IsSecretaireOuEnseignantDuCours)
+from .throttling import (
+    ConnexionEmailThrottle, ConnexionIPThrottle, EnregistrementIPThrottle)
+from .stats import statistiques_cours
+from . import tableaux_de_bord, televersements
 from django.shortcuts import get_object_or_404
+from django.http import HttpResponse, HttpResponseForbidden
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django.views import View
 
 from django.contrib.auth import get_user_model
 User = get_user_model()
@@ -15,6 +38,8 @@ User = get_user_model()
 
 class MyTokenObtainPairView(TokenObtainPairView):
     serializer_class = MyTokenObtainPairSerializer
+    # 429 avant toute lecture de compte ou hachage
+    throttle_classes = [ConnexionIPThrottle, ConnexionEmailThrottle]
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -33,14 +58,16 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (AllowAny,)
     serializer_class = RegisterSerializer
+    throttle_classes = [EnregistrementIPThrottle]
 
 
-class UserListCreateView(generics.ListCreateAPIView):
+class UserListCreateView(ValuesListMixin, generics.ListCreateAPIView):
     """
     Vue pour lister et créer des Users en filtrant par rôle.
     Exemple : /api/Users/?role=etudiant
     """
     serializer_class = UserSerializer
+    values_serializer_class = UserValuesSerializer
     # Authentification requise
     permission_classes = [permissions.IsAuthenticated]
 
@@ -57,7 +84,7 @@ class UserListCreateView(generics.ListCreateAPIView):
         return queryset
 
 
-class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
+class UserRetrieveUpdateDestroyView(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     Vue pour récupérer, mettre à jour et supprimer un User spécifique.
     """
@@ -80,7 +107,7 @@ class UserRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
       # Autoriser tout le monde à accéder à cette vue
 
 
-class UserDetail(generics.RetrieveUpdateDestroyAPIView):
+class UserDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -93,9 +120,11 @@ class UserDetail(generics.RetrieveUpdateDestroyAPIView):
 # ========================
 
 
-class TeacherListCreate(generics.ListCreateAPIView):
+class TeacherListCreate(CacheMixin, ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = UserSerializer
+    values_serializer_class = UserValuesSerializer
     permission_classes = [IsAuthenticated]
+    cache_modeles = (User,)
 
     def get_queryset(self):
         return User.objects.filter(role='enseignant')
@@ -105,7 +134,7 @@ class TeacherListCreate(generics.ListCreateAPIView):
         serializer.save(role='enseignant')
 
 
-class TeacherDetail(generics.RetrieveUpdateDestroyAPIView):
+class TeacherDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
 
@@ -117,8 +146,9 @@ class TeacherDetail(generics.RetrieveUpdateDestroyAPIView):
 # ========================
 
 
-class StudentListCreate(generics.ListCreateAPIView):
+class StudentListCreate(ValuesListMixin, generics.ListCreateAPIView):
     serializer_class = UserSerializer
+    values_serializer_class = UserValuesSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
@@ -129,21 +159,60 @@ class StudentListCreate(generics.ListCreateAPIView):
         serializer.save(role='etudiant')
 
 
-class StudentDetail(generics.RetrieveUpdateDestroyAPIView):
-    serializer_class = UserSerializer
-    permission_classes = [IsAuthenticated]
+class StudentExport(CSVExportMixin, StudentListCreate):
+    export_filename = 'etudiants.csv'
+    export_fields = [
+        ('id', 'id'), ('email', 'email'), ('nom', 'nom'), ('prenom', 'prenom'),
+        ('tel', 'tel'), ('filiere', 'filiere'), ('anneeetude', 'anneeetude'),
+        ('anneeinscrit', 'anneeinscrit'), ('datedenaissance', 'datedenaissance'),
+    ]
 
-    def get_queryset(self):
-        return User.objects.filter(role='etudiant')
+
+class StudentImport(APIView):
+    """
+    Import en masse d'étudiants depuis un fichier CSV (champ `fichier`),
+    même format que la commande `manage.py import_students`.
+
+    Les mots de passe sont hachés dans le processus web, sans pool : au-delà
+    de IMPORT_ETUDIANTS_LIGNES_MAX lignes, le fichier est refusé (413) et
+    s'importe avec la commande.
+    """
+    permission_classes = [IsSecretaire]
+
+    def post(self, request):
+        fichier = request.FILES.get('fichier')
+        if fichier is None:
+            return Response({"fichier": "Un fichier CSV est requis."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        texte = io.TextIOWrapper(fichier.file, encoding='utf-8-sig', newline='')
+        try:
+            rapport = importer_etudiants(
+                texte, workers=1, lignes_max=settings.IMPORT_ETUDIANTS_LIGNES_MAX)
+        except UnicodeDecodeError:
+            return Response({"fichier": "Le fichier doit être encodé en UTF-8."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except ImportTropVolumineux as e:
+            return Response({"fichier": str(e)},
+                            status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        return Response(rapport.as_dict(), status=status.HTTP_200_OK)
+
+
+class StudentDetail(ETagMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
+    serializer_class = EtudiantSerializer
+    permission_classes = [IsAuthenticated]
+    queryset = User.objects.filter(role='etudiant')
+    prefetch_related_fields = ('releves',)
 # ========================
 # CRUD pour Cours
 # ========================
 
 
-class CoursListCreate(generics.ListCreateAPIView):
+class CoursListCreate(CacheMixin, ValuesListMixin, generics.ListCreateAPIView):
     queryset = Cours.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = CoursSerializer
+    values_serializer_class = CoursValuesSerializer
+    cache_modeles = (Cours,)
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -153,36 +222,112 @@ class CoursListCreate(generics.ListCreateAPIView):
         return queryset
 
 
-class CoursDetail(generics.RetrieveUpdateDestroyAPIView):
+class CoursDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Cours.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = CoursSerializer
 
+
+class CoursStats(APIView):
+    """
+    Statistiques des notes d'un cours (moyenne, médiane, écart-type,
+    percentiles, histogramme, taux de réussite) par type d'examen.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        get_object_or_404(Cours, pk=pk)
+        return Response(statistiques_cours(pk))
+
 # ========================
 # CRUD pour Seance
 # ========================
 
 
-class SeanceListCreate(generics.ListCreateAPIView):
+class SeanceListCreate(CacheMixin, SparseFieldsMixin, generics.ListCreateAPIView):
     queryset = Seance.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = SeanceSerializer
+    pagination_class = SeancePagination
+    # ?expand=cours imbrique le cours dans la réponse en cache
+    cache_modeles = (Seance, Cours)
 
 
-class SeanceDetail(generics.RetrieveUpdateDestroyAPIView):
+class SeanceConflits(APIView):
+    """
+    Liste les séances qui se chevauchent (même salle ou même enseignant).
+    Filtres : ?semestre=S1&anneeetude=1&debut=2025-01-01&fin=2025-06-30
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        queryset = Seance.objects.all()
+        if params.get('semestre'):
+            queryset = queryset.filter(cours__semestre=params['semestre'])
+        if params.get('anneeetude'):
+            queryset = queryset.filter(cours__anneeetude=params['anneeetude'])
+        for param, lookup in (('debut', 'date__gte'), ('fin', 'date__lte')):
+            if params.get(param):
+                try:
+                    date = datetime.date.fromisoformat(params[param])
+                except ValueError:
+                    return Response({param: "Date invalide (AAAA-MM-JJ)."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                queryset = queryset.filter(**{lookup: date})
+        return Response(balayer_conflits(queryset))
+
+
+class SeancePlanification(APIView):
+    """
+    Génère l'emploi du temps d'un semestre : créneaux et salles sans conflit
+    pour tous les cours du semestre qui n'ont pas encore de séances.
+    Avec "appliquer": false, renvoie seulement le rapport du solveur.
+    """
+    permission_classes = [IsSecretaire]
+
+    def post(self, request):
+        serializer = PlanificationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        rapport = serializer.save()
+        code = (status.HTTP_201_CREATED if serializer.validated_data['appliquer']
+                else status.HTTP_200_OK)
+        return Response(rapport, status=code)
+
+
+class SeanceDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Seance.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = SeanceSerializer
 
 
+# ========================
+# CRUD pour SerieSeance
+# ========================
+
+
+class SerieSeanceListCreate(generics.ListCreateAPIView):
+    queryset = SerieSeance.objects.all()
+    permission_classes = [IsAuthenticated]
+    serializer_class = SerieSeanceSerializer
+
+
+class SerieSeanceDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = SerieSeance.objects.all()
+    permission_classes = [IsAuthenticated]
+    serializer_class = SerieSeanceSerializer
+
+
 # ========================
 # CRUD pour Inscription
 # ========================
-class InscriptionListCreate(generics.ListCreateAPIView):
+class InscriptionListCreate(SparseFieldsMixin, EagerLoadingMixin, generics.ListCreateAPIView):
     queryset = Inscription.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = InscriptionSerializer
-    
+    # InscriptionSerializer imbrique l'étudiant et le cours complets
+    select_related_fields = ('etudiant', 'cours')
+
     def get_queryset(self):
         queryset = super().get_queryset()
         etudiant_id = self.request.query_params.get('etudiant')
@@ -194,23 +339,101 @@ class InscriptionListCreate(generics.ListCreateAPIView):
         return queryset
 
 
-class InscriptionDetail(generics.RetrieveUpdateDestroyAPIView):
+class InscriptionExport(CSVExportMixin, InscriptionListCreate):
+    export_filename = 'inscriptions.csv'
+    export_fields = [
+        ('id', 'id'), ('etudiant_id', 'etudiant_id'),
+        ('email', 'etudiant__email'), ('nom', 'etudiant__nom'),
+        ('prenom', 'etudiant__prenom'), ('cours_id', 'cours_id'),
+        ('cours', 'cours__titre'), ('semestre', 'cours__semestre'),
+    ]
+
+
+class InscriptionBulkCreate(APIView):
+    """
+    Inscrit une cohorte à ses cours en une transaction.
+    Réponse : nombre d'inscriptions créées et ignorées (déjà existantes).
+    """
+    permission_classes = [IsSecretaire]
+
+    def post(self, request):
+        serializer = InscriptionBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_201_CREATED)
+
+
+class InscriptionDetail(ETagMixin, EagerLoadingMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Inscription.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = InscriptionSerializer
+    select_related_fields = ('etudiant', 'cours')
 
 # ========================
 # CRUD pour NoteExamen
 # ========================
 
 
-class NoteListCreate(generics.ListCreateAPIView):
+class NoteScopeMixin:
+    """
+    Un étudiant ne voit que ses propres notes, quels que soient
+    les paramètres envoyés.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.is_etudiant():
+            queryset = queryset.filter(etudiant=self.request.user)
+        return queryset
+
+
+class NoteListCreate(SparseFieldsMixin, NoteScopeMixin, generics.ListCreateAPIView):
     queryset = Note.objects.all()
     serializer_class = NoteSerializer
     permission_classes = [IsAuthenticated]
- 
 
-class NoteDetail(generics.RetrieveUpdateDestroyAPIView):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        # `etudiant_id` est le paramètre envoyé par le tableau de bord étudiant
+        etudiant_id = params.get('etudiant_id') or params.get('etudiant')
+        cours_id = params.get('cours_id') or params.get('cours')
+        type_examen = params.get('type_examen')
+        if etudiant_id:
+            queryset = queryset.filter(etudiant__id=etudiant_id)
+        if cours_id:
+            queryset = queryset.filter(cours__id=cours_id)
+        if type_examen:
+            queryset = queryset.filter(type_examen=type_examen)
+        return queryset
+
+
+class NoteExport(CSVExportMixin, NoteListCreate):
+    export_filename = 'notes.csv'
+    export_fields = [
+        ('id', 'id'), ('etudiant_id', 'etudiant_id'),
+        ('nom', 'etudiant__nom'), ('prenom', 'etudiant__prenom'),
+        ('cours_id', 'cours_id'), ('cours', 'cours__titre'),
+        ('type_examen', 'type_examen'), ('note', 'note'),
+        ('explication', 'explication'),
+    ]
+
+
+class NoteBulkCreate(APIView):
+    """
+    Saisie en masse des notes d'un examen, de manière atomique :
+    {"cours_id": 1, "type_examen": "final",
+     "notes": [{"etudiant_id": 3, "note": "12.50", "explication": ""}]}
+    Réservée au secrétariat et à l'enseignant du cours.
+    """
+    permission_classes = [IsSecretaireOuEnseignantDuCours]
+
+    def post(self, request):
+        serializer = NoteBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(serializer.save(), status=status.HTTP_201_CREATED)
+
+
+class NoteDetail(ETagMixin, NoteScopeMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Note.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = NoteSerializer
@@ -223,13 +446,13 @@ class NoteDetail(generics.RetrieveUpdateDestroyAPIView):
 # ========================
 # CRUD pour Exercice
 # ========================
-class ExerciceListCreate(generics.ListCreateAPIView):
+class ExerciceListCreate(SparseFieldsMixin, generics.ListCreateAPIView):
     queryset = Exercice.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = ExerciceSerializer
 
 
-class ExerciceDetail(generics.RetrieveUpdateDestroyAPIView):
+class ExerciceDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Exercice.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = ExerciceSerializer
@@ -245,7 +468,7 @@ class QuestionListCreate(generics.ListCreateAPIView):
     serializer_class = QuestionSerializer
 
 
-class QuestionDetail(generics.RetrieveUpdateDestroyAPIView):
+class QuestionDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Question.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = QuestionSerializer
@@ -258,7 +481,202 @@ class SoumissionExerciceListCreate(generics.ListCreateAPIView):
     serializer_class = SoumissionExerciceSerializer
 
 
-class SoumissionExerciceDetail(generics.RetrieveUpdateDestroyAPIView):
+class SoumissionExerciceDetail(ETagMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = SoumissionExercice.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = SoumissionExerciceSerializer
+
+
+# Envoi par morceaux d'un fichier de soumission :
+#   POST   televersements/                  -> ouverture (taille, sha256)
+#   PATCH  televersements/<id>/             -> morceau, en-tête Upload-Offset
+#   GET    televersements/<id>/             -> octets reçus (reprise)
+#   POST   televersements/<id>/terminer/    -> vérification, SoumissionExercice
+#   DELETE televersements/<id>/             -> abandon
+class TeleversementSoumissionCreate(generics.CreateAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = TeleversementSoumissionSerializer
+
+    def perform_create(self, serializer):
+        serializer.save(createur=self.request.user)
+
+
+class TeleversementSoumissionDetail(generics.RetrieveDestroyAPIView):
+    """
+    Un morceau est le corps brut de la requête PATCH
+    (Content-Type: application/octet-stream), écrit sur disque au fil de
+    la lecture, sans passer par les parsers de DRF.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = TeleversementSoumissionSerializer
+
+    def get_queryset(self):
+        # Un envoi n'est visible que de celui qui l'a ouvert
+        return TeleversementSoumission.objects.filter(createur=self.request.user)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if isinstance(response.data, dict) and 'recu' in response.data:
+            response['Upload-Offset'] = response.data['recu']
+        return response
+
+    def patch(self, request, *args, **kwargs):
+        televersement = self.get_object()
+        try:
+            decalage = int(request.headers['Upload-Offset'])
+        except (KeyError, ValueError):
+            return Response({"detail": "En-tête Upload-Offset requis."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            televersement = televersements.ajouter(
+                televersement, request.stream, decalage)
+        except televersements.ErreurTeleversement as e:
+            return Response(e.as_dict(), status=e.status_code)
+        return Response(self.get_serializer(televersement).data)
+
+    def perform_destroy(self, instance):
+        televersements.supprimer(instance)
+
+
+class TeleversementSoumissionTerminer(generics.GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = TeleversementSoumissionSerializer
+
+    def get_queryset(self):
+        return TeleversementSoumission.objects.filter(createur=self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        try:
+            soumission = televersements.terminer(self.get_object())
+        except televersements.ErreurTeleversement as e:
+            return Response(e.as_dict(), status=e.status_code)
+        return Response(SoumissionExerciceSerializer(soumission).data,
+                        status=status.HTTP_201_CREATED)
+
+
+# ========================
+# Tableaux de bord
+# ========================
+
+
+class DashboardSecretaire(CacheMixin, APIView):
+    """
+    Modèle complet de la page du secrétariat en un aller-retour :
+    enseignants, étudiants, cours avec leur nombre d'inscrits, compteurs.
+    """
+    permission_classes = [IsSecretaire]
+    cache_modeles = (User, Cours, Inscription)
+
+    def get(self, request):
+        return Response(TableauSecretaireSerializer(
+            tableaux_de_bord.tableau_secretaire()).data)
+
+
+class DashboardEtudiant(APIView):
+    """
+    Page de l'étudiant connecté : catalogue des cours avec le drapeau
+    `enrolled`, notes, relevés, séances et exercices à venir.
+    """
+    permission_classes = [IsEtudiant]
+
+    def get(self, request):
+        return Response(TableauEtudiantSerializer(
+            tableaux_de_bord.tableau_etudiant(request.user)).data)
+
+
+class DashboardEnseignant(APIView):
+    """Page de l'enseignant connecté : ses cours, séances à venir et exercices."""
+    permission_classes = [IsEnseignant]
+
+    def get(self, request):
+        return Response(TableauEnseignantSerializer(
+            tableaux_de_bord.tableau_enseignant(request.user)).data)
+
+
+class ListeNoireStats(APIView):
+    """Taille des tables de jetons et coût des vérifications de liste noire."""
+    permission_classes = [IsSecretaire]
+
+    def get(self, request):
+        return Response(jetons.metriques())
+
+
+class CacheStats(APIView):
+    """Succès et échecs du cache des réponses, par vue (supervision)."""
+    permission_classes = [IsSecretaire]
+
+    def get(self, request):
+        return Response(mise_en_cache.statistiques())
+
+
+# ========================
+# Calendrier (ICS / JSON)
+# ========================
+
+
+def calendrier_non_modifie(request, etag, derniere_maj):
+    """Réponse 304 si le client a déjà cette version du calendrier, sinon None."""
+    return get_conditional_response(
+        request, etag=etag,
+        last_modified=int(derniere_maj.timestamp()) if derniere_maj else None)
+
+
+def entetes_calendrier(response, etag, derniere_maj):
+    response['ETag'] = etag
+    if derniere_maj:
+        response['Last-Modified'] = http_date(derniere_maj.timestamp())
+    patch_cache_control(response, private=True, max_age=calendrier.MAX_AGE)
+    return response
+
+
+class CalendrierICS(View):
+    """
+    Flux iCalendar d'un utilisateur, pour abonnement depuis une application
+    de calendrier : /api/calendar/<id>.ics?token=<jeton>
+    Le jeton remplace le JWT, que ces applications ne savent pas envoyer.
+    """
+
+    def get(self, request, user_id):
+        user = get_object_or_404(User, pk=user_id)
+        if not calendrier.verifier_jeton(user, request.GET.get('token')):
+            return HttpResponseForbidden("Jeton de calendrier invalide.")
+
+        etag, derniere_maj = calendrier.version(user)
+        non_modifie = calendrier_non_modifie(request, etag, derniere_maj)
+        if non_modifie is not None:
+            return entetes_calendrier(non_modifie, etag, derniere_maj)
+
+        contenu = calendrier.contenu_en_cache(
+            user, 'ics', etag, lambda: calendrier.rendre_ics(
+                user, calendrier.evenements(user), derniere_maj))
+        response = HttpResponse(contenu, content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="calendrier-{user.pk}.ics"'
+        return entetes_calendrier(response, etag, derniere_maj)
+
+
+class CalendrierJSON(APIView):
+    """
+    Même contenu que le flux ICS, en JSON, pour le tableau de bord.
+    Inclut le lien d'abonnement ICS signé.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, user_id):
+        user = get_object_or_404(User, pk=user_id)
+        if request.user.pk != user.pk and not request.user.is_secretaire():
+            self.permission_denied(
+                request, message="Ce calendrier appartient à un autre utilisateur.")
+
+        etag, derniere_maj = calendrier.version(user)
+        non_modifie = calendrier_non_modifie(request, etag, derniere_maj)
+        if non_modifie is not None:
+            return entetes_calendrier(non_modifie, etag, derniere_maj)
+
+        evenements = calendrier.contenu_en_cache(
+            user, 'json', etag, lambda: calendrier.evenements(user))
+        lien = request.build_absolute_uri(reverse('calendrier-ics', args=[user.pk]))
+        response = Response({
+            'evenements': evenements,
+            'lien_ics': f'{lien}?token={calendrier.jeton(user)}',
+        })
+        return entetes_calendrier(response, etag, derniere_maj)
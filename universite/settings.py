@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import environ
+from corsheaders.defaults import default_headers
 import os
 
 
@@ -116,6 +117,39 @@ DATABASES = {
     }
 }
 
+# Cache : mémoire locale par défaut, Redis si CACHE_URL est défini
+# (ex. CACHE_URL=redis://127.0.0.1:6379/1)
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+# Filigranes des jetons JWT (gestion.authentication) lus dans le cache
+# seulement s'il est partagé entre processus ; sinon relus en base. Sans
+# CACHE_URL, chaque lecture authentifiée fait donc une requête
+# (SELECT version_jetons) : la lecture sans requête demande un cache partagé.
+JWT_VERSIONS_EN_CACHE = env.bool(
+    'JWT_VERSIONS_EN_CACHE',
+    default='locmem' not in CACHES['default']['BACKEND'].lower())
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+# PASSWORD_HASHER choisit le hacheur des nouveaux mots de passe ; les autres
+# vérifient encore les anciens, réhachés avec le hacheur choisi à la
+# connexion suivante. argon2 demande argon2-cffi.
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'gestion.hashers.PBKDF2ReglableHasher',
+    'bcrypt': 'gestion.hashers.BCryptReglableHasher',
+    'argon2': 'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='pbkdf2')
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hacheur for nom, hacheur in PASSWORD_HASHER_CHOICES.items()
+    if nom != PASSWORD_HASHER
+]
+# Coût (vide : valeur par défaut de Django). Le changer réhache à la connexion.
+PASSWORD_PBKDF2_ITERATIONS = env.int('PASSWORD_PBKDF2_ITERATIONS', default=None)
+PASSWORD_BCRYPT_ROUNDS = env.int('PASSWORD_BCRYPT_ROUNDS', default=None)
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -152,6 +186,16 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Fichiers envoyés (soumissions d'exercices). Par défaut le dossier du
+# projet, où ils étaient déjà écrits (chemins relatifs au répertoire courant).
+MEDIA_ROOT = env('MEDIA_ROOT', default=str(BASE_DIR))
+MEDIA_URL = 'media/'
+# Taille maximale d'une soumission envoyée par morceaux (octets)
+SOUMISSION_TAILLE_MAX = env.int('SOUMISSION_TAILLE_MAX', default=100 * 1024 * 1024)
+# Lignes acceptées par POST /api/students/import/ : les mots de passe y
+# sont hachés dans le processus web. Au-delà : manage.py import_students.
+IMPORT_ETUDIANTS_LIGNES_MAX = env.int('IMPORT_ETUDIANTS_LIGNES_MAX', default=200)
+
 
 
 # Default primary key field type
@@ -161,12 +205,39 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication sans requête sur la table des utilisateurs en lecture
+        'gestion.authentication.StatelessJWTAuthentication',
     ),
 
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+
+    # JSON via orjson quand il est installé (sortie identique au rendu de DRF)
+    'DEFAULT_RENDERER_CLASSES': [
+        'gestion.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'gestion.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
+    # Pagination par curseur (keyset) : ?page_size=50 puis suivre `next`
+    'DEFAULT_PAGINATION_CLASS': 'gestion.pagination.KeysetPagination',
+    'PAGE_SIZE': 50,
+
+    # Budgets des seaux à jetons (gestion.throttling) : "capacité/période",
+    # rechargés au même rythme. L'IP est large (NAT du campus) ; l'email
+    # limite les essais sur un même compte.
+    'DEFAULT_THROTTLE_RATES': {
+        'connexion-ip': env('THROTTLE_CONNEXION_IP', default='300/min'),
+        'connexion-email': env('THROTTLE_CONNEXION_EMAIL', default='10/min'),
+        'enregistrement-ip': env('THROTTLE_ENREGISTREMENT_IP', default='30/hour'),
+    },
+    # Nombre de proxys devant l'application (X-Forwarded-For)
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=None),
 }
 
 
@@ -176,6 +247,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173"
 ]
 CORS_ALLOW_CREDENTIALS = True
+# Position des envois par morceaux (gestion.televersements)
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset')
+CORS_EXPOSE_HEADERS = ['Upload-Offset']
 AUTH_USER_MODEL = 'gestion.User'
 SIMPLE_JWT = {
    'ACCESS_TOKEN_LIFETIME': timedelta(days=5),
@@ -204,6 +278,8 @@ SIMPLE_JWT = {
 
     'JTI_CLAIM': 'jti',
 
+    'TOKEN_REFRESH_SERIALIZER': 'gestion.serializers.MyTokenRefreshSerializer',
+
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(minutes=5),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),